@@ -1,5 +1,4 @@
 import logging
-import pandas as pd
 from typing import Dict, List
 from flask import jsonify
 
@@ -21,25 +20,19 @@ def predict_alcohol(
         if k not in params:
             params[k] = shared.default_features[k]
 
-    # Translate features to a dataframe
-    features_df = pd.DataFrame([params])
-
     try:
-        # Now we turn it into a matrix, ready for some XTREME boosting
-        feature_matrix = shared.build_feature_matrix(
-            model_container, features_df, throw_on_missing=True
-        )
-
-        # Ask the model to do the predictions
-        predictions = [v for v in model_container.model.predict(feature_matrix)]
-
-        return jsonify(
-            {
-                "success": True,
-                "features": params,
-                "prediction": f"{predictions[0]}",
-            }
-        )
+        # Encode the features and ask the model to do the prediction, letting
+        # the inference app batch us up with any concurrent requests
+        prediction = inference_app.predict(model_container.name, params)
+
+        with inference_app.metrics.span("hml_model_stage_seconds", (model_container.name, "serialise")):
+            return jsonify(
+                {
+                    "success": True,
+                    "features": params,
+                    "prediction": f"{prediction}",
+                }
+            )
     except Exception as ex:
         return jsonify({"success": False, "error": ex.args[0]})
         
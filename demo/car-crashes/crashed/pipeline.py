@@ -3,24 +3,37 @@ import click
 from typing import Dict, List
 from xgboost import XGBClassifier
 from hypermodel import hml
-from hypermodel.features import one_hot_encode
 from crashed.shared import BQ_TABLE_TRAINING, BQ_TABLE_TEST, MODEL_NAME
-from crashed.shared import build_feature_matrix
 
 
-@hml.op()
-@hml.pass_context
-def create_training(ctx):
-    services: GooglePlatformServices = ctx.obj["services"]
-    model_container = get_model_container(ctx)
-
+def training_query(model_container):
     column_string = ",".join(model_container.features_all)
 
-    query = f"""
+    return f"""
         SELECT {column_string}, {model_container.target}
         FROM crashed.crashes_raw 
         WHERE accident_date BETWEEN '2013-01-01' AND '2017-01-01' 
     """
+
+
+def test_query(model_container):
+    column_string = ",".join(model_container.features_all)
+
+    return f"""
+        SELECT {column_string}, {model_container.target}
+        FROM crashed.crashes_raw 
+        WHERE accident_date > '2018-01-01'
+    """
+
+
+# Let local runs skip re-creating a table when its query hasn't changed
+@hml.op(inputs=lambda ctx: {"query": training_query(get_model_container(ctx))})
+@hml.pass_context
+def create_training(ctx):
+    services: GooglePlatformServices = ctx.obj["services"]
+    model_container = get_model_container(ctx)
+
+    query = training_query(model_container)
     services.warehouse.select_into(
         query, services.config.warehouse_dataset, BQ_TABLE_TRAINING
     )
@@ -28,19 +41,13 @@ def create_training(ctx):
     logging.info(f"Wrote training set to {BQ_TABLE_TRAINING}.  Success!")
 
 
-@hml.op()
+@hml.op(inputs=lambda ctx: {"query": test_query(get_model_container(ctx))})
 @hml.pass_context
 def create_test(ctx):
     services: GooglePlatformServices = ctx.obj["services"]
     model_container = get_model_container(ctx)
 
-    column_string = ",".join(model_container.features_all)
-
-    query = f"""
-        SELECT {column_string}, {model_container.target}
-        FROM crashed.crashes_raw 
-        WHERE accident_date > '2018-01-01'
-    """
+    query = test_query(model_container)
     services.warehouse.select_into(
         query, services.config.warehouse_dataset, BQ_TABLE_TEST
     )
@@ -57,43 +64,38 @@ def train_model(ctx):
 
     print(model_container)
 
-    training_df = services.warehouse.dataframe_from_table(
+    # Find all our unique values for categorical features and
+    # distribution information for other features (the training table is
+    # read a chunk at a time, and not at all if it hasn't changed since the
+    # distributions were last analyzed)
+    model_container.analyze_table_distributions(
         services.config.warehouse_dataset, BQ_TABLE_TRAINING
     )
-    # training_df.to_csv("/mnt/c/data/crashed/training.csv")
-    # training_df = pd.read_csv("/mnt/c/data/crashed/training.csv")
-    logging.info("Got Training DataFrame!")
-
-    test_df = services.warehouse.dataframe_from_table(
-        services.config.warehouse_dataset, BQ_TABLE_TEST
-    )
-    # test_df.to_csv("/mnt/c/data/crashed/test.csv")
-    # test_df = pd.read_csv("/mnt/c/data/crashed/test.csv")
-    logging.info("Got Test DataFrame!")
-
-    # Find all our unique values for categorical features and
-    # distribution information for other features
-    model_container.analyze_distributions(training_df)
 
     # Train the model
-    model = train(model_container, training_df)
+    model = train(model_container, services)
 
     # Let out container know about the trained model
     model_container.bind_model(model)
 
-    # Run some evaluation against the model
-    evaluate_model(model_container, test_df)
+    # Run some evaluation against the model (the test set is only read from the
+    # warehouse if it is not already cached from an earlier attempt)
+    evaluate_model(model_container, services)
 
     # Publish this version of the model & data analysis
     ref = model_container.publish()
 
-    model_container.dump_reference(ref)
+    # Write the reference locally, and mark it as the current version in the
+    # DataLake, where inference apps polling the lake will pick it up
+    model_container.publish_reference(ref)
     # Create a merge request for this model to be deployed (don't do it here
     # because we don't want to polute the repository with merge requests relating
     # to test runs)
 
     # model_container.create_merge_request(ref, description="My new model")
-    return
+
+    # Returning the reference records it in the run log of local runs
+    return ref
 
 
 def get_model_container(ctx):
@@ -102,10 +104,11 @@ def get_model_container(ctx):
     return model_container
 
 
-def train(model_container, data_frame):
+def train(model_container, services):
     logging.info(f"training: {model_container.name}: train")
-    feature_matrix = build_feature_matrix(model_container, data_frame)
-    targets = data_frame[model_container.target]
+    feature_matrix, targets = model_container.build_training_matrix_for_table(
+        services.config.warehouse_dataset, BQ_TABLE_TRAINING
+    )
 
     classifier = XGBClassifier()
     model = classifier.fit(feature_matrix, targets, verbose=True)
@@ -113,11 +116,12 @@ def train(model_container, data_frame):
     return model
 
 
-def evaluate_model(model_container, data_frame):
+def evaluate_model(model_container, services):
     logging.info(f"training: {model_container.name}: evaluate_model")
 
-    test_feature_matrix = build_feature_matrix(model_container, data_frame)
-    test_targets = data_frame[model_container.target]
+    test_feature_matrix, test_targets = model_container.build_training_matrix_for_table(
+        services.config.warehouse_dataset, BQ_TABLE_TEST
+    )
 
     # Evaluate the model against the training data to get an idea of where we are at
     test_predictions = [v for v in model_container.model.predict(test_feature_matrix)]
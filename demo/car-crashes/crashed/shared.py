@@ -4,7 +4,6 @@ from typing import List, Dict
 import pandas as pd
 
 from hypermodel import hml
-from hypermodel.features import one_hot_encode
 
 from hypermodel.platform.gcp.services import GooglePlatformServices
 
@@ -58,26 +57,21 @@ def crashed_model_container(app:  hml.HmlApp):
 
 
 
-def build_feature_matrix(model_container, data_frame: pd.DataFrame, throw_on_missing=False):
+def build_feature_matrix(model_container, data_frame: pd.DataFrame, throw_on_missing=False, sparse_output=False):
     """
         Given an input dataframe, encode the categorical features (one-hot)
         and use the numeric features without change.  If we see a value in our
         dataframe, and "throw_on_missing" == True, then we will throw an exception
-        as the mapping back to the original matrix wont make sense.
+        as the mapping back to the original matrix wont make sense.  Set
+        "sparse_output" to get a scipy csr_matrix rather than a dense array.
     """
     logging.info(f"build_feature_matrix: {model_container.name}")
 
     # Now lets do the encoding thing...
-    encoded_df = one_hot_encode(
-        data_frame, model_container.feature_uniques, throw_on_missing=throw_on_missing
+    return model_container.build_training_matrix(
+        data_frame, throw_on_missing=throw_on_missing, sparse_output=sparse_output
     )
 
-    for nf in model_container.features_numeric:
-        encoded_df[nf] = data_frame[nf]
-
-    matrix = encoded_df.values
-    return matrix
-
 
 # Lets just create a dict of default features so that we dont have to make
 # the user specify a ton of parameters
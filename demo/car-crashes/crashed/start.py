@@ -12,7 +12,21 @@ def main():
         "package_name": "crashed",
         "script_name": "crashed",
         "container_url": "growingdata/demo-crashed:tez-test",
-        "port": 8000
+        "port": 8000,
+        # Merge concurrent /predict requests into a single call to the model
+        "micro_batching": True,
+        "micro_batch_max_size": 64,
+        "micro_batch_max_wait_ms": 5,
+        # Many requests collapse to the same features once the defaults are filled in
+        "prediction_cache": True,
+        "prediction_cache_max_size": 10000,
+        "prediction_cache_ttl_seconds": 3600,
+        # Swap in new versions of the model (published to the lake by `train_model`)
+        # without a restart
+        "model_reload_interval_seconds": 60,
+        "model_reload_source": "lake",
+        # Synthetic predictions each model makes before /readyz reports ready
+        "warm_up_records": 32,
     }
     # Create a reference to our "App" object which maintains state
     # about both the Inference and Pipeline phases of the model
@@ -82,8 +96,9 @@ def main():
         def predict():
             logging.info("api: /predict")
 
+            # Look the model up for each request, as it may have been reloaded
             feature_params = request.args.to_dict()
-            return inference.predict_alcohol(inference_app, model_container, feature_params)
+            return inference.predict_alcohol(inference_app, inference_app.get_model(shared.MODEL_NAME), feature_params)
 
 
     app.start()
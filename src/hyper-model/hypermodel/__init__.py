@@ -1,5 +1,13 @@
 from hypermodel.utilities.hm_shell import sh
-from hypermodel.kubeflow.deploy_dev import deploy_to_dev
 
 import logging
 import sys
+
+
+def __getattr__(name):
+    # `deploy_to_dev` needs kfp, so only import it when it is asked for
+    if name == "deploy_to_dev":
+        from hypermodel.kubeflow.deploy_dev import deploy_to_dev
+
+        return deploy_to_dev
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,2 +1,11 @@
-from hypermodel.features.numerical import scale_by_mean_stdev, describe_features
-from hypermodel.features.categorical import get_unique_feature_values, one_hot_encode
+from hypermodel.features.numerical import (
+    scale_by_mean_stdev,
+    describe_features,
+    get_mean_stdev,
+    scale_matrix,
+    unscale_matrix,
+    scale_features,
+    unscale_features,
+)
+from hypermodel.features.categorical import get_unique_feature_values, one_hot_encode, CategoricalEncoder
+from hypermodel.features.sketches import DistributionSketch, NumericSketch, UniqueValuesSketch, TDigest
@@ -2,41 +2,270 @@
 Helper functions for dealing with categorical features
 """
 
+import numpy as np
 import pandas as pd
-from typing import List, Dict
+from scipy import sparse
+from typing import Any, List, Dict
 
+from hypermodel.utilities.parallel import map_columns
 
-def get_unique_feature_values(dataframe: pd.DataFrame, features: List[str]) -> Dict[str, List[str]]:
+
+def get_unique_feature_values(dataframe: pd.DataFrame, features: List[str], workers: int = 1, use_processes=False) -> Dict[str, List[str]]:
     """
     Take a dataframe and a list of features, and for each feature find me all the unique
     values of that feature.  This is a useful step prior to one-hot encoding, as it gives
-    you a list of all the values we can expect to encode. 
+    you a list of all the values we can expect to encode.
 
     Args:
         dataframe (pd.DataFrame): The DataFrame to use to collect values
         features (List[str]): A list of all the Features we want to find the unique values of
+        workers (int): The number of features to analyze in parallel (1 analyzes them serially)
+        use_processes (bool): Analyze features in a pool of processes rather than threads
 
     Returns:
         A dictionary keyed by the name of each feature, containing a list of all that features
         unique values
     """
-    feature_uniques: Dict[str, List[str]] = dict()
-    for feature in features:
-        unique_features = dataframe[feature].unique()
-        feature_uniques[feature] = unique_features.tolist()
+    feature_uniques: Dict[str, List[str]] = map_columns(
+        _unique_values, dataframe, features, workers=workers, use_processes=use_processes
+    )
     return feature_uniques
 
 
+def _unique_values(series: pd.Series) -> List[str]:
+    return series.unique().tolist()
+
+
+class CategoricalEncoder:
+    """
+    A one-hot encoder compiled once from a `feature_uniques` dictionary (as
+    calculated by `get_unique_feature_values`).  Each feature value is mapped
+    to a fixed column index up front, so that encoding a DataFrame is a single
+    vectorized lookup per feature rather than a comparison per feature value.
+
+    Columns are ordered by feature and then by value, exactly as they appear
+    in `uniques`, giving the same layout as `one_hot_encode` has always produced.
+
+    Attributes:
+        features (List[str]): The names of the categorical features encoded
+        columns (List[str]): The name of each output column ("feature:value")
+        width (int): The total number of output columns
+    """
+    features: List[str]
+    columns: List[str]
+    width: int
+
+    def __init__(self, uniques: Dict[str, List[str]]):
+        """
+        Compile the value -> column index maps for each feature in `uniques`
+
+        Args:
+            uniques (Dict[str, List[str]]): A dict keyed by feature name, containing a list of unique values
+        """
+        self.features = list(uniques.keys())
+        self.columns = list()
+
+        # For every feature we keep an Index of the values we can look up (nulls
+        # never match with `==`, so they get a column but are never looked up),
+        # and the output column for each position in that Index.
+        self._lookups: Dict[str, pd.Index] = dict()
+        self._positions: Dict[str, np.ndarray] = dict()
+        self._has_null: Dict[str, bool] = dict()
+        self._value_maps: Dict[str, Dict[Any, int]] = dict()
+
+        offset = 0
+        for feature in self.features:
+            feature_value_list = uniques[feature]
+            lookup_values = list()
+            positions = list()
+            for i, feature_value in enumerate(feature_value_list):
+                self.columns.append(f"{feature}:{feature_value}")
+                if pd.isnull(feature_value):
+                    continue
+                lookup_values.append(feature_value)
+                positions.append(offset + i)
+
+            # `get_indexer` needs unique values, so values equal to an earlier one
+            # (e.g. 1.0 after 1) keep their column but are looked up as the first
+            lookups = pd.Index(lookup_values, dtype=object)
+            first = ~lookups.duplicated()
+            self._lookups[feature] = lookups[first]
+            self._positions[feature] = np.array(positions, dtype=np.int64)[first]
+            self._has_null[feature] = len(lookup_values) != len(feature_value_list)
+            self._value_maps[feature] = dict(zip(self._lookups[feature], self._positions[feature].tolist()))
+            offset += len(feature_value_list)
+
+        self.width = offset
+
+    def column_indexes(self, dataframe: pd.DataFrame, feature: str, throw_on_missing=False) -> np.ndarray:
+        """
+        Find the output column index of every row's value for `feature`, or -1 where
+        the value was not seen when this encoder was compiled.
+
+        Args:
+            dataframe (pd.DataFrame): The DataFrame to encode
+            feature (str): The name of the feature to look up
+            throw_on_missing (bool): Throw an Exception if an unseen value is found
+
+        Returns:
+            A numpy array (one entry per row) of output column indexes
+        """
+        values = dataframe[feature].to_numpy(dtype=object)
+        codes = self._lookups[feature].get_indexer(values)
+        missing = codes < 0
+
+        if throw_on_missing and missing.any():
+            unseen = missing & ~(pd.isnull(values) & self._has_null[feature])
+            if unseen.any():
+                s = values[unseen][0]
+                raise Exception(f"The value '{s}' has not been seen before in feature '{feature}', unable to one_hot_encode")
+
+        indexes = np.full(len(values), -1, dtype=np.int64)
+        indexes[~missing] = self._positions[feature][codes[~missing]]
+        return indexes
+
+    def encode(self, dataframe: pd.DataFrame, throw_on_missing=False, dtype=np.int64, out: np.ndarray = None) -> np.ndarray:
+        """
+        One-hot encode the categorical features of `dataframe` into a matrix
+
+        Args:
+            dataframe (pd.DataFrame): The DataFrame to encode
+            throw_on_missing (bool): If a value is found in the DataFrame which was not seen
+                when compiling this encoder, and this parameter is True, we will throw an Exception
+            dtype: The numpy dtype of the matrix to create (ignored if `out` is provided)
+            out (np.ndarray): An optional (rows x width) matrix to write the encoding into
+
+        Returns:
+            A numpy matrix with a "1" in the column of each row's feature value and "0" elsewhere
+        """
+        rows = len(dataframe)
+        if out is None:
+            out = np.zeros((rows, self.width), dtype=dtype)
+        else:
+            out[:] = 0
+
+        row_indexes = np.arange(rows)
+        for feature in self.features:
+            indexes = self.column_indexes(dataframe, feature, throw_on_missing=throw_on_missing)
+            found = indexes >= 0
+            out[row_indexes[found], indexes[found]] = 1
+
+        return out
+
+    def encode_row(self, record: Dict[str, Any], throw_on_missing=False, out: np.ndarray = None) -> np.ndarray:
+        """
+        One-hot encode a single record (e.g. the parameters of a prediction request)
+        using plain dictionary lookups, which is far cheaper than building a DataFrame
+        for just one row.
+
+        Args:
+            record (Dict[str, Any]): A dict keyed by feature name, containing that feature's value
+            throw_on_missing (bool): If a value is found in the record which was not seen
+                when compiling this encoder, and this parameter is True, we will throw an Exception
+            out (np.ndarray): An optional vector (of at least `width`) to write the encoding into
+
+        Returns:
+            A numpy vector with a "1" in the column of each of the record's feature values
+        """
+        if out is None:
+            out = np.zeros(self.width, dtype=np.int64)
+        else:
+            out[: self.width] = 0
+
+        for feature in self.features:
+            value = record.get(feature)
+            is_null = _is_null(value)
+            index = -1 if is_null else self._value_maps[feature].get(value, -1)
+            if index >= 0:
+                out[index] = 1
+            elif throw_on_missing and not (is_null and self._has_null[feature]):
+                raise Exception(f"The value '{value}' has not been seen before in feature '{feature}', unable to one_hot_encode")
+
+        return out
+
+    def encode_sparse(self, dataframe: pd.DataFrame, throw_on_missing=False, dtype=np.float64) -> sparse.csr_matrix:
+        """
+        One-hot encode the categorical features of `dataframe` into a sparse matrix, without
+        ever materialising the dense (rows x width) matrix.
+
+        Args:
+            dataframe (pd.DataFrame): The DataFrame to encode
+            throw_on_missing (bool): If a value is found in the DataFrame which was not seen
+                when compiling this encoder, and this parameter is True, we will throw an Exception
+            dtype: The numpy dtype of the values in the matrix
+
+        Returns:
+            A `scipy.sparse.csr_matrix` with a "1" in the column of each row's feature value
+        """
+        row_indexes, column_indexes = self.sparse_indexes(dataframe, throw_on_missing=throw_on_missing)
+        data = np.ones(len(row_indexes), dtype=dtype)
+        return sparse.csr_matrix((data, (row_indexes, column_indexes)), shape=(len(dataframe), self.width))
+
+    def sparse_indexes(self, dataframe: pd.DataFrame, throw_on_missing=False):
+        """
+        Find the (row, column) coordinates of every "1" in the one-hot encoding of `dataframe`
+
+        Args:
+            dataframe (pd.DataFrame): The DataFrame to encode
+            throw_on_missing (bool): Throw an Exception if an unseen value is found
+
+        Returns:
+            A tuple of numpy arrays (row_indexes, column_indexes)
+        """
+        all_rows = np.arange(len(dataframe))
+        rows = list()
+        columns = list()
+        for feature in self.features:
+            indexes = self.column_indexes(dataframe, feature, throw_on_missing=throw_on_missing)
+            found = indexes >= 0
+            rows.append(all_rows[found])
+            columns.append(indexes[found])
+
+        if len(rows) == 0:
+            return (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+
+        return (np.concatenate(rows), np.concatenate(columns))
+
+    def transform(self, dataframe: pd.DataFrame, throw_on_missing=False) -> pd.DataFrame:
+        """
+        One-hot encode the categorical features of `dataframe` into a new DataFrame
+
+        Args:
+            dataframe (pd.DataFrame): The DataFrame to encode
+            throw_on_missing (bool): If a value is found in the DataFrame which was not seen
+                when compiling this encoder, and this parameter is True, we will throw an Exception
+
+        Returns:
+            A new DataFrame with a "feature:value" column for each known value
+        """
+        matrix = self.encode(dataframe, throw_on_missing=throw_on_missing)
+        return pd.DataFrame(matrix, columns=self.columns, index=dataframe.index)
+
+
+def _is_null(value: Any) -> bool:
+    # `pd.isna` copes with pd.NA and NaT (where `value != value` can't be a bool),
+    # but returns an array for list-like values, which are never null
+    if value is None:
+        return True
+    try:
+        return bool(pd.isna(value))
+    except (TypeError, ValueError):
+        return False
+
+
 def one_hot_encode(dataframe: pd.DataFrame, uniques: Dict[str, List[str]], throw_on_missing=False) -> pd.DataFrame:
     """
     Create a new dataframe that one-hot-encodes values from the given dataframe
     against the known list of unique feature values (calculated using `get_unique_feature_values`).
 
+    When encoding repeatedly against the same `uniques`, build a `CategoricalEncoder`
+    once and re-use it instead.
+
     Args:
         dataframe (pd.DataFrame): The DataFrame to use to collect values
         uniques (Dict[str, List[str]]): A dict keyed by feature name, containing a list of unique values
         throw_on_missing (bool): If a value is found in the DataFrame which is missing from the
-            `uniques` dict(), and this parameter is True, we will throw an Exception to prevent 
+            `uniques` dict(), and this parameter is True, we will throw an Exception to prevent
             further execution.  When encoding unseen data against known data, this can be useful
             to ensure you are not predicting using unseen data.
     Returns:
@@ -44,21 +273,4 @@ def one_hot_encode(dataframe: pd.DataFrame, uniques: Dict[str, List[str]], throw
         the row contains the features value, and a "0" where it does not
 
     """
-    new_frame = pd.DataFrame()
-    for feature in uniques:
-        feature_value_list = uniques[feature]
-
-        # Validate that our values are actually in our seen set
-        if throw_on_missing:
-            sample_uniques = dataframe[feature].unique()
-            for s in sample_uniques:
-                if s not in feature_value_list:
-                    raise Exception(f"The value '{s}' has not been seen before in feature '{feature}', unable to one_hot_encode")
-
-
-        for feature_value in feature_value_list:
-            # Track a new column list that gets a "1" if it matches and "0" otherwise
-            one_hot_col = (dataframe[feature] == feature_value).astype(int)
-            new_frame[f"{feature}:{feature_value}"] = one_hot_col
-
-    return new_frame
+    return CategoricalEncoder(uniques).transform(dataframe, throw_on_missing=throw_on_missing)
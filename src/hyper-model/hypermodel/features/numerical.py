@@ -1,7 +1,10 @@
 
+import numpy as np
 import pandas as pd
 import logging
-from typing import List, Dict
+from typing import List, Dict, Tuple
+
+from hypermodel.utilities.parallel import map_columns
 
 
 def scale_by_mean_stdev(dataframe: pd.DataFrame, feature: str, mean: float, stdev: float) -> pd.DataFrame:
@@ -17,12 +20,123 @@ def scale_by_mean_stdev(dataframe: pd.DataFrame, feature: str, mean: float, stde
     Returns:
         The adjusted dataframe passed in
     """
-    dataframe[feature] = dataframe[feature].apply(lambda x: (x-mean) / stdev)
+    dataframe[feature] = (dataframe[feature] - mean) / stdev
 
     return dataframe
 
 
-def describe_features(dataframe: pd.DataFrame, features: List[str]):
+def get_mean_stdev(features: List[str], feature_summaries: Dict[str, Dict[str, float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Look up the mean and standard deviation of each feature from `feature_summaries`
+    (as calculated by `describe_features`)
+
+    Args:
+        features (List[str]): The name of the features to look up
+        feature_summaries (Dict[str, Dict[str, float]]): The summary statistics of each feature
+
+    Returns:
+        A tuple of numpy arrays (means, stdevs), in the same order as `features`
+    """
+    means = np.array([feature_summaries[f]["mean"] for f in features], dtype=np.float64)
+    stdevs = np.array([feature_summaries[f]["std"] for f in features], dtype=np.float64)
+    return (means, stdevs)
+
+
+def scale_matrix(matrix: np.ndarray, means: np.ndarray, stdevs: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Scale every column of `matrix` by its mean / stdev in one vectorized operation.
+    Pass `out=matrix` to scale in place.
+
+    Args:
+        matrix (np.ndarray): A (rows x features) matrix of values
+        means (np.ndarray): The mean of each column
+        stdevs (np.ndarray): The standard deviation of each column
+        out (np.ndarray): An optional matrix (of the same shape) to write the scaled values to
+
+    Returns:
+        The scaled matrix (`out`, if it was provided)
+    """
+    dtype = out.dtype if out is not None else np.result_type(matrix.dtype, np.float32)
+    out = np.subtract(matrix, means.astype(dtype), out=out, dtype=dtype)
+    return np.divide(out, stdevs.astype(dtype), out=out)
+
+
+def unscale_matrix(matrix: np.ndarray, means: np.ndarray, stdevs: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Reverse `scale_matrix`, restoring every column of `matrix` to its original scale.
+    Pass `out=matrix` to unscale in place.
+
+    Args:
+        matrix (np.ndarray): A (rows x features) matrix of scaled values
+        means (np.ndarray): The mean of each column
+        stdevs (np.ndarray): The standard deviation of each column
+        out (np.ndarray): An optional matrix (of the same shape) to write the values to
+
+    Returns:
+        The unscaled matrix (`out`, if it was provided)
+    """
+    dtype = out.dtype if out is not None else np.result_type(matrix.dtype, np.float32)
+    out = np.multiply(matrix, stdevs.astype(dtype), out=out, dtype=dtype)
+    return np.add(out, means.astype(dtype), out=out)
+
+
+def scale_features(
+    dataframe: pd.DataFrame,
+    features: List[str],
+    feature_summaries: Dict[str, Dict[str, float]],
+    dtype=np.float32,
+    out: np.ndarray = None,
+) -> np.ndarray:
+    """
+    Build a matrix of the given `features`, scaled by the mean / stdev recorded for each
+    feature in `feature_summaries`.  The values are copied once (into `out`, if provided)
+    and then scaled in place.
+
+    Args:
+        dataframe (pd.DataFrame): The dataframe holding the features
+        features (List[str]): The name of the features (columns in dataframe) to scale
+        feature_summaries (Dict[str, Dict[str, float]]): The summary statistics of each feature
+        dtype: The numpy dtype of the matrix to create (ignored if `out` is provided)
+        out (np.ndarray): An optional (rows x features) matrix to write the scaled values to
+
+    Returns:
+        A (rows x features) numpy matrix of scaled values
+    """
+    means, stdevs = get_mean_stdev(features, feature_summaries)
+
+    if out is None:
+        # Always copy: when the columns are already `dtype`, pandas may hand back a
+        # read-only view of the dataframe, which we can't scale in place
+        out = dataframe[features].to_numpy(dtype=dtype, copy=True)
+    else:
+        out[:] = dataframe[features].to_numpy()
+
+    return scale_matrix(out, means, stdevs, out=out)
+
+
+def unscale_features(
+    matrix: np.ndarray,
+    features: List[str],
+    feature_summaries: Dict[str, Dict[str, float]],
+    out: np.ndarray = None,
+) -> np.ndarray:
+    """
+    Reverse `scale_features`, restoring a matrix of scaled `features` to their original scale
+
+    Args:
+        matrix (np.ndarray): A (rows x features) matrix of scaled values
+        features (List[str]): The name of the feature in each column of the matrix
+        feature_summaries (Dict[str, Dict[str, float]]): The summary statistics of each feature
+        out (np.ndarray): An optional matrix to write the values to (pass `matrix` to work in place)
+
+    Returns:
+        A (rows x features) numpy matrix of unscaled values
+    """
+    means, stdevs = get_mean_stdev(features, feature_summaries)
+    return unscale_matrix(matrix, means, stdevs, out=out)
+
+
+def describe_features(dataframe: pd.DataFrame, features: List[str], workers: int = 1, use_processes=False):
     """
     Return a dictionary keyed with the name of a feature and containing
     that features summary statistics.
@@ -30,15 +144,25 @@ def describe_features(dataframe: pd.DataFrame, features: List[str]):
     Args:
         dataframe (pd.DataFrame): The dataframe to adjust values with
         features (List[str]): The name of the features (columns in dataframe) to analyze
+        workers (int): The number of features to analyze in parallel (1 analyzes them serially)
+        use_processes (bool): Analyze features in a pool of processes rather than threads
 
     Returns:
         A dictionary keyed by the feature name, containing summary statistics of
         the values of that feature.
 
     """
-    feature_summaries = dict()
-    for f in features:
-        logging.info(f"Analyzing: {f}")
-        feature_summaries[f] = dataframe[f].describe().to_dict()
+    feature_summaries = map_columns(
+        _describe,
+        dataframe,
+        features,
+        workers=workers,
+        use_processes=use_processes,
+        on_column=lambda f: logging.info(f"Analyzing: {f}"),
+    )
 
     return feature_summaries
+
+
+def _describe(series: pd.Series) -> Dict:
+    return series.describe().to_dict()
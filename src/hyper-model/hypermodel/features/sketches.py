@@ -0,0 +1,294 @@
+"""
+Mergeable summaries of feature distributions, which can be updated a chunk of
+data at a time (so tables larger than memory can be analyzed) and merged across
+workers, before being turned into the same `feature_uniques` and `feature_summaries`
+that `get_unique_feature_values` and `describe_features` produce.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List
+
+
+class UniqueValuesSketch:
+    """
+    Tracks every unique value of a categorical feature (in order of first appearance)
+    along with the number of times each value was seen.
+    """
+
+    def __init__(self):
+        self.counts: Dict[Any, int] = dict()
+        # Nulls never equal each other, so they are tracked under a single key
+        self._null_value: Any = None
+
+    def update(self, series: pd.Series):
+        """
+        Add the values in `series` to the sketch
+
+        Args:
+            series (pd.Series): The next chunk of values of the feature
+
+        Returns:
+            A reference to self
+        """
+        codes, uniques = pd.factorize(series)
+        uniques = list(uniques)
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+
+        is_null = codes < 0
+        if is_null.any():
+            # Slot the null in where it first appeared, as `Series.unique()` would
+            first_null = int(np.argmax(is_null))
+            position = int(codes[:first_null].max()) + 1 if first_null > 0 else 0
+            uniques.insert(position, series.iloc[first_null])
+            counts = np.insert(counts, position, int(is_null.sum()))
+
+        for value, count in zip(uniques, counts):
+            self._add(value, int(count))
+
+        return self
+
+    def merge(self, other: "UniqueValuesSketch"):
+        """
+        Merge the values seen by `other` into this sketch
+
+        Args:
+            other (UniqueValuesSketch): The sketch to merge
+
+        Returns:
+            A reference to self
+        """
+        for key, count in other.counts.items():
+            self._add(other._null_value if key is _NULL else key, count)
+        return self
+
+    def values(self) -> List[Any]:
+        """
+        Get all the unique values seen, in order of first appearance
+        """
+        return [self._null_value if key is _NULL else key for key in self.counts]
+
+    def _add(self, value: Any, count: int):
+        key = value
+        if pd.isnull(value):
+            key = _NULL
+            if _NULL not in self.counts:
+                self._null_value = value
+        self.counts[key] = self.counts.get(key, 0) + count
+
+
+class TDigest:
+    """
+    A merging t-digest (Dunning & Ertl) for estimating quantiles of a numeric
+    feature in bounded memory.  While it holds fewer than `buffer_size` values
+    the digest keeps every value and its quantiles are exact.
+    """
+
+    def __init__(self, compression: float = 200, buffer_size: int = 10000):
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self.means = np.empty(0, dtype=np.float64)
+        self.weights = np.empty(0, dtype=np.float64)
+        self.is_exact = True
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def update(self, values: np.ndarray):
+        """
+        Add `values` (which should not contain NaNs) to the digest
+
+        Returns:
+            A reference to self
+        """
+        values = np.asarray(values, dtype=np.float64)
+        self._add(values, np.ones(len(values)), is_exact=True)
+        return self
+
+    def merge(self, other: "TDigest"):
+        """
+        Merge the centroids of `other` into this digest
+
+        Returns:
+            A reference to self
+        """
+        self._add(other.means, other.weights, is_exact=other.is_exact)
+        return self
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate the `q` quantile (0 <= q <= 1), interpolating linearly
+        between values in the same way as `pd.Series.quantile`.
+        """
+        if len(self.means) == 0:
+            return np.nan
+
+        if self.is_exact:
+            return float(np.quantile(self.means, q))
+
+        # Interpolate between the centres of each centroid, anchored at the extremes
+        total = self.count
+        centres = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0], centres, [total]])
+        means = np.concatenate([[self.means[0]], self.means, [self.means[-1]]])
+        return float(np.interp(q * total, positions, means))
+
+    def _add(self, means: np.ndarray, weights: np.ndarray, is_exact: bool):
+        self.means = np.concatenate([self.means, means])
+        self.weights = np.concatenate([self.weights, weights])
+        self.is_exact = self.is_exact and is_exact
+
+        order = np.argsort(self.means, kind="mergesort")
+        self.means = self.means[order]
+        self.weights = self.weights[order]
+
+        if not self.is_exact or len(self.means) > self.buffer_size:
+            self._compress()
+
+    def _compress(self):
+        # Group neighbouring centroids whose centres fall within the same unit of
+        # the k1 scale function, which keeps centroids small near the tails
+        total = self.weights.sum()
+        q = (np.cumsum(self.weights) - self.weights / 2) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        buckets = np.floor(k - k[0]).astype(np.int64)
+        _, buckets = np.unique(buckets, return_inverse=True)
+
+        weights = np.bincount(buckets, weights=self.weights)
+        self.means = np.bincount(buckets, weights=self.means * self.weights) / weights
+        self.weights = weights
+        self.is_exact = False
+
+
+class NumericSketch:
+    """
+    Tracks the count, mean and variance (using Welford / Chan's parallel algorithm),
+    minimum, maximum and quantiles of a numeric feature.
+    """
+
+    def __init__(self, compression: float = 200):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+        self.digest = TDigest(compression=compression)
+
+    def update(self, series: pd.Series):
+        """
+        Add the values in `series` to the sketch, ignoring nulls
+
+        Args:
+            series (pd.Series): The next chunk of values of the feature
+
+        Returns:
+            A reference to self
+        """
+        values = pd.to_numeric(series).to_numpy(dtype=np.float64, na_value=np.nan)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+
+        chunk_mean = float(values.mean())
+        self._combine(len(values), chunk_mean, float(((values - chunk_mean) ** 2).sum()))
+        self.min = float(np.fmin(self.min, values.min()))
+        self.max = float(np.fmax(self.max, values.max()))
+        self.digest.update(values)
+        return self
+
+    def merge(self, other: "NumericSketch"):
+        """
+        Merge the values seen by `other` into this sketch
+
+        Args:
+            other (NumericSketch): The sketch to merge
+
+        Returns:
+            A reference to self
+        """
+        if other.count == 0:
+            return self
+
+        self._combine(other.count, other.mean, other.m2)
+        self.min = float(np.fmin(self.min, other.min))
+        self.max = float(np.fmax(self.max, other.max))
+        self.digest.merge(other.digest)
+        return self
+
+    def describe(self) -> Dict[str, float]:
+        """
+        Summarise the feature with the same statistics as `pd.Series.describe()`
+        """
+        std = np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+        return {
+            "count": float(self.count),
+            "mean": self.mean if self.count > 0 else np.nan,
+            "std": float(std),
+            "min": self.min,
+            "25%": self.digest.quantile(0.25),
+            "50%": self.digest.quantile(0.5),
+            "75%": self.digest.quantile(0.75),
+            "max": self.max,
+        }
+
+    def _combine(self, count: int, mean: float, m2: float):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+
+class DistributionSketch:
+    """
+    The `UniqueValuesSketch` of every categorical feature and `NumericSketch` of every
+    numeric feature of a model, which together build `feature_uniques` and `feature_summaries`.
+    """
+
+    def __init__(self, features_categorical: List[str], features_numeric: List[str]):
+        self.uniques = {f: UniqueValuesSketch() for f in features_categorical}
+        self.numerics = {f: NumericSketch() for f in features_numeric}
+
+    def update(self, dataframe: pd.DataFrame):
+        """
+        Add the next chunk of data to the sketch
+
+        Args:
+            dataframe (pd.DataFrame): A DataFrame containing every feature
+
+        Returns:
+            A reference to self
+        """
+        for f, sketch in self.uniques.items():
+            sketch.update(dataframe[f])
+        for f, numeric_sketch in self.numerics.items():
+            numeric_sketch.update(dataframe[f])
+        return self
+
+    def merge(self, other: "DistributionSketch"):
+        """
+        Merge a sketch of other data (e.g. built by another worker) into this one
+
+        Returns:
+            A reference to self
+        """
+        for f, sketch in self.uniques.items():
+            sketch.merge(other.uniques[f])
+        for f, numeric_sketch in self.numerics.items():
+            numeric_sketch.merge(other.numerics[f])
+        return self
+
+    def feature_uniques(self) -> Dict[str, List[Any]]:
+        return {f: sketch.values() for f, sketch in self.uniques.items()}
+
+    def feature_summaries(self) -> Dict[str, Dict[str, float]]:
+        return {f: sketch.describe() for f, sketch in self.numerics.items()}
+
+
+class _Null:
+    def __repr__(self):
+        return "<null>"
+
+
+_NULL = _Null()
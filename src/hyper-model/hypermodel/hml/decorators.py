@@ -1,20 +1,23 @@
 import logging
 import click
-import kfp.dsl as dsl
 from hypermodel.hml.hml_container_op import HmlContainerOp
 from hypermodel.hml.hml_app import HmlApp
 from hypermodel.hml.hml_inference_app import HmlInferenceApp
 from hypermodel.hml.hml_pipeline_app import HmlPipelineApp
-from flask import Flask
 from typing import List, Dict
 
 
-def op():
+def op(inputs=None):
     """
     Here we are going to wrap the function that we are trying to execute
     so that we can get meta-data about the function such as its command
     names, so that we can tell the ContainerOp how to execute this function
-    when deployed.  This also lets us bind the CLI commands effectively
+    when deployed.  This also lets us bind the CLI commands effectively.
+
+    An op may declare its `inputs`: a function taking the click context and
+    returning a dict of everything that determines what the op produces (e.g.
+    its query text).  `run-all` then skips the op when its inputs (and those of
+    the ops it depends on) are unchanged since its last successful run.
     """
 
     def _register(func):
@@ -23,7 +26,7 @@ def op():
             if len(args) > 0:
                 raise Exception("You may only invoke an @hml.op with named arguments")
 
-            hml_op = HmlContainerOp(func, kwargs)
+            hml_op = HmlContainerOp(func, kwargs, inputs=inputs)
 
             return hml_op.op
 
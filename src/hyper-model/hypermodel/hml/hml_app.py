@@ -1,13 +1,10 @@
 
 import click
 from typing import Dict
-from kfp import dsl
 from hypermodel.hml.hml_pipeline_app import HmlPipelineApp
 from hypermodel.hml.hml_inference_app import HmlInferenceApp
 from hypermodel.hml.model_container import ModelContainer
 
-from hypermodel.platform.gcp.services import GooglePlatformServices
-
 
 # This is the default `click` entrypoint for kicking off the command line
 
@@ -35,8 +32,15 @@ class HmlApp():
         pass
 
     def get_services(self, platform):
+        # Each platform's SDKs (e.g. google-cloud) are only imported once it is selected
         if platform == "GCP":
+            from hypermodel.platform.gcp.services import GooglePlatformServices
+
             return GooglePlatformServices()
+        if platform == "local":
+            from hypermodel.platform.local.services import LocalServices
+
+            return LocalServices()
 
     def start(self):
         context = {
@@ -1,16 +1,19 @@
+import functools
+import json
 import logging
+import os
 import click
 
-from typing import Dict, List
-from kubernetes.client.models import V1EnvVar
-from kubernetes import client as k8s_client
-from kfp import dsl
-from kfp.gcp import use_gcp_secret
+from typing import Any, Callable, Dict, List
 from hypermodel.utilities.k8s import sanitize_k8s_name
 
 _current_pipeline = None
 _old_pipeline = None
 
+# The environment variable naming the file that an op run from the command line
+# writes whatever it returns to (set when `HmlPipeline` runs the op in a subprocess)
+OUTPUTS_PATH_ENV = "HML_OP_OUTPUTS_PATH"
+
 
 def _pipeline_enter(pipeline):
     global _current_pipeline
@@ -35,22 +38,30 @@ class HmlContainerOp(object):
     has been installed, and has a script based entrypoint
     """
 
-    def __init__(self, func, kwargs):
+    def __init__(self, func, kwargs, inputs: Callable[[click.Context], Dict[str, Any]] = None):
         """
         Create a new ``HmlContainerOp``
 
         Args:
             func (Callable): The function to execute
+            inputs (Callable): Returns everything (other than its upstream ops) that
+                determines what the op produces, given the click context, so that local
+                runs can skip the op when none of it has changed
         """
         self.func = func
         self.name = func.__name__
         self.k8s_name = sanitize_k8s_name(self.name)
         self.kwargs = kwargs
+        self.inputs = inputs
 
         # Store a reference to the current pipeline
         self.pipeline = _current_pipeline
         print (f"HmlContainerOp() {self.name} -> {_current_pipeline.name}")
 
+        # kfp (and kubernetes) are imported as the ops are bound, rather than with
+        # the module, so that importing `hml` doesn't pay for them
+        from kfp import dsl
+
         self.op = dsl.ContainerOp(
             name=f"{self.name}",
             image=self.pipeline.config["container_url"],
@@ -62,7 +73,7 @@ class HmlContainerOp(object):
         # Create our command, but it won't be bound to a group
         # at this point, we will need for someone else to use this
         # later (e.g. at the Compile step)
-        self.cli_command = click.command(name=self.name)(self.func)
+        self.cli_command = click.command(name=self.name)(self._command_func())
 
         self.pipeline._add_op(self)
 
@@ -73,6 +84,32 @@ class HmlContainerOp(object):
         """
         return self.func(**self.kwargs)
 
+    def _command_func(self) -> Callable:
+        @functools.wraps(self.func)
+        def command(*args, **kwargs):
+            outputs = self.func(*args, **kwargs)
+
+            outputs_path = os.environ.get(OUTPUTS_PATH_ENV)
+            if outputs_path is not None:
+                with open(outputs_path, "w") as f:
+                    json.dump(outputs, f, default=str)
+            return outputs
+
+        # click consumes the params it finds on the function, so leave the op's own alone
+        if hasattr(self.func, "__click_params__"):
+            command.__click_params__ = list(self.func.__click_params__)
+        return command
+
+    def cache_inputs(self) -> Dict[str, Any]:
+        """
+        Get the inputs that the op declared (see `__init__`), or None if the op
+        did not declare its inputs (and so must always run)
+        """
+        if self.inputs is None:
+            return None
+
+        return self.inputs(click.get_current_context(silent=True))
+
     def with_image(self, container_image_url: str):
         """
         Set information about which container to use 
@@ -103,6 +140,8 @@ class HmlContainerOp(object):
         return self
 
     def with_secret(self, secret_name: str, mount_path: str):
+        from kubernetes import client as k8s_client
+
         volume_name = secret_name
 
         self.op.add_volume(
@@ -122,6 +161,8 @@ class HmlContainerOp(object):
         return self
 
     def with_gcp_auth(self, secret_name):
+        from kfp.gcp import use_gcp_secret
+
         self.op.apply(use_gcp_secret(secret_name))
         return self
 
@@ -130,6 +171,8 @@ class HmlContainerOp(object):
         Bind an environment variable and value for the container
         to use at runtime
         """
+        from kubernetes.client.models import V1EnvVar
+
         self.op.container.add_env_variable(V1EnvVar(name=variable_name, value=str(value)))
         return self
 
@@ -137,6 +180,8 @@ class HmlContainerOp(object):
         """
         Bind an empty, writable directory
         """
+        from kubernetes import client as k8s_client
+
         # Add a writable volume
         self.op.add_volume(
             k8s_client.V1Volume(
@@ -1,11 +1,13 @@
 import logging
 import json
+import os
 import click
+import threading
 
-from flask import Flask, send_file
-from waitress import serve
-
-from hypermodel.hml.prediction.routes.health import bind_health_routes
+from hypermodel.hml.prediction.metrics import Metrics, BATCH_SIZE_BUCKETS
+from hypermodel.hml.prediction.micro_batcher import MicroBatcher
+from hypermodel.hml.prediction.prediction_cache import PredictionCache
+from hypermodel.hml.prediction.model_reloader import ModelReloader
 
 
 class HmlInferenceApp:
@@ -23,13 +25,62 @@ class HmlInferenceApp:
         """
         self.models = dict()
         self.name = name
-        self.flask = Flask(__name__)
+        self._flask = None
+        self._asgi = None
         self.port = 8000
         if "port" in config:
             self.port = int(config["port"])
 
-        # Bind my health related endpoints
-        bind_health_routes(self.flask)
+        # Production server: the number of worker processes, the threads in each,
+        # and how many requests a worker serves before it is recycled (0 is never)
+        self.workers = int(config.get("workers", 1))
+        self.threads = int(config.get("threads", 4))
+        self.max_requests = int(config.get("max_requests", 0))
+        self.graceful_timeout = float(config.get("graceful_timeout", 30))
+
+        # Optionally merge concurrent calls to `predict` into batches
+        self.micro_batching = bool(config.get("micro_batching", False))
+        self.micro_batch_max_size = int(config.get("micro_batch_max_size", 64))
+        self.micro_batch_max_wait_ms = float(config.get("micro_batch_max_wait_ms", 5))
+        self.batchers = dict()
+
+        # Optionally cache predictions by their features (per model, cleared when
+        # a new version of the model is loaded)
+        self.prediction_cache = bool(config.get("prediction_cache", False))
+        self.prediction_cache_max_size = int(config.get("prediction_cache_max_size", 10000))
+        self.prediction_cache_ttl_seconds = float(config.get("prediction_cache_ttl_seconds", 0))
+        self.caches = dict()
+
+        # Optionally poll for new versions of our models (0 is never), and swap
+        # them in without a restart
+        self.model_reload_interval_seconds = float(config.get("model_reload_interval_seconds", 0))
+        self.model_reloader = None
+        if self.model_reload_interval_seconds > 0:
+            self.model_reloader = ModelReloader(
+                self,
+                interval_seconds=self.model_reload_interval_seconds,
+                source=config.get("model_reload_source", "file"),
+            )
+
+        # Load models memory-mapped (e.g. "r"), so that worker processes share them
+        self.model_mmap_mode = config.get("model_mmap_mode", None)
+        self.is_initialised = False
+
+        # The number of synthetic records each model predicts before we report
+        # that we are ready for traffic (0 only builds each model's encoder).  Models
+        # are warmed up in the background once we are serving, so that `/readyz`
+        # answers (with a 503) in the meantime
+        self.warm_up_records = int(config.get("warm_up_records", 16))
+
+        # Which server serves the Flask app: "flask" (Waitress) or "asgi" (uvicorn,
+        # holding connections on an event loop, with requests run on a pool of
+        # `threads` threads)
+        self.server = config.get("server", "flask")
+        if self.server not in ("flask", "asgi"):
+            raise Exception(f"HmlInferenceApp: Unknown server '{self.server}', expected 'flask' or 'asgi'")
+
+        # Latency / throughput of requests and of each stage of a prediction
+        self.metrics = self._create_metrics()
 
         # Bind my cli commands for inference
         self.cli_root = cli
@@ -57,6 +108,22 @@ class HmlInferenceApp:
 
         """
         self.models[model_container.name] = model_container
+        if self.model_mmap_mode is not None:
+            model_container.mmap_mode = self.model_mmap_mode
+
+        if self.micro_batching:
+            self.batchers[model_container.name] = MicroBatcher(
+                model_container.name,
+                self._predict_batch,
+                max_batch_size=self.micro_batch_max_size,
+                max_wait_ms=self.micro_batch_max_wait_ms,
+            )
+
+        if self.prediction_cache:
+            self.caches[model_container.name] = PredictionCache(
+                max_size=self.prediction_cache_max_size,
+                ttl_seconds=self.prediction_cache_ttl_seconds,
+            )
         return model_container
 
 
@@ -64,11 +131,43 @@ class HmlInferenceApp:
         self.config_callbacks.append(func)
 
     def _initialise(self):
-        
+        """
+        Run the `on_init` callbacks (which load models and bind routes), swap in
+        any newer version of each model (when reloading models) and build each loaded
+        model's encoder, once only, so that models can be loaded in a parent process
+        before it forks its workers.
+        """
+        if self.is_initialised:
+            return
+
         logging.info(f"HmlInferenceApp._initialize()")
         for callback in self.config_callbacks:
             callback(self)
 
+        if self.model_reloader is not None:
+            # Models are warmed up in each serving process (see `_start_serving`)
+            self.model_reloader.check(warm_up=False)
+
+        for model_container in self.models.values():
+            if self._is_model_loaded(model_container):
+                model_container.get_encoder()
+        self.is_initialised = True
+
+    def is_ready(self):
+        """
+        Whether we are ready to serve predictions: every registered model has been
+        loaded and warmed up (in this process).
+
+        Returns:
+            True if we are ready for traffic
+        """
+        return self.is_initialised and all(
+            self._is_model_loaded(m) and m.is_warm for m in self.models.values()
+        )
+
+    def _is_model_loaded(self, model_container):
+        return model_container.is_loaded or getattr(model_container, "model", None) is not None
+
     def get_model(self, name):
         """
         Get a reference to a model with the given name, retuning None
@@ -87,6 +186,133 @@ class HmlInferenceApp:
 
         return None
 
+    def predict(self, name, record):
+        """
+        Make a prediction for a single `record` using the model with the given name.
+        When `micro_batching` is enabled in the config, concurrent calls are merged
+        into a single call to the model's `predict` (of at most `micro_batch_max_size`
+        records, waiting at most `micro_batch_max_wait_ms` for a batch to fill).
+        When `prediction_cache` is enabled, predictions are cached by the record's
+        features and the md5 of the model that made them.
+
+        Args:
+            name (str): The name of the model
+            record (Dict[str, Any]): A dict keyed by feature name
+
+        Returns:
+            The prediction for the record
+        """
+        model_container = self.models[name]
+        cache = self.caches.get(name)
+        if cache is None or model_container.model_md5 is None:
+            return self._predict(model_container, record)[0]
+
+        key = PredictionCache.key(record)
+        hit, prediction = cache.get(model_container.model_md5, key)
+        if not hit:
+            prediction, version = self._predict(model_container, record)
+            cache.put(version, key, prediction)
+        return prediction
+
+    def _predict(self, model_container, record):
+        """
+        Returns:
+            A tuple of the prediction and the md5 of the model that made it
+        """
+        if model_container.name in self.batchers:
+            prediction = self.batchers[model_container.name].submit(model_container, record)
+        else:
+            prediction = self._predict_batch(model_container, [record])[0]
+        return (prediction, model_container.model_md5)
+
+    def predict_batch(self, name, records):
+        """
+        Make a prediction for each of the `records` using the model with the given
+        name, in a single call to the model's `predict`.
+
+        Args:
+            name (str): The name of the model
+            records (List[Dict[str, Any]]): A list of dicts keyed by feature name
+
+        Returns:
+            A list of predictions, in the same order as `records`
+        """
+        return self._predict_batch(self.models[name], records)
+
+    def _predict_batch(self, model_container, records):
+        labels = (model_container.name,)
+        self.metrics.observe("hml_model_batch_size", labels, len(records))
+        try:
+            predictions = model_container.predict_batch(
+                records,
+                timer=lambda stage: self.metrics.span("hml_model_stage_seconds", labels + (stage,)),
+            )
+        except Exception:
+            self.metrics.inc("hml_model_errors_total", labels)
+            raise
+
+        self.metrics.inc("hml_model_predictions_total", labels, len(records))
+        return predictions
+
+    def swap_model(self, model_container, warm_up: bool = True):
+        """
+        Replace the registered model of the same name with `model_container` (a
+        newly loaded version of it), warming it up first if it hasn't been already.
+        Requests that already hold the old version finish with it, while new
+        requests use the new version.
+
+        Args:
+            model_container (ModelContainer): The newly loaded model
+            warm_up (bool): Warm up the model before swapping it in, if it isn't already
+        """
+        if warm_up and not model_container.is_warm:
+            model_container.warm_up(self.warm_up_records)
+
+        self.models[model_container.name] = model_container
+
+    def get_cache_stats(self):
+        """
+        Get the size and hit / miss counts of each model's prediction cache
+
+        Returns:
+            A dict keyed by model name of `PredictionCache.stats()`
+        """
+        return {name: cache.stats() for name, cache in self.caches.items()}
+
+    @property
+    def flask(self):
+        """
+        The Flask app serving predictions, created (with our health, batch and
+        metrics routes bound) when it is first used, so that only processes that
+        serve predictions import Flask
+        """
+        if self._flask is None:
+            from flask import Flask
+            from hypermodel.hml.prediction.routes.health import bind_health_routes
+            from hypermodel.hml.prediction.routes.batch import bind_batch_routes
+            from hypermodel.hml.prediction.routes.metrics import bind_metrics_routes
+
+            self._flask = Flask(__name__)
+            bind_health_routes(self._flask, self)
+            bind_batch_routes(self._flask, self)
+            bind_metrics_routes(self._flask, self.metrics)
+        return self._flask
+
+    @property
+    def asgi(self):
+        """
+        The Flask app (with every route registered on it) as an ASGI app, for
+        when `server` is "asgi".  Each request is run on a pool of `threads`
+        threads, while connections (e.g. slow clients or idle keep-alives) are
+        held on the event loop without using up a thread.
+        """
+        if self._asgi is None:
+            # a2wsgi is an optional dependency (pip install hypermodel[asgi])
+            from a2wsgi import WSGIMiddleware
+
+            self._asgi = WSGIMiddleware(self.flask, workers=self.threads)
+        return self._asgi
+
     @click.group(name="inference")
     @click.pass_context
     def cli_inference_group(context):
@@ -101,17 +327,101 @@ class HmlInferenceApp:
         self._initialise()
 
         logging.info(f"Development API Starting up on {self.port}")
+        self._start_serving()
+        if self.server == "asgi":
+            self._start_asgi(host="127.0.0.1")
+            return
+
         self.flask.run(host="127.0.0.1", port=self.port)
 
     # @click.pass_context
     def start_prod(self):
         """
-        Start the Flask App in Production mode (via Waitress)
+        Start the Flask App in Production mode (via Waitress).  When `workers` is
+        more than 1 in the config, models are loaded once and then that many worker
+        processes are forked (by Gunicorn) to serve requests from the same port.
         """
         
         self._initialise()
 
-        logging.info("Production API Starting up on {self.port}")
+        logging.info(f"Production API Starting up on {self.port}")
+
+        if self.server == "asgi":
+            if self.workers > 1:
+                raise Exception(
+                    f"HmlInferenceApp: 'workers' ({self.workers}) is only supported by the 'flask' server, "
+                    "run more replicas to scale the 'asgi' server"
+                )
+            self._start_serving()
+            self._start_asgi(host="0.0.0.0")
+            return
+
+        if self.workers > 1 and hasattr(os, "fork"):
+            from hypermodel.hml.prediction.prefork_server import PreforkServer
+
+            server = PreforkServer(
+                self.flask,
+                self.port,
+                self.workers,
+                threads=self.threads,
+                max_requests=self.max_requests,
+                graceful_timeout=self.graceful_timeout,
+                on_worker_start=self._start_serving,
+            )
+            server.serve()
+            return
+
+        from waitress import serve
 
+        self._start_serving()
         binding = f"*:{self.port}"
-        serve(self.flask, listen=binding)
+        serve(self.flask, listen=binding, threads=self.threads)
+
+    def _create_metrics(self) -> Metrics:
+        metrics = Metrics()
+        metrics.counter("hml_requests_total", "Requests served", ["route", "method", "status"])
+        metrics.histogram("hml_request_seconds", "Time taken to serve a request", ["route"])
+        metrics.counter("hml_model_predictions_total", "Records predicted", ["model"])
+        metrics.counter("hml_model_errors_total", "Calls to predict that failed", ["model"])
+        metrics.histogram("hml_model_batch_size", "Records per call to predict", ["model"], buckets=BATCH_SIZE_BUCKETS)
+        metrics.histogram(
+            "hml_model_stage_seconds",
+            "Time taken by each stage (encode / predict / serialise) of a prediction",
+            ["model", "stage"],
+        )
+        metrics.add_collector(self._collect_cache_metrics)
+        return metrics
+
+    def _collect_cache_metrics(self):
+        stats = self.get_cache_stats()
+        for field in ["hits", "misses"]:
+            values = {(name,): s[field] for name, s in stats.items()}
+            yield (f"hml_prediction_cache_{field}_total", "counter", f"Prediction cache {field}", values, ["model"])
+        values = {(name,): s["size"] for name, s in stats.items()}
+        yield ("hml_prediction_cache_size", "gauge", "Predictions cached", values, ["model"])
+
+    def _start_serving(self):
+        """
+        Start the background work of a process that serves requests (called in
+        each worker, as threads don't survive a fork): polling for new models and
+        warming up the models we have, while the server starts listening.
+        """
+        if self.model_reloader is not None:
+            self.model_reloader.start()
+
+        threading.Thread(target=self._warm_up_models, name="WarmUp", daemon=True).start()
+
+    def _warm_up_models(self):
+        for model_container in list(self.models.values()):
+            if not self._is_model_loaded(model_container) or model_container.is_warm:
+                continue
+            try:
+                model_container.warm_up(self.warm_up_records)
+            except Exception:
+                logging.exception(f"HmlInferenceApp: failed to warm up {model_container.name}, it will not be ready")
+
+    def _start_asgi(self, host: str):
+        # uvicorn is an optional dependency (pip install hypermodel[asgi])
+        import uvicorn
+
+        uvicorn.run(self.asgi, host=host, port=self.port)
@@ -1,13 +1,18 @@
 import click
+import inspect
 import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
 from datetime import datetime
-from kfp import dsl
-from kfp import Client
-from kfp.compiler import Compiler
 from typing import List, Dict, Callable
-from hypermodel.hml.hml_container_op import HmlContainerOp, _pipeline_enter, _pipeline_exit
-from hypermodel.kubeflow.kubeflow_client import KubeflowClient
-from hypermodel.kubeflow.deploy import deploy_pipeline
+from hypermodel.hml.hml_container_op import HmlContainerOp, OUTPUTS_PATH_ENV, _pipeline_enter, _pipeline_exit
+from hypermodel.hml.pipeline_scheduler import PipelineScheduler, topological_levels
+from hypermodel.hml.op_cache import OpCache, op_fingerprint
+from hypermodel.hml.run_log import RunLog
+from hypermodel.utilities.resource_usage import run_with_usage
 
 
 class HmlPipeline:
@@ -15,7 +20,6 @@ class HmlPipeline:
         self.config = config
         self.name = pipeline_func.__name__
         self.pipeline_func = pipeline_func
-        self.kubeflow_pipeline = dsl.pipeline(pipeline_func, pipeline_func.__name__)
 
         self.cron = None
         self.experiment = None
@@ -27,30 +31,64 @@ class HmlPipeline:
         self.ops_dict = {}
 
         # We treat the pipeline as a "group" of commands, rather than actually executing
-        # anything.  We can then bind a
-        self.cli_pipeline = click.group(name=pipeline_func.__name__)(_pass)
+        # anything.  We can then bind a command for each op, but only once one is needed
+        self.cli_pipeline = _LazyPipelineGroup(self, name=pipeline_func.__name__, callback=_pass)
 
         # Register this with the root `pipeline` command
         cli.add_command(self.cli_pipeline)
 
-        # Create a command to execute the whole pipeline
-        self.cli_all = click.command(name="run-all")(self.run_all)
+        # Create a command to execute the whole pipeline, and one to resume a run that failed
+        self.cli_all = self.apply_run_options(click.command(name="run-all")(self.run_all))
+        self.cli_resume = self.apply_run_options(click.command(name="resume")(self.resume))
+        self.cli_resume = click.option("-r", "--run-id", required=False, help="The run to resume (default: the latest).")(self.cli_resume)
+
+        # Where local runs record the fingerprints of the ops that succeeded, and their run logs
+        self.op_cache_path = config.get("op_cache_path", os.path.join(".hml", f"{self.name}-op-cache.json"))
+        self.run_log_path = config.get("run_log_path", os.path.join(".hml", f"{self.name}-runs"))
+        self.run_log_to_lake = bool(config.get("run_log_to_lake", False))
 
         self.deploy_dev = self.apply_deploy_options(click.command(name="deploy-dev")(self.deploy_dev))
         self.deploy_prod = self.apply_deploy_options(click.command(name="deploy-prod")(self.deploy_prod))
 
         self.cli_pipeline.add_command(self.cli_all)
+        self.cli_pipeline.add_command(self.cli_resume)
         self.cli_pipeline.add_command(self.deploy_dev)
         self.cli_pipeline.add_command(self.deploy_prod)
 
-        self.workflow = self._get_workflow()
-        self.dag = self.get_dag()
-        self.tasks = self.dag["tasks"]
-        self.task_map = dict()
+        # The compiled workflow is only built when a command needs the DAG (e.g. `run-all`),
+        # so that starting the inference app, or a single op, doesn't pay to compile it.
+        # The DAG's tasks are looked up once per compile, along with the workflow
+        self._workflow = None
+        self._tasks = None
+        self._task_map = None
+        self.ops_bound = False
+
+    @property
+    def workflow(self):
+        self._compile()
+        return self._workflow
+
+    @property
+    def dag(self):
+        return self.get_dag()
+
+    @property
+    def tasks(self):
+        self._compile()
+        return self._tasks
+
+    @property
+    def task_map(self):
+        self._compile()
+        return self._task_map
+
+    def _compile(self):
+        if self._workflow is not None:
+            return
 
-        for t in self.tasks:
-            task_name = t["name"]
-            self.task_map[task_name] = t
+        self._workflow = self._get_workflow()
+        self._tasks = self.get_dag()["tasks"]
+        self._task_map = {t["name"]: t for t in self._tasks}
 
     def apply_deploy_options(self, func):
         func = click.option("-h", "--host", required=False, help="Endpoint of the KFP API service to connect.")(func)
@@ -58,6 +96,20 @@ class HmlPipeline:
         func = click.option("-n", "--namespace", required=False, default="kubeflow", help="Kubernetes namespace to connect to the KFP API.")(func)
         return func
 
+    def apply_run_options(self, func):
+        func = click.option("-w", "--workers", required=False, default=1, type=int, help="The most ops to run at once.")(func)
+        func = click.option("--processes", is_flag=True, default=False, help="Run ops in forked processes rather than threads.")(func)
+        func = click.option("--no-cache", is_flag=True, default=False, help="Run every op, even if its inputs are unchanged.")(func)
+        func = click.option("--isolate", is_flag=True, default=False, help="Run each op in a fresh subprocess, reporting its CPU and memory.")(func)
+        return func
+
+    @property
+    def kubeflow_pipeline(self):
+        # kfp is only imported once something needs it, not when the pipeline is registered
+        from kfp import dsl
+
+        return dsl.pipeline(self.pipeline_func, self.name)
+
     def with_cron(self, cron):
         self.cron = cron
         return self
@@ -67,41 +119,183 @@ class HmlPipeline:
         return self
 
     def deploy_dev(self, host: str = None, client_id: str = None, namespace: str = None):
+        from hypermodel.kubeflow.deploy import deploy_pipeline
+
         deploy_pipeline(self, "dev", host, client_id, namespace)
 
     def deploy_prod(self, host: str = None, client_id: str = None, namespace: str = None):
+        from hypermodel.kubeflow.deploy import deploy_pipeline
+
         deploy_pipeline(self, "prod", host, client_id, namespace)
 
-    def run_all(self, **kwargs):
-        run_log = dict()
+    def run_all(self, workers: int = 1, processes: bool = False, no_cache: bool = False, isolate: bool = False):
+        """
+        Run every op in the pipeline locally, running ops that don't depend on each
+        other at the same time (up to `workers` at once), and stopping at the first
+        op to fail.  Ops that declared their inputs are skipped if neither their
+        inputs nor those of their upstream ops have changed since they last succeeded.
+
+        Args:
+            workers (int): The most ops to run at once
+            processes (bool): Run ops in forked processes rather than threads
+            no_cache (bool): Run every op, even if its inputs are unchanged
+            isolate (bool): Run each op in a fresh subprocess (through the same command
+                line the container uses), reporting the time, CPU and peak memory of each
+
+        Returns:
+            A dict of the time (in seconds) taken by each op
+        """
+        run_id = RunLog.new_run_id()
+        run_log = RunLog(self._run_log_file(run_id), self.name, run_id, on_save=self._run_log_saver(run_id))
+        return self._run(run_log, workers, processes, no_cache, isolate)
+
+    def resume(self, run_id: str = None, workers: int = 1, processes: bool = False, no_cache: bool = False, isolate: bool = False):
+        """
+        Resume a local run of the pipeline (by default the latest), running every
+        op that did not succeed in that run, as `run_all` would.
+
+        Args:
+            run_id (str): The id of the run to resume
+            workers (int): The most ops to run at once
+            processes (bool): Run ops in forked processes rather than threads
+            no_cache (bool): Run every op that did not succeed, even if its inputs are unchanged
+            isolate (bool): Run each op in a fresh subprocess
+
+        Returns:
+            A dict of the time (in seconds) taken by each op
+        """
+        if run_id is None:
+            file_path = RunLog.latest(self.run_log_path)
+            if file_path is None:
+                raise Exception(f"Unable to resume pipeline: {self.name}, no runs found in {self.run_log_path}")
+        else:
+            file_path = self._run_log_file(run_id)
+            if not os.path.exists(file_path) and self.run_log_to_lake:
+                self._services().lake.download(self._run_log_bucket_path(run_id), file_path)
+
+        run_log = RunLog.load(file_path)
+        run_log.on_save = self._run_log_saver(run_log.run_id)
+        logging.info(f"HmlPipeline {self.name}: resuming run {run_log.run_id}")
+        return self._run(run_log, workers, processes, no_cache, isolate)
+
+    def _run(self, run_log: RunLog, workers: int, processes: bool, no_cache: bool, isolate: bool):
+        global _scheduled_pipeline, _scheduled_context
 
         for t in self.tasks:
-            task_name = t["name"]
-            self.run_task(task_name, run_log, kwargs)
+            if t["name"] not in self.ops_dict:
+                raise Exception(f"Unable to run task: {t['name']}, not found in Ops for pipeine: {self.name}")
+
+        levels = topological_levels(self.tasks)
+
+        # Isolated ops are already in their own process, so only need a thread to wait on them
+        scheduler = PipelineScheduler(max_workers=workers, use_processes=processes and not isolate)
+        usage = dict()
+
+        cache = OpCache(self.op_cache_path)
+        fingerprints = dict()
+
+        def should_run(task_name):
+            fingerprints[task_name] = self.fingerprint(task_name, fingerprints)
+            if run_log.is_succeeded(task_name):
+                logging.info(f"HmlPipeline {self.name}: skipping {task_name}, it succeeded in run {run_log.run_id}")
+                return False
+
+            if not no_cache and cache.matches(task_name, fingerprints[task_name]):
+                logging.info(f"HmlPipeline {self.name}: skipping {task_name}, its inputs are unchanged")
+                run_log.task_skipped(task_name, "inputs unchanged")
+                return False
+
+            cache.forget(task_name)
+            run_log.task_started(task_name)
+            return True
+
+        def on_success(task_name, seconds, outputs):
+            cache.record(task_name, fingerprints[task_name])
+            if isolate:
+                # An isolated op returns what it wrote to its outputs file, and how it ran
+                outputs, usage[task_name] = outputs
+            run_log.task_succeeded(task_name, seconds, outputs, usage=usage.get(task_name))
+
+        def on_failure(task_name, seconds, ex):
+            if isolate and getattr(ex, "usage", None) is not None:
+                usage[task_name] = ex.usage
+            run_log.task_failed(task_name, seconds, ex, usage=usage.get(task_name))
+
+        # Forked processes find us through these globals, as the ops can't be pickled,
+        # and ops run on other threads need the click context for `pass_context`
+        _scheduled_pipeline = self
+        _scheduled_context = click.get_current_context(silent=True)
+        logging.info(f"HmlPipeline {self.name}: run {run_log.run_id} logged to {run_log.file_path}")
+        try:
+            return scheduler.run(
+                levels,
+                _run_isolated_task if isolate else _run_scheduled_task,
+                should_run=should_run,
+                on_success=on_success,
+                on_failure=on_failure,
+            )
+        finally:
+            if isolate:
+                print_usage_table(usage)
+
+    def local_command(self, task_name: str, context: click.Context = None) -> List[str]:
+        """
+        Get the command line to run the op `task_name` in a subprocess, using the
+        same `pipelines <pipeline> <op>` arguments as the op's container, after any
+        options that were passed to the root command of `context`.  This uses the
+        `script_name` from the config if it is installed, otherwise the script that
+        is running now.
+        """
+        hml_op = self.ops_dict[task_name]
+        arguments = _root_arguments(context) + ["pipelines", self.name, hml_op.name]
 
-    def run_task(self, task_name, run_log, kwargs):
-        if task_name not in self.task_map:
-            raise Exception(f"Unable to run task: {task_name}, not found in Workflow for pipeine: {self.name}")
+        script_name = self.config.get("script_name")
+        if script_name is not None and shutil.which(script_name) is not None:
+            return [script_name] + arguments
+        return [sys.executable, sys.argv[0]] + arguments
 
-        if task_name not in self.ops_dict:
-            raise Exception(f"Unable to run task: {task_name}, not found in Ops for pipeine: {self.name}")
+    def _run_log_file(self, run_id: str) -> str:
+        return os.path.join(self.run_log_path, f"{run_id}.json")
 
-        # Check to make sure we havent' already run
-        if task_name in run_log:
-            return
+    def _run_log_bucket_path(self, run_id: str) -> str:
+        return f"pipelines/{self.name}/runs/{run_id}.json"
+
+    def _run_log_saver(self, run_id: str):
+        # Copy the run log to the DataLake each time it is saved, if configured to
+        if not self.run_log_to_lake:
+            return None
+
+        services = self._services()
+        return lambda file_path: services.lake.upload(self._run_log_bucket_path(run_id), file_path)
+
+    def _services(self):
+        context = click.get_current_context(silent=True)
+        if context is None or context.obj is None or "services" not in context.obj:
+            raise Exception(f"Unable to find the platform services for pipeline: {self.name}")
+        return context.obj["services"]
 
-        task = self.task_map[task_name]
+    def fingerprint(self, task_name, upstream_fingerprints):
+        """
+        Calculate the fingerprint of the op `task_name`, from its declared inputs
+        and the fingerprints of the ops it depends on.
+
+        Args:
+            task_name (str): The name of the op
+            upstream_fingerprints (Dict[str, str]): The fingerprints of the ops already scheduled
+
+        Returns:
+            The fingerprint, or None if it, or any op it depends on, did not declare its inputs
+        """
         hml_op = self.ops_dict[task_name]
+        inputs = hml_op.cache_inputs()
+        if inputs is None:
+            return None
 
-        # Run my dependencies recusively
-        if "dependencies" in task:
-            for d in task["dependencies"]:
-                if d not in run_log:
-                    self.run_task(d, run_log, kwargs)
+        upstream = [upstream_fingerprints.get(d) for d in self.task_map[task_name].get("dependencies", [])]
+        if any(u is None for u in upstream):
+            return None
 
-        # Run the actual one
-        ret = hml_op.invoke(**kwargs)
-        run_log[hml_op.k8s_name] = True
+        return op_fingerprint(hml_op.name, hml_op.kwargs, inputs, upstream)
 
     def get_dag(self):
         templates = self.workflow["spec"]["templates"]
@@ -110,7 +304,44 @@ class HmlPipeline:
                 return t["dag"]
         return None
 
+    def bind_ops(self):
+        """
+        Create the pipeline's ops (registering a command for each) by running the
+        pipeline function, without compiling the workflow.
+        """
+        if self.ops_bound:
+            return
+
+        from kfp import dsl
+
+        _pipeline_enter(self)
+        try:
+            with dsl.Pipeline(self.name):
+                self.pipeline_func(**self._pipeline_params())
+        finally:
+            _pipeline_exit()
+        self.ops_bound = True
+
+    def _pipeline_params(self) -> Dict[str, object]:
+        """
+        The arguments the Kubeflow compiler calls the pipeline function with: a
+        `PipelineParam` for each of its parameters, carrying the parameter's default
+        """
+        from kfp import dsl
+
+        params = dict()
+        for name, parameter in inspect.signature(self.pipeline_func).parameters.items():
+            if parameter.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD):
+                continue
+            value = None if parameter.default is inspect.Parameter.empty else parameter.default
+            params[name] = dsl.PipelineParam(name, value=value)
+        return params
+
     def _add_op(self, hmlop):
+        # The pipeline function may run more than once (e.g. to bind our ops, then
+        # to compile the workflow), in which case the new op replaces the old one
+        if hmlop.k8s_name in self.ops_dict:
+            self.ops_list.remove(self.ops_dict[hmlop.k8s_name])
         self.ops_list.append(hmlop)
 
         self.ops_dict[hmlop.k8s_name] = hmlop
@@ -138,12 +369,96 @@ class HmlPipeline:
         # while we are compiling to allow us to easily bind the pipeline
         # to the `HmlContainerOp`, without damaging the re-usabulity of the
         # op.
+        from kfp.compiler import Compiler
+
+        logging.info(f"HmlPipeline {self.name}: compiling the workflow")
         _pipeline_enter(self)
         workflow = Compiler()._compile(self.pipeline_func)
         _pipeline_exit()
+        self.ops_bound = True
 
         return workflow
 
 
 def _pass():
     pass
+
+
+class _LazyPipelineGroup(click.Group):
+    """
+    The command group of a pipeline, which only binds the commands of the pipeline's
+    ops (see `HmlPipeline.bind_ops`) when one of them is looked up.
+    """
+
+    def __init__(self, pipeline: "HmlPipeline", **kwargs):
+        super().__init__(**kwargs)
+        self.pipeline = pipeline
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name not in self.commands:
+            self.pipeline.bind_ops()
+        return super().get_command(ctx, cmd_name)
+
+    def list_commands(self, ctx):
+        self.pipeline.bind_ops()
+        return super().list_commands(ctx)
+
+
+_scheduled_pipeline: HmlPipeline = None
+_scheduled_context: click.Context = None
+
+
+def print_usage_table(usage: Dict[str, Dict[str, float]]):
+    """
+    Print a table of the wall time, CPU time and peak memory of each op
+    """
+    def _format(value, fmt):
+        return "-" if value is None else fmt.format(value)
+
+    print(f"{'op':<32} {'wall (s)':>10} {'cpu (s)':>10} {'peak rss (mb)':>14}")
+    for task_name, u in usage.items():
+        wall = _format(u.get("wall_seconds"), "{:.2f}")
+        cpu = _format(u.get("cpu_seconds"), "{:.2f}")
+        rss = _format(u.get("max_rss_mb"), "{:.1f}")
+        print(f"{task_name:<32} {wall:>10} {cpu:>10} {rss:>14}")
+
+
+def _root_arguments(context: click.Context) -> List[str]:
+    # The command line arguments before the root command's subcommand (e.g. `--verbose`
+    # in `app --verbose pipelines ...`), as click doesn't keep the raw arguments
+    if context is None:
+        return []
+
+    subcommand = context.find_root().invoked_subcommand
+    arguments = sys.argv[1:]
+    if subcommand not in arguments:
+        return []
+    return arguments[: arguments.index(subcommand)]
+
+
+def _run_isolated_task(task_name: str):
+    command = _scheduled_pipeline.local_command(task_name, _scheduled_context)
+    logging.info(f"HmlPipeline: running {task_name} in a subprocess: {' '.join(command)}")
+
+    with tempfile.TemporaryDirectory() as temp_path:
+        outputs_path = os.path.join(temp_path, "outputs.json")
+        return_code, usage = run_with_usage(command, env=dict(os.environ, **{OUTPUTS_PATH_ENV: outputs_path}))
+        if return_code != 0:
+            ex = Exception(f"Op {task_name} failed, exiting with code {return_code}")
+            ex.usage = usage
+            raise ex
+
+        outputs = None
+        if os.path.exists(outputs_path):
+            with open(outputs_path, "r") as f:
+                outputs = json.load(f)
+    return (outputs, usage)
+
+
+def _run_scheduled_task(task_name: str):
+    hml_op = _scheduled_pipeline.ops_dict[task_name]
+    if _scheduled_context is None:
+        return hml_op.invoke()
+
+    with _scheduled_context.scope(cleanup=False):
+        return hml_op.invoke()
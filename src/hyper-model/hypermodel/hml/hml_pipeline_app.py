@@ -1,9 +1,7 @@
 import logging
 
 import click
-from kfp import dsl
 from typing import List, Dict, Callable
-import kfp.dsl as dsl
 
 from hypermodel.hml.hml_pipeline import HmlPipeline
 from hypermodel.hml.hml_container_op import HmlContainerOp
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import logging
+import os
+import numpy as np
+from scipy import sparse
+from typing import Any, Dict, Tuple
+
+
+class MatrixCache:
+    """
+    A local disk cache of encoded feature matrices (and their targets), so that
+    reruns and retries of the same workflow can skip pulling the source table from
+    the warehouse and encoding it again.  Dense matrices are stored as `.npy` files
+    and loaded memory-mapped, sparse matrices are stored as CSR `.npz` files.  The
+    least recently used matrices are evicted once the cache grows beyond `max_bytes`.
+    """
+
+    def __init__(self, path: str, max_bytes: int = None):
+        """
+        Create a new `MatrixCache` storing its files in `path`
+
+        Args:
+            path (str): The directory to keep cached matrices in
+            max_bytes (int): The most bytes to keep in the cache before evicting
+                matrices (None to never evict)
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(identity: Dict[str, Any]) -> str:
+        """
+        Calculate the cache key for a matrix from everything that determines its contents
+
+        Args:
+            identity (Dict[str, Any]): JSON serialisable description of the matrix (the source
+                table, feature lists, distributions etc)
+
+        Returns:
+            The md5 hex digest identifying the matrix
+        """
+        text = json.dumps(identity, sort_keys=True, default=str)
+        return hashlib.md5(text.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Tuple[Any, np.ndarray]:
+        """
+        Load the matrix and targets cached with the given `key`
+
+        Args:
+            key (str): The key of the matrix
+
+        Returns:
+            A tuple of (matrix, targets), or (None, None) if the key is not in the cache
+        """
+        targets_path = self._path(key, "targets.npy")
+        if not os.path.exists(targets_path):
+            return (None, None)
+
+        dense_path = self._path(key, "matrix.npy")
+        sparse_path = self._path(key, "matrix.npz")
+        if os.path.exists(dense_path):
+            matrix = np.load(dense_path, mmap_mode="r")
+        elif os.path.exists(sparse_path):
+            matrix = sparse.load_npz(sparse_path)
+        else:
+            return (None, None)
+
+        # Mark the matrix as recently used
+        os.utime(targets_path)
+        logging.info(f"MatrixCache: hit {key}")
+        return (matrix, np.load(targets_path, mmap_mode="r"))
+
+    def put(self, key: str, matrix: Any, targets: np.ndarray) -> bool:
+        """
+        Write the `matrix` and `targets` to the cache with the given `key`.  Matrices
+        of python objects can't be memory-mapped, so they are never cached.
+
+        Args:
+            key (str): The key of the matrix
+            matrix (Any): The numpy array or scipy csr_matrix to cache
+            targets (np.ndarray): The targets for each row of the matrix
+
+        Returns:
+            True if the matrix was cached
+        """
+        targets = np.asarray(targets)
+        if targets.dtype == object or (not sparse.issparse(matrix) and matrix.dtype == object):
+            logging.info(f"MatrixCache: not caching {key}, unable to cache object arrays")
+            return False
+
+        if not os.path.exists(self.path):
+            os.makedirs(self.path)
+
+        if sparse.issparse(matrix):
+            self._write(key, "matrix.npz", lambda f: sparse.save_npz(f, matrix.tocsr()))
+        else:
+            self._write(key, "matrix.npy", lambda f: np.save(f, matrix))
+
+        # The targets go last, as they mark the entry as complete
+        self._write(key, "targets.npy", lambda f: np.save(f, targets))
+
+        logging.info(f"MatrixCache: stored {key}")
+        self.evict()
+        return True
+
+    def evict(self):
+        """
+        Delete the least recently used matrices until the cache holds no more than `max_bytes`
+        """
+        if self.max_bytes is None:
+            return
+
+        # Each matrix is made up of several files named after its key, and was last
+        # used when its targets were written or read
+        entries: Dict[str, list] = dict()
+        for name in os.listdir(self.path):
+            if name.endswith(".tmp"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.path, name))
+            except FileNotFoundError:
+                continue
+            key = name.split("-", 1)[0]
+            entry = entries.setdefault(key, [0, 0, []])
+            if name.endswith("targets.npy"):
+                entry[0] = stat.st_mtime
+            entry[1] += stat.st_size
+            entry[2].append(name)
+
+        total = sum(size for _, size, _ in entries.values())
+        for last_used, size, names in sorted(entries.values()):
+            if total <= self.max_bytes:
+                break
+
+            logging.info(f"MatrixCache: evicting {names[0].split('-', 1)[0]}")
+            # Remove the targets first, so the entry stops being complete straight away
+            for name in sorted(names, key=lambda n: not n.endswith("targets.npy")):
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except FileNotFoundError:
+                    pass
+            total -= size
+
+    def _write(self, key: str, suffix: str, writer):
+        # Write to a temporary file and rename it, so that a crash part way
+        # through never leaves a truncated file behind to be loaded later
+        final_path = self._path(key, suffix)
+        temp_path = f"{final_path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            writer(f)
+        os.replace(temp_path, final_path)
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.path, f"{key}-{suffix}")
@@ -1,21 +1,27 @@
+import numpy as np
 import pandas as pd
+from scipy import sparse
 import json
 import logging
 import os
 import joblib
-import gitlab
 
-from typing import List, Dict
+from typing import Any, Callable, ContextManager, Iterable, List, Dict, Tuple
 
 from abc import ABC, abstractproperty
+from contextlib import contextmanager
 
 from hypermodel.utilities.file_hash import file_md5
+from hypermodel.utilities.artifact_cache import ArtifactCache
 from hypermodel.features import (
     get_unique_feature_values,
-    one_hot_encode,
-    describe_features
+    describe_features,
+    CategoricalEncoder,
+    DistributionSketch
 )
 from hypermodel.platform.abstract.services import PlatformServicesBase
+from hypermodel.platform.abstract.data_lake import raise_for_failures
+from hypermodel.hml.matrix_cache import MatrixCache
 
 
 class ModelContainer:
@@ -40,6 +46,7 @@ class ModelContainer:
         features_categorical: List[str],
         target: str,
         services: PlatformServicesBase,
+        mmap_mode: str = None,
     ):
         self.project_name = project_name
         self.name = name
@@ -53,10 +60,25 @@ class ModelContainer:
         self.filename_distributions = f"{self.name}-distributions.json"
         self.filename_model = f"{self.name}.joblib"
         self.filename_reference = f"{self.name}-reference.json"
+        self.dirname_matrix_cache = f"{self.name}-matrices"
+        self.dirname_distributions_cache = f"{self.name}-distributions"
 
-        self.is_loaded = False
+        # Load the model's numpy arrays memory-mapped (e.g. "r"), so that processes
+        # loading the same model file share the same pages
+        self.mmap_mode = mmap_mode
 
-    def analyze_distributions(self, data_frame: pd.DataFrame):
+        self.is_loaded = False
+        # Whether the loaded model has been warmed up (see `warm_up`)
+        self.is_warm = False
+        # The md5 of the loaded model file, identifying the version of the model
+        self.model_md5: str = None
+        # The reference (see `publish`) that the model was last loaded from
+        self.reference: Dict[str, Any] = None
+        # The dtype of the training matrix, which records are encoded as for prediction
+        self.matrix_dtype: np.dtype = None
+        self._encoder: CategoricalEncoder = None
+
+    def analyze_distributions(self, data_frame: pd.DataFrame, workers: int = 1, use_processes=False):
         """
         Given a dataframe, find all the unique values for categorical features
         and the distribution of all the numerical features and store them within
@@ -64,16 +86,107 @@ class ModelContainer:
 
         Args:
             data_frame (pd.DataFrame): The dataframe to analyze
+            workers (int): The number of features to analyze in parallel
+            use_processes (bool): Analyze features in a pool of processes rather than threads
 
         Returns:
             A reference to self
         """
         logging.info(f"ModelContainer {self.name}: analyze_distributions")
         self.feature_uniques = get_unique_feature_values(
-            data_frame, self.features_categorical
+            data_frame, self.features_categorical, workers=workers, use_processes=use_processes
+        )
+        self.feature_summaries = describe_features(
+            data_frame, self.features_numeric, workers=workers, use_processes=use_processes
         )
-        self.feature_summaries = describe_features(data_frame, self.features_numeric)
+        self._encoder = None
+
+        return self
+
+    def analyze_distributions_from_chunks(self, chunks: Iterable[pd.DataFrame]):
+        """
+        Analyze the distributions of features a chunk at a time (e.g. from
+        `DataWarehouse.dataframes_from_table`), so that tables larger than memory
+        can be analyzed.  Quantiles are estimated using a t-digest once the data
+        no longer fits within its buffer.
+
+        Args:
+            chunks (Iterable[pd.DataFrame]): The chunks of data to analyze
+
+        Returns:
+            A reference to self
+        """
+        logging.info(f"ModelContainer {self.name}: analyze_distributions_from_chunks")
+        sketch = self.new_distribution_sketch()
+        for chunk in chunks:
+            sketch.update(chunk)
+
+        return self.bind_distribution_sketch(sketch)
+
+    def analyze_table_distributions(self, dataset: str, table: str, chunk_size: int = 100000):
+        """
+        Analyze the distributions of features in a warehouse table, reading the
+        table `chunk_size` rows at a time.  The distributions are kept on the local
+        disk, keyed by the table's version (see `DataWarehouseBase.table_version`), so
+        a rerun against an unchanged table doesn't read it again.
+
+        Args:
+            dataset (str): The warehouse dataset the table lives in
+            table (str): The name of the table
+            chunk_size (int): The most rows to hold in memory at once
+
+        Returns:
+            A reference to self
+        """
+        table_version = self.services.warehouse.table_version(dataset, table)
+        file_path = None
+        if table_version is not None:
+            key = MatrixCache.key({
+                "dataset": dataset,
+                "table": table,
+                "table_version": table_version,
+                "features_numeric": self.features_numeric,
+                "features_categorical": self.features_categorical,
+            })
+            file_path = os.path.join(self.get_local_path(self.dirname_distributions_cache), f"{key}.json")
+            if os.path.exists(file_path):
+                logging.info(f"ModelContainer {self.name}: using cached distributions for {dataset}.{table}")
+                return self.load_distributions(file_path)
+
+        chunks = self.services.warehouse.dataframes_from_table(dataset, table, chunk_size=chunk_size)
+        self.analyze_distributions_from_chunks(chunks)
+
+        if file_path is not None:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            temp_path = f"{file_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump({"feature_uniques": self.feature_uniques, "feature_summaries": self.feature_summaries}, f)
+            os.replace(temp_path, file_path)
+        return self
+
+    def new_distribution_sketch(self) -> DistributionSketch:
+        """
+        Create an empty `DistributionSketch` for this model's features, which can be
+        updated with chunks of data and merged with sketches built by other workers.
+
+        Returns:
+            A new `DistributionSketch`
+        """
+        return DistributionSketch(self.features_categorical, self.features_numeric)
+
+    def bind_distribution_sketch(self, sketch: DistributionSketch):
+        """
+        Use the `feature_uniques` and `feature_summaries` described by the given sketch
 
+        Args:
+            sketch (DistributionSketch): The sketch of the data
+
+        Returns:
+            A reference to self
+        """
+        self.feature_uniques = sketch.feature_uniques()
+        self.feature_summaries = sketch.feature_summaries()
+        self._encoder = None
         return self
 
     def dump_distributions(self):
@@ -89,32 +202,303 @@ class ModelContainer:
             json_obj = {
                 "feature_uniques": self.feature_uniques,
                 "feature_summaries": self.feature_summaries,
+                "matrix_dtype": None if self.matrix_dtype is None else self.matrix_dtype.name,
             }
             json.dump(json_obj, f)
         return file_path
 
-    def build_training_matrix(self, data_frame: pd.DataFrame):
+    def get_encoder(self) -> CategoricalEncoder:
+        """
+        Get the `CategoricalEncoder` compiled from the currently cached `feature_uniques`,
+        compiling it the first time it is asked for.
+
+        Returns:
+            The `CategoricalEncoder` for this model's categorical features
+        """
+        if self._encoder is None:
+            self._encoder = CategoricalEncoder(self.feature_uniques)
+        return self._encoder
+
+    def build_training_matrix(self, data_frame: pd.DataFrame, throw_on_missing=False, sparse_output=False):
         """
         Convert the provided `data_frame` to a matrix after one-hot encoding
-        all the categorical features, using the currently cached `feature_uniques`
+        all the categorical features, using the currently cached `feature_uniques`.
+        The one-hot encoded columns come first, followed by the numeric features.
+
+        With `sparse_output=True` a `scipy.sparse.csr_matrix` is built directly from
+        the category codes and the non-zero numeric values, which uses a fraction of
+        the memory for high-cardinality categorical features.  Note that XGBoost treats
+        entries missing from a sparse matrix as missing values rather than zeros, so
+        train and predict using the same kind of matrix.
 
         Args:
             data_frame (pd.DataFrame): The pandas dataframe to encode
+            throw_on_missing (bool): Throw an Exception if a categorical value is found
+                which is not in `feature_uniques`
+            sparse_output (bool): Return a `scipy.sparse.csr_matrix` instead of a numpy array
 
         Returns:
-            A numpy array of the encoded data
+            A numpy array (or csr_matrix) of the encoded data
         """
         logging.info(f"ModelContainer {self.name}: build_training_matrix")
 
-        # Now lets do the encoding thing...
-        encoded_df = one_hot_encode(data_frame, self.feature_uniques)
+        encoder = self.get_encoder()
+        numeric = data_frame[self.features_numeric].to_numpy()
+        width = encoder.width + len(self.features_numeric)
 
-        for nf in self.features_numeric:
-            encoded_df[nf] = data_frame[nf]
+        if sparse_output:
+            if numeric.dtype == object:
+                numeric = numeric.astype(np.float64)
+            dtype = np.result_type(np.int64, numeric.dtype)
+
+            # The categorical "1"s, then every non-zero numeric value
+            cat_rows, cat_columns = encoder.sparse_indexes(data_frame, throw_on_missing=throw_on_missing)
+            num_rows, num_columns = np.nonzero(numeric)
+
+            rows = np.concatenate([cat_rows, num_rows])
+            columns = np.concatenate([cat_columns, num_columns + encoder.width])
+            data = np.concatenate([np.ones(len(cat_rows), dtype=dtype), numeric[num_rows, num_columns]])
+            self.matrix_dtype = np.dtype(dtype)
+            return sparse.csr_matrix((data, (rows, columns)), shape=(len(data_frame), width), dtype=dtype)
+
+        # Allocate the whole matrix once, and encode straight into it
+        dtype = np.result_type(np.int64, numeric.dtype)
+        matrix = np.empty((len(data_frame), width), dtype=dtype)
+        encoder.encode(data_frame, throw_on_missing=throw_on_missing, out=matrix[:, : encoder.width])
+        matrix[:, encoder.width :] = numeric
 
-        matrix = encoded_df.values
+        self.matrix_dtype = matrix.dtype
         return matrix
 
+    def build_training_matrix_from_chunks(self, chunks: Iterable[pd.DataFrame], sparse_output=False):
+        """
+        Build the training matrix (and targets) a chunk of data at a time (e.g. from
+        `DataWarehouse.dataframes_from_table`), so that only the encoded matrix and
+        a single chunk of the raw table are held in memory at once.
+
+        Args:
+            chunks (Iterable[pd.DataFrame]): The chunks of data to encode
+            sparse_output (bool): Return a `scipy.sparse.csr_matrix` instead of a numpy array
+
+        Returns:
+            A tuple of (matrix, targets)
+        """
+        logging.info(f"ModelContainer {self.name}: build_training_matrix_from_chunks")
+        matrices = []
+        targets = []
+        for chunk in chunks:
+            matrices.append(self.build_training_matrix(chunk, sparse_output=sparse_output))
+            targets.append(chunk[self.target].to_numpy())
+
+        if not matrices:
+            empty = pd.DataFrame(columns=self.features_categorical + self.features_numeric + [self.target])
+            return (self.build_training_matrix(empty, sparse_output=sparse_output), np.empty(0))
+
+        if sparse_output:
+            matrix = sparse.vstack(matrices, format="csr")
+        else:
+            matrix = np.concatenate(matrices)
+        self.matrix_dtype = matrix.dtype
+        return (matrix, np.concatenate(targets))
+
+    def build_training_matrix_for_table(
+        self, dataset: str, table: str, data_frame: pd.DataFrame = None, sparse_output=False, chunk_size: int = 100000
+    ):
+        """
+        Build the training matrix (and targets) for the given warehouse table, re-using
+        a copy cached on the local disk when the same version of the table (see
+        `DataWarehouseBase.table_version`) has already been encoded against the same
+        distributions and features within the current workflow.  The table is only
+        read from the warehouse on a cache miss (unless it is passed in as `data_frame`),
+        `chunk_size` rows at a time, and is never cached if the warehouse can't tell
+        its version.
+
+        Args:
+            dataset (str): The warehouse dataset the table lives in
+            table (str): The name of the table
+            data_frame (pd.DataFrame): The contents of the table, if already loaded
+            sparse_output (bool): Return a `scipy.sparse.csr_matrix` instead of a numpy array
+            chunk_size (int): The most rows of the table to read at once
+
+        Returns:
+            A tuple of (matrix, targets)
+        """
+        workflow_id = (
+            os.environ["KF_WORKFLOW_ID"] if "KF_WORKFLOW_ID" in os.environ else "local"
+        )
+        table_version = self.services.warehouse.table_version(dataset, table)
+        if table_version is None:
+            logging.info(f"ModelContainer {self.name}: unable to version {dataset}.{table}, not caching its matrix")
+            return self._build_training_matrix_for_table(dataset, table, data_frame, sparse_output, chunk_size)
+
+        key = MatrixCache.key({
+            "workflow_id": workflow_id,
+            "dataset": dataset,
+            "table": table,
+            "table_version": table_version,
+            "distributions_md5": self.distributions_md5(),
+            "features_numeric": self.features_numeric,
+            "features_categorical": self.features_categorical,
+            "target": self.target,
+            "sparse": sparse_output,
+        })
+
+        config = self.services.config
+        cache = MatrixCache(self.get_local_path(self.dirname_matrix_cache), max_bytes=config.matrix_cache_max_bytes)
+        matrix, targets = cache.get(key)
+        if matrix is not None:
+            logging.info(f"ModelContainer {self.name}: using cached matrix for {dataset}.{table}")
+            self.matrix_dtype = matrix.dtype
+            return (matrix, targets)
+
+        matrix, targets = self._build_training_matrix_for_table(dataset, table, data_frame, sparse_output, chunk_size)
+        cache.put(key, matrix, targets)
+
+        return (matrix, targets)
+
+    def _build_training_matrix_for_table(self, dataset, table, data_frame, sparse_output, chunk_size):
+        if data_frame is not None:
+            matrix = self.build_training_matrix(data_frame, sparse_output=sparse_output)
+            return (matrix, data_frame[self.target].to_numpy())
+
+        chunks = self.services.warehouse.dataframes_from_table(dataset, table, chunk_size=chunk_size)
+        return self.build_training_matrix_from_chunks(chunks, sparse_output=sparse_output)
+
+    def distributions_md5(self) -> str:
+        """
+        Calculate an md5 hash of the currently cached `feature_uniques` and `feature_summaries`
+
+        Returns:
+            The md5 hex digest of the distributions
+        """
+        return MatrixCache.key({
+            "feature_uniques": self.feature_uniques,
+            "feature_summaries": self.feature_summaries,
+        })
+
+    def build_feature_vector(self, features: Dict[str, Any], throw_on_missing=True):
+        """
+        Convert a single record of features (e.g. the parameters of a prediction
+        request) to a one row matrix laid out exactly like `build_training_matrix`,
+        filling a preallocated numpy row from the cached `feature_uniques` without
+        going through pandas.
+
+        Args:
+            features (Dict[str, Any]): A dict keyed by feature name, containing that feature's value
+            throw_on_missing (bool): Throw an Exception if a categorical value is found
+                which is not in `feature_uniques`
+
+        Returns:
+            A (1 x features) numpy array of the encoded record
+        """
+        return self.build_feature_vectors([features], throw_on_missing=throw_on_missing)
+
+    def build_feature_vectors(self, records: List[Dict[str, Any]], throw_on_missing=True):
+        """
+        Convert a list of feature records (e.g. the body of a batch prediction request)
+        to a matrix laid out exactly like `build_training_matrix`, one row per record,
+        and of the same dtype (where it can hold the values).  Numeric values which are
+        null, empty or can't be parsed as a number are treated as missing (NaN).
+
+        Args:
+            records (List[Dict[str, Any]]): A list of dicts keyed by feature name
+            throw_on_missing (bool): Throw an Exception if a categorical value is found
+                which is not in `feature_uniques`
+
+        Returns:
+            A (records x features) numpy array of the encoded records
+        """
+        encoder = self.get_encoder()
+
+        matrix = np.zeros((len(records), encoder.width + len(self.features_numeric)), dtype=np.float64)
+        for row, features in zip(matrix, records):
+            encoder.encode_row(features, throw_on_missing=throw_on_missing, out=row)
+
+            for i, nf in enumerate(self.features_numeric):
+                row[encoder.width + i] = _to_float(features.get(nf))
+
+        # An integer matrix can't hold missing values, so those stay as floats
+        dtype = self.matrix_dtype
+        if dtype is None or dtype == matrix.dtype or (dtype.kind in "iub" and np.isnan(matrix).any()):
+            return matrix
+        return matrix.astype(dtype)
+
+    def predict_batch(
+        self,
+        records: List[Dict[str, Any]],
+        timer: Callable[[str], ContextManager] = None,
+    ) -> List[Any]:
+        """
+        Encode each of the `records` and make a prediction for all of them with
+        a single call to the bound model's `predict`.
+
+        Args:
+            records (List[Dict[str, Any]]): A list of dicts keyed by feature name
+            timer (Callable[[str], ContextManager]): Optionally times each stage ("encode"
+                and "predict"), given the stage's name and returning a context manager
+                to run the stage in (e.g. `Metrics.span`)
+
+        Returns:
+            A list of predictions, in the same order as `records`
+        """
+        if timer is None:
+            timer = _no_timer
+
+        with timer("encode"):
+            feature_matrix = self.build_feature_vectors(records, throw_on_missing=True)
+
+        with timer("predict"):
+            return np.asarray(self.model.predict(feature_matrix)).tolist()
+
+    def synthetic_records(self, count: int) -> List[Dict[str, Any]]:
+        """
+        Build `count` plausible records from the distributions of the features,
+        cycling through the quantiles of each numeric feature and the unique values
+        of each categorical feature (e.g. to warm up a model before it serves requests).
+
+        Args:
+            count (int): The number of records to build
+
+        Returns:
+            A list of dicts keyed by feature name
+        """
+        numeric_values = dict()
+        for nf in self.features_numeric:
+            summary = self.feature_summaries.get(nf, {})
+            values = [summary[q] for q in ["50%", "min", "25%", "75%", "max"] if summary.get(q) is not None]
+            numeric_values[nf] = values if len(values) > 0 else [0]
+
+        categorical_values = dict()
+        for cf in self.features_categorical:
+            values = [v for v in self.feature_uniques.get(cf, []) if v is not None and v == v]
+            categorical_values[cf] = values if len(values) > 0 else [None]
+
+        records = []
+        for i in range(count):
+            record = {nf: values[i % len(values)] for nf, values in numeric_values.items()}
+            for cf, values in categorical_values.items():
+                record[cf] = values[i % len(values)]
+            records.append(record)
+        return records
+
+    def warm_up(self, count: int = 16):
+        """
+        Make predictions for `count` synthetic records (see `synthetic_records`), in
+        a batch and singly, so that the first real requests don't pay for building
+        the encoder, or for any lazy initialisation inside the model.
+
+        Args:
+            count (int): The number of synthetic records to predict
+        """
+        self.get_encoder()
+        if count > 0:
+            logging.info(f"ModelContainer {self.name}: warming up with {count} records")
+            records = self.synthetic_records(count)
+            self.predict_batch(records)
+            self.predict_batch(records[:1])
+
+        self.is_warm = True
+
     def load(self, reference_file=None):
         """
         Given the provided reference file, look up the location of the model
@@ -128,29 +512,94 @@ class ModelContainer:
         Returns:
             None
         """
-        lake = self.services.lake
-
         if reference_file is None:
             reference_file = self.get_local_path(self.filename_reference)
 
         logging.info(
             f"ModelContainer {self.name} loading container from {reference_file}"
         )
+        self.is_warm = False
         with open(reference_file) as f:
             reference = json.load(f)
 
-            # Load the distributions
+            # Fetch the distributions and the model (at the same time)
             dist_ref = reference["distributions"]
             dist_path = self.get_local_path(self.filename_distributions)
+            model_ref = reference["model"]
+            model_path = self.get_local_path(self.filename_model)
+            self.fetch_artifacts([(dist_ref, dist_path), (model_ref, model_path)])
 
-            lake.download(dist_ref["path"], dist_path)
             self.load_distributions(dist_path)
+            self.load_model(md5=model_ref.get("md5"))
 
-            # Load the model
-            model_ref = reference["model"]
-            model_path = self.get_local_path(self.filename_model)
-            lake.download(model_ref["path"], model_path)
-            self.load_model()
+            self.reference = reference
+            self.is_loaded = True
+
+    def fetch_artifact(self, artifact_ref: Dict[str, str], local_path: str):
+        """
+        Make sure the artifact described by `artifact_ref` (an entry of the reference
+        file written by `publish`) is at `local_path`.  If a file with the same md5 is
+        already at `local_path`, or in the local artifact cache, nothing is downloaded
+        from the DataLake.
+
+        Args:
+            artifact_ref (Dict[str, str]): The "path" and "md5" of the artifact
+            local_path (str): Where the artifact should be written to
+
+        Returns:
+            None
+        """
+        self.fetch_artifacts([(artifact_ref, local_path)])
+
+    def fetch_artifacts(self, artifacts: List[Tuple[Dict[str, str], str]]):
+        """
+        Make sure each artifact is at its local path (see `fetch_artifact`),
+        downloading those we don't already have from the DataLake in parallel.
+
+        Args:
+            artifacts (List[Tuple[Dict[str, str], str]]): The `(artifact_ref, local_path)`
+                of each artifact
+
+        Returns:
+            None
+        """
+        cache = self.get_artifact_cache()
+
+        # Never write over a local path in place, as it may be memory-mapped by
+        # a loaded model, so fetch to a temporary file and rename it
+        fetched = []
+        downloads = []
+        for artifact_ref, local_path in artifacts:
+            md5 = artifact_ref.get("md5")
+            if md5 is not None and os.path.exists(local_path) and file_md5(local_path) == md5:
+                logging.info(f"ModelContainer {self.name}: {local_path} is up to date ({md5})")
+                continue
+
+            temp_path = f"{local_path}.{os.getpid()}.tmp"
+            fetched.append((temp_path, local_path))
+            if md5 is None or not cache.get(md5, temp_path):
+                downloads.append((artifact_ref, temp_path))
+
+        if len(downloads) > 0:
+            results = self.services.lake.download_many([(ref["path"], temp_path) for ref, temp_path in downloads])
+            try:
+                raise_for_failures(results, f"ModelContainer {self.name}: fetching artifacts")
+            except Exception:
+                for temp_path, _ in fetched:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+                raise
+
+            for artifact_ref, temp_path in downloads:
+                if artifact_ref.get("md5") is not None:
+                    cache.put(artifact_ref["md5"], temp_path)
+
+        for temp_path, local_path in fetched:
+            os.replace(temp_path, local_path)
+
+    def get_artifact_cache(self) -> ArtifactCache:
+        config = self.services.config
+        return ArtifactCache(config.artifact_cache_path, config.artifact_cache_max_bytes)
 
     def load_distributions(self, file_path: str):
         logging.info(f"ModelContainer {self.name}: load_distributions")
@@ -158,6 +607,9 @@ class ModelContainer:
             json_obj = json.load(f)
             self.feature_uniques = json_obj["feature_uniques"]
             self.feature_summaries = json_obj["feature_summaries"]
+            if json_obj.get("matrix_dtype") is not None:
+                self.matrix_dtype = np.dtype(json_obj["matrix_dtype"])
+            self._encoder = None
         return self
 
     def publish(self):
@@ -175,8 +627,11 @@ class ModelContainer:
         config = self.services.config
         lake = self.services.lake
 
-        lake.upload(bucket_path_dist, local_path_dist, bucket_name=config.lake_bucket)
-        lake.upload(bucket_path_model, local_path_model, bucket_name=config.lake_bucket)
+        results = lake.upload_many(
+            [(bucket_path_dist, local_path_dist), (bucket_path_model, local_path_model)],
+            bucket_name=config.lake_bucket,
+        )
+        raise_for_failures(results, f"ModelContainer {self.name}: publishing")
 
         # Now finally we want to write our reference file to our repository and build a merge request
         reference = {
@@ -194,10 +649,27 @@ class ModelContainer:
 
         return reference
 
+    def publish_reference(self, reference):
+        """
+        Upload the `reference` to a fixed location in the DataLake (see
+        `get_current_reference_bucket_path`), marking it as the current version
+        of the model for inference apps that poll the DataLake for new models.
+        """
+        local_path = self.dump_reference(reference)
+        self.services.lake.upload(
+            self.get_current_reference_bucket_path(),
+            local_path,
+            bucket_name=self.services.config.lake_bucket,
+        )
+
+    def get_current_reference_bucket_path(self):
+        return f"models/{self.project_name}/current/{self.filename_reference}"
+
     def dump_reference(self, reference):
         file_path = self.get_local_path(self.filename_reference)
         with open(file_path, "w") as f:
             json.dump(reference, f, indent=2)
+        return file_path
 
 
     def create_merge_request(self, reference, description="New models!"):
@@ -212,16 +684,38 @@ class ModelContainer:
 
     def bind_model(self, model):
         self.model = model
+        self.model_md5 = None
         return self
 
-    def dump_model(self):
+    def dump_model(self, compress=0):
+        """
+        Write the model to the local filesystem as a joblib.  Models written
+        uncompressed (the default) can be loaded memory-mapped.
+
+        Args:
+            compress (int): The joblib compression level (0 for none)
+
+        Returns:
+            The path to the file that was written
+        """
         model_path = self.get_local_path(self.filename_model)
-        joblib.dump(self.model, model_path)
+        joblib.dump(self.model, model_path, compress=compress)
         return model_path
 
-    def load_model(self):
+    def load_model(self, md5: str = None):
+        """
+        Load the model from the local filesystem, memory-mapping its numpy
+        arrays if `mmap_mode` is set.
+
+        Args:
+            md5 (str): The md5 of the model file, if already known (otherwise it is calculated)
+
+        Returns:
+            The model
+        """
         model_path = self.get_local_path(self.filename_model)
-        self.model = joblib.load(model_path)
+        self.model = joblib.load(model_path, mmap_mode=self.mmap_mode)
+        self.model_md5 = md5 if md5 is not None else file_md5(model_path)
         return self.model
 
     def get_local_path(self, filename):
@@ -239,3 +733,18 @@ class ModelContainer:
         )
         path = f"models/{self.project_name}/{config.ci_commit}/{workflow_id}/{filename}"
         return path
+
+
+def _to_float(value: Any) -> float:
+    # Missing, empty and unparseable values are all NaN
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+@contextmanager
+def _no_timer(stage: str):
+    yield
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import logging
+import os
+
+from typing import Any, Dict, List
+
+
+def op_fingerprint(name: str, kwargs: Dict[str, Any], inputs: Dict[str, Any], upstream: List[str]) -> str:
+    """
+    Calculate the fingerprint of a run of an op: an md5 of everything that
+    determines what the op produces.
+
+    Args:
+        name (str): The name of the op
+        kwargs (Dict[str, Any]): The arguments the op is invoked with
+        inputs (Dict[str, Any]): The inputs the op declared (e.g. its query text, or the
+            md5 of an artifact it reads)
+        upstream (List[str]): The fingerprints of the ops it depends on
+
+    Returns:
+        The md5 hex digest of the op's inputs
+    """
+    content = json.dumps(
+        {"op": name, "kwargs": kwargs, "inputs": inputs, "upstream": upstream},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.md5(content.encode("utf-8")).hexdigest()
+
+
+class OpCache:
+    """
+    Records the fingerprint of the last successful run of each op in a pipeline
+    (in a json file), so that a local run can skip ops whose fingerprint has not
+    changed since.
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Create a new `OpCache`
+
+        Args:
+            file_path (str): The json file to keep the fingerprints in
+        """
+        self.file_path = file_path
+        self.fingerprints: Dict[str, str] = dict()
+
+        if os.path.exists(file_path):
+            try:
+                with open(file_path) as f:
+                    self.fingerprints = json.load(f)
+            except ValueError:
+                logging.warning(f"OpCache: ignoring unreadable cache {file_path}")
+
+    def matches(self, name: str, fingerprint: str) -> bool:
+        """
+        Whether the last successful run of the op `name` had the given `fingerprint`
+        """
+        return fingerprint is not None and self.fingerprints.get(name) == fingerprint
+
+    def record(self, name: str, fingerprint: str):
+        """
+        Record a successful run of the op `name` with the given `fingerprint`
+        (or forget the op, if its fingerprint is None)
+        """
+        if fingerprint is None:
+            self.forget(name)
+            return
+
+        self.fingerprints[name] = fingerprint
+        self._save()
+
+    def forget(self, name: str):
+        """
+        Forget the last run of the op `name` (e.g. because it is running again and
+        may leave its outputs half written)
+        """
+        if self.fingerprints.pop(name, None) is not None:
+            self._save()
+
+    def _save(self):
+        directory = os.path.dirname(self.file_path)
+        if directory != "" and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+
+        temp_path = f"{self.file_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.fingerprints, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.file_path)
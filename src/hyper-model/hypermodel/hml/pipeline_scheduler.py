@@ -0,0 +1,160 @@
+import logging
+import multiprocessing
+import time
+
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_EXCEPTION
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def topological_levels(tasks: List[Dict[str, Any]]) -> List[List[str]]:
+    """
+    Group the tasks of a Workflow's DAG into levels, where every task in a level
+    depends only on tasks in earlier levels (and so the tasks within a level can
+    run at the same time).
+
+    Args:
+        tasks (List[Dict[str, Any]]): The DAG's tasks, each with a "name" and optional "dependencies"
+
+    Returns:
+        A list of levels, each a list of task names (in the order of `tasks`)
+    """
+    remaining = {t["name"]: set(t.get("dependencies", [])) for t in tasks}
+
+    levels = []
+    while len(remaining) > 0:
+        level = [name for name, dependencies in remaining.items() if len(dependencies & remaining.keys()) == 0]
+        if len(level) == 0:
+            raise Exception(f"Unable to schedule tasks, there is a dependency cycle between: {list(remaining.keys())}")
+
+        levels.append(level)
+        for name in level:
+            del remaining[name]
+
+    return levels
+
+
+class PipelineScheduler:
+    """
+    Runs the levels of a pipeline (see `topological_levels`) one after another,
+    running the tasks within each level concurrently on a pool of threads or
+    processes.  Nothing more is started once a task has failed, and the time
+    taken by each task is logged once the run finishes.
+
+    Tasks can be skipped (e.g. because their results are cached) with `should_run`,
+    which is called (on the scheduling thread) just before each level starts, and
+    the outcome of each task is reported to `on_success` / `on_failure`.
+    """
+
+    def __init__(self, max_workers: int = 1, use_processes: bool = False):
+        """
+        Create a new `PipelineScheduler`
+
+        Args:
+            max_workers (int): The most tasks to run at once
+            use_processes (bool): Run tasks in forked processes (for CPU bound tasks
+                holding the GIL), rather than in threads
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.use_processes = use_processes
+
+        if self.use_processes and "fork" not in multiprocessing.get_all_start_methods():
+            logging.warning("PipelineScheduler: processes need fork, running tasks in threads instead")
+            self.use_processes = False
+
+    def run(
+        self,
+        levels: List[List[str]],
+        run_task: Callable[[str], Any],
+        should_run: Callable[[str], bool] = None,
+        on_success: Callable[[str, float, Any], None] = None,
+        on_failure: Callable[[str, float, Exception], None] = None,
+    ) -> Dict[str, float]:
+        """
+        Run every task, level by level, raising the first failure once the tasks
+        already running have finished.
+
+        Args:
+            levels (List[List[str]]): The task names to run, grouped into levels
+            run_task (Callable[[str], Any]): Runs the named task (this must be a module
+                level function when `use_processes` is True, so it can be pickled)
+            should_run (Callable[[str], bool]): Whether the named task needs to run (all
+                tasks run when this is None)
+            on_success (Callable[[str, float, Any], None]): Called (on the scheduling thread)
+                with the name, time taken and result of each task that succeeds
+            on_failure (Callable[[str, float, Exception], None]): Called (on the scheduling
+                thread) with the name, time taken and exception of each task that fails
+
+        Returns:
+            A dict of the time (in seconds) taken by each task that ran
+        """
+        timings: Dict[str, float] = dict()
+        skipped: List[str] = []
+        failed = None
+
+        if self.use_processes:
+            pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("fork"))
+        else:
+            pool = ThreadPoolExecutor(max_workers=self.max_workers)
+
+        start = time.monotonic()
+        try:
+            for level in levels:
+                if should_run is not None:
+                    skipped.extend([name for name in level if not should_run(name)])
+                    level = [name for name in level if name not in skipped]
+                if len(level) == 0:
+                    continue
+
+                logging.info(f"PipelineScheduler: running {level}")
+                level_start = time.monotonic()
+                futures = {pool.submit(_timed, run_task, name): name for name in level}
+
+                done, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+                if any(f.exception() is not None for f in done):
+                    # Don't start anything new, but let what's running finish
+                    for f in not_done:
+                        f.cancel()
+                    wait(not_done)
+
+                for f, name in futures.items():
+                    if f.cancelled():
+                        continue
+                    ex = f.exception()
+                    if ex is not None:
+                        timings[name] = getattr(ex, "task_seconds", time.monotonic() - level_start)
+                        failed = failed or (name, ex)
+                        if on_failure is not None:
+                            on_failure(name, timings[name], ex)
+                    else:
+                        timings[name], result = f.result()
+                        if on_success is not None:
+                            on_success(name, timings[name], result)
+
+                if failed is not None:
+                    break
+        finally:
+            pool.shutdown(wait=True)
+            self._log_timings(timings, skipped, time.monotonic() - start, failed)
+
+        if failed is not None:
+            raise failed[1]
+
+        return timings
+
+    def _log_timings(self, timings: Dict[str, float], skipped: List[str], total: float, failed):
+        logging.info(f"PipelineScheduler: finished in {total:.2f}s")
+        for name in skipped:
+            logging.info(f"PipelineScheduler:   {name}: skipped")
+        for name, seconds in timings.items():
+            status = "failed" if failed is not None and failed[0] == name else "ok"
+            logging.info(f"PipelineScheduler:   {name}: {seconds:.2f}s ({status})")
+
+
+def _timed(run_task: Callable[[str], Any], name: str) -> Tuple[float, Any]:
+    start = time.monotonic()
+    try:
+        result = run_task(name)
+    except Exception as ex:
+        ex.task_seconds = time.monotonic() - start
+        raise
+    return (time.monotonic() - start, result)
@@ -0,0 +1,224 @@
+import bisect
+import math
+import threading
+import time
+
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+
+# Bucket upper bounds (in seconds) for latency histograms
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Bucket upper bounds for the number of records in a batch
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+class _ThreadValues:
+    """
+    The metric values recorded by a single thread, which only that thread writes to
+    """
+
+    def __init__(self):
+        self.counters: Dict[Tuple[str, Tuple[str, ...]], float] = dict()
+        # [bucket counts..., +Inf count] and the sum, per histogram and labels
+        self.histograms: Dict[Tuple[str, Tuple[str, ...]], Tuple[List[int], List[float]]] = dict()
+
+    def add(self, other: "_ThreadValues"):
+        """
+        Add the values of `other` to ours
+        """
+        for key, value in list(other.counters.items()):
+            self.counters[key] = self.counters.get(key, 0) + value
+
+        for key, (counts, total) in list(other.histograms.items()):
+            entry = self.histograms.get(key)
+            if entry is None:
+                self.histograms[key] = (list(counts), [total[0]])
+            else:
+                self.histograms[key] = ([a + b for a, b in zip(entry[0], counts)], [entry[1][0] + total[0]])
+
+
+class Metrics:
+    """
+    A registry of counters and histograms, exposed in the Prometheus text format.
+
+    Recording a value takes no locks: each thread accumulates into its own values,
+    which are only summed up when the metrics are rendered (so a scrape may see a
+    value that is a moment out of date).  The values of threads that have finished
+    are folded into a single total, so threads that come and go (e.g. one per
+    request) don't accumulate.  Values are per process, so with several worker
+    processes each reports its own metrics.
+
+        metrics = Metrics()
+        metrics.histogram("hml_request_seconds", "Request latency", ["route"])
+        with metrics.span("hml_request_seconds", ("/predict",)):
+            ...
+    """
+
+    def __init__(self):
+        self._definitions: Dict[str, Tuple[str, str, List[str], Tuple[float, ...]]] = dict()
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Dict[Tuple[str, ...], float], List[str]]]]] = []
+        self._local = threading.local()
+        # The values of each thread that has recorded any, and of the threads that have finished
+        self._threads: List[Tuple[threading.Thread, _ThreadValues]] = []
+        self._finished = _ThreadValues()
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, labels: List[str] = None):
+        """
+        Define a counter
+
+        Args:
+            name (str): The name of the metric (e.g. `hml_requests_total`)
+            help (str): A description of the metric
+            labels (List[str]): The names of the metric's labels
+        """
+        self._definitions[name] = ("counter", help, labels or [], ())
+
+    def histogram(self, name: str, help: str, labels: List[str] = None, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        """
+        Define a histogram
+
+        Args:
+            name (str): The name of the metric (e.g. `hml_request_seconds`)
+            help (str): A description of the metric
+            labels (List[str]): The names of the metric's labels
+            buckets (Tuple[float]): The (sorted) upper bounds of the histogram's buckets
+        """
+        self._definitions[name] = ("histogram", help, labels or [], tuple(buckets))
+
+    def add_collector(self, collector: Callable):
+        """
+        Add a function called whenever the metrics are rendered, for values that are
+        tracked elsewhere (e.g. the hits of a cache).  It returns an iterable of
+        (name, type, help, values, label names) tuples, where values is a dict of
+        label values to value.
+        """
+        self._collectors.append(collector)
+
+    def inc(self, name: str, labels: Tuple[str, ...] = (), amount: float = 1):
+        """
+        Increment the counter `name` (with the given label values) by `amount`
+        """
+        counters = self._values().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + amount
+
+    def observe(self, name: str, labels: Tuple[str, ...], value: float):
+        """
+        Record `value` in the histogram `name` (with the given label values)
+        """
+        histograms = self._values().histograms
+        key = (name, labels)
+        entry = histograms.get(key)
+        if entry is None:
+            entry = ([0] * (len(self._definitions[name][3]) + 1), [0.0])
+            histograms[key] = entry
+
+        counts, total = entry
+        counts[bisect.bisect_left(self._definitions[name][3], value)] += 1
+        total[0] += value
+
+    @contextmanager
+    def span(self, name: str, labels: Tuple[str, ...] = ()):
+        """
+        Time the body of the `with` block, recording its duration (in seconds)
+        in the histogram `name`
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, labels, time.perf_counter() - start)
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format
+
+        Returns:
+            The metrics, as text
+        """
+        totals = _ThreadValues()
+        with self._lock:
+            self._fold_finished_threads()
+            totals.add(self._finished)
+            for _, values in self._threads:
+                totals.add(values)
+        counters = totals.counters
+        histograms = totals.histograms
+
+        lines = []
+        for name, (metric_type, help, label_names, buckets) in self._definitions.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {metric_type}")
+
+            if metric_type == "counter":
+                for (n, labels), value in sorted(counters.items()):
+                    if n == name:
+                        lines.append(f"{name}{_labels(label_names, labels)} {_number(value)}")
+                continue
+
+            for (n, labels), (counts, total) in sorted(histograms.items()):
+                if n != name:
+                    continue
+
+                cumulative = 0
+                for bound, count in zip(buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = _number(bound)
+                    lines.append(f"{name}_bucket{_labels(label_names + ['le'], labels + (le,))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(label_names, labels)} {_number(total[0])}")
+                lines.append(f"{name}_count{_labels(label_names, labels)} {cumulative}")
+
+        for collector in self._collectors:
+            for name, metric_type, help, values, label_names in collector():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in sorted(values.items()):
+                    lines.append(f"{name}{_labels(label_names, labels)} {_number(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    def _values(self) -> _ThreadValues:
+        values = getattr(self._local, "values", None)
+        if values is None:
+            values = _ThreadValues()
+            self._local.values = values
+            # Only taken once per thread, on its first recorded value
+            with self._lock:
+                self._fold_finished_threads()
+                self._threads.append((threading.current_thread(), values))
+        return values
+
+    def _fold_finished_threads(self):
+        # Called with the lock held.  A finished thread never writes to its values again
+        running = []
+        for thread, values in self._threads:
+            if thread.is_alive():
+                running.append((thread, values))
+            else:
+                self._finished.add(values)
+        self._threads = running
+
+
+def _labels(names: List[str], values: Tuple[str, ...]) -> str:
+    if len(names) == 0:
+        return ""
+
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _number(value: float) -> str:
+    # The exposition format's spelling of the values `int` can't convert
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
@@ -0,0 +1,128 @@
+import logging
+import queue
+import threading
+import time
+
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List
+
+
+class MicroBatcher:
+    """
+    Merges records submitted concurrently (e.g. by many single-record prediction
+    requests being served on different threads) into batches, so that the model's
+    `predict` is called once per batch rather than once per record.
+
+    A batch is sent as soon as it holds `max_batch_size` records, or `max_wait_ms`
+    after its first record arrived, whichever comes first.  Each record is predicted
+    by the model it was submitted with, so records submitted before a new version
+    of the model is swapped in are still predicted by the old version.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        predict_batch: Callable[[Any, List[Dict[str, Any]]], List[Any]],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5,
+    ):
+        """
+        Create a new `MicroBatcher`
+
+        Args:
+            name (str): The name of the batcher (used for logging / thread names)
+            predict_batch (Callable): A function that takes a model and a list of records,
+                and returns a list of predictions in the same order
+            max_batch_size (int): The most records to send to `predict_batch` at once
+            max_wait_ms (float): The longest to wait for a batch to fill, in milliseconds
+        """
+        self.name = name
+        self.predict_batch = predict_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = float(max_wait_ms) / 1000
+
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, model: Any, record: Dict[str, Any]) -> Any:
+        """
+        Queue the `record` for the next batch, and block until its prediction is ready
+
+        Args:
+            model (Any): The model (e.g. `ModelContainer`) to predict `record` with
+            record (Dict[str, Any]): A dict keyed by feature name
+
+        Returns:
+            The prediction for `record`, or raises the Exception predicting it raised
+        """
+        self._ensure_started()
+
+        future: Future = Future()
+        self._queue.put((model, record, future))
+        return future.result()
+
+    def _ensure_started(self):
+        # The worker thread is started lazily, so that a batcher created before
+        # the server forks ends up with a thread in the process that serves requests
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name=f"MicroBatcher-{self.name}", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            # Only records submitted with the same model can be predicted together
+            groups: Dict[int, List] = dict()
+            for model, record, future in batch:
+                groups.setdefault(id(model), []).append((model, record, future))
+            for group in groups.values():
+                self._predict(group[0][0], [(record, future) for _, record, future in group])
+
+    def _predict(self, model, batch):
+        records = [record for record, _ in batch]
+        try:
+            predictions = self.predict_batch(model, records)
+        except Exception as ex:
+            if len(batch) == 1:
+                _, future = batch[0]
+                future.set_exception(ex)
+                return
+
+            # One bad record should not fail everyone else's request, so fall back
+            # to predicting each record on its own
+            logging.info(f"MicroBatcher {self.name}: batch of {len(batch)} failed, retrying records individually")
+            for record, future in batch:
+                try:
+                    future.set_result(self.predict_batch(model, [record])[0])
+                except Exception as record_ex:
+                    future.set_exception(record_ex)
+            return
+
+        predictions = list(predictions)
+        if len(predictions) != len(batch):
+            # Never guess which prediction belongs to which record
+            ex = Exception(f"MicroBatcher {self.name}: predicted {len(predictions)} results for a batch of {len(batch)} records")
+            for _, future in batch:
+                future.set_exception(ex)
+            return
+
+        for (_, future), prediction in zip(batch, predictions):
+            future.set_result(prediction)
@@ -0,0 +1,136 @@
+import copy
+import json
+import logging
+import os
+import threading
+
+from typing import Any, Dict
+
+
+class ModelReloader:
+    """
+    Polls for new versions of the models registered with an `HmlInferenceApp`, and
+    swaps them in without restarting the app.
+
+    A new version is found by comparing each model's reference (the json written by
+    `ModelContainer.publish`) with the reference it was loaded from, reading the
+    reference either from its local file (`source="file"`, e.g. when the file is
+    mounted from a ConfigMap) or from the DataLake (`source="lake"`).  The "lake"
+    source only sees versions whose pipeline calls `ModelContainer.publish_reference`
+    after `ModelContainer.publish`.
+
+    The new version is loaded (and warmed up) into a copy of the `ModelContainer` on
+    a background thread, and only replaces the model in the app once it is ready, so
+    requests already in flight finish on the old version.
+
+    When serving from several worker processes, the app makes one `check` in the
+    parent before it forks, so the workers share the latest version copy-on-write.
+    Each worker then polls on its own background thread.
+    """
+
+    def __init__(self, inference_app, interval_seconds: float = 60, source: str = "file"):
+        """
+        Create a new `ModelReloader`
+
+        Args:
+            inference_app (HmlInferenceApp): The app whose models should be reloaded
+            interval_seconds (float): How often (in seconds) to check for new versions
+            source (str): Where to look for new references, either "file" or "lake"
+        """
+        if source not in ("file", "lake"):
+            raise Exception(f"ModelReloader: Unknown source '{source}', expected 'file' or 'lake'")
+
+        self.inference_app = inference_app
+        self.interval_seconds = float(interval_seconds)
+        self.source = source
+
+        self._thread: threading.Thread = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        """
+        Start polling for new versions on a background thread (in this process).
+        The thread checks straight away, as a worker recycled long after its parent
+        process loaded the models may be several versions behind.  Nothing is loaded
+        before returning, so a worker never blocks its server while it starts.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="ModelReloader", daemon=True)
+        self._thread.start()
+        logging.info(f"ModelReloader: checking for new models every {self.interval_seconds}s ({self.source})")
+
+    def stop(self):
+        self._stopped.set()
+
+    def check(self, warm_up: bool = True):
+        """
+        Check every registered model for a new version once, reloading any that
+        have changed.
+
+        Args:
+            warm_up (bool): Warm up each new version before swapping it in (rather
+                than leaving it to the app, e.g. once a parent process has forked)
+
+        Returns:
+            The names of the models that were reloaded
+        """
+        reloaded = []
+        for name, model_container in list(self.inference_app.models.items()):
+            try:
+                if self.check_model(model_container, warm_up=warm_up):
+                    reloaded.append(name)
+            except Exception:
+                logging.exception(f"ModelReloader: failed to reload {name}, keeping the current version")
+        return reloaded
+
+    def check_model(self, model_container, warm_up: bool = True) -> bool:
+        """
+        Reload the given model if its reference has changed since it was loaded
+
+        Args:
+            model_container (ModelContainer): The currently loaded model
+            warm_up (bool): Warm up the new version before swapping it in
+
+        Returns:
+            True if a new version was loaded and swapped in
+        """
+        reference_file = self._fetch_reference(model_container)
+        with open(reference_file) as f:
+            reference: Dict[str, Any] = json.load(f)
+
+        if reference == model_container.reference:
+            return False
+
+        md5 = reference["model"].get("md5")
+        logging.info(f"ModelReloader: loading {model_container.name} ({model_container.model_md5} -> {md5})")
+
+        # Load into a copy, leaving the current version untouched until the new one is ready
+        new_container = copy.copy(model_container)
+        new_container.load(reference_file)
+        if warm_up:
+            new_container.warm_up(self.inference_app.warm_up_records)
+
+        self.inference_app.swap_model(new_container, warm_up=warm_up)
+        logging.info(f"ModelReloader: {model_container.name} is now serving {md5}")
+        return True
+
+    def _fetch_reference(self, model_container) -> str:
+        if self.source == "file":
+            return model_container.get_local_path(model_container.filename_reference)
+
+        local_path = model_container.get_local_path(f"{model_container.filename_reference}.{os.getpid()}.latest")
+        model_container.services.lake.download(
+            model_container.get_current_reference_bucket_path(),
+            local_path,
+            bucket_name=model_container.services.config.lake_bucket,
+        )
+        return local_path
+
+    def _run(self):
+        while True:
+            self.check()
+            if self._stopped.wait(self.interval_seconds):
+                return
@@ -0,0 +1,127 @@
+import json
+import threading
+import time
+
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+
+class PredictionCache:
+    """
+    A bounded, thread safe cache of predictions for a single model, keyed on the
+    (canonicalised) features of the record being predicted.  The least recently
+    used prediction is evicted once the cache holds `max_size` predictions, and
+    predictions older than `ttl_seconds` are never returned.
+
+    Every lookup is made against a `version` (the md5 of the model), and the cache
+    is cleared whenever the version looked up changes, so that a newly loaded model
+    never returns predictions made by the model it replaced.  Predictions made by
+    any other version than the one last looked up (e.g. by requests that were still
+    running on the old model) are not cached.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 0):
+        """
+        Create a new `PredictionCache`
+
+        Args:
+            max_size (int): The most predictions to keep
+            ttl_seconds (float): How long (in seconds) a prediction stays valid (0 for forever)
+        """
+        self.max_size = max(1, int(max_size))
+        self.ttl_seconds = float(ttl_seconds)
+
+        self.version: str = None
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(record: Dict[str, Any]) -> str:
+        """
+        The canonical form of `record`, which is the same for records with the same
+        features and values, regardless of the order they were added in.
+
+        Args:
+            record (Dict[str, Any]): A dict keyed by feature name
+
+        Returns:
+            The key to cache the prediction for `record` under
+        """
+        return json.dumps(record, sort_keys=True, separators=(",", ":"), default=str)
+
+    def get(self, version: str, key: str) -> Tuple[bool, Any]:
+        """
+        Look up the prediction cached under `key` for the given model `version`
+
+        Args:
+            version (str): The md5 of the model making predictions
+            key (str): The key returned by `PredictionCache.key`
+
+        Returns:
+            A tuple of (True, prediction) if the prediction was cached, or (False, None)
+        """
+        with self._lock:
+            self._check_version(version)
+
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds > 0 and time.monotonic() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return (False, None)
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return (True, entry[1])
+
+    def put(self, version: str, key: str, prediction: Any):
+        """
+        Cache the `prediction` made by the given model `version` under `key`, unless
+        that is no longer the current version
+
+        Args:
+            version (str): The md5 of the model that made the prediction
+            key (str): The key returned by `PredictionCache.key`
+            prediction (Any): The prediction to cache
+        """
+        with self._lock:
+            if self.version is None:
+                self.version = version
+            if version != self.version:
+                return
+
+            self._entries[key] = (time.monotonic(), prediction)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Remove every cached prediction
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            A dict of the cache's `size`, `hits` and `misses`, and the model `version`
+        """
+        with self._lock:
+            return {
+                "version": self.version,
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _check_version(self, version: str):
+        # Called with the lock held
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
@@ -0,0 +1,84 @@
+import gc
+import logging
+
+from typing import Callable
+
+from gunicorn.app.base import BaseApplication
+
+
+class PreforkServer(BaseApplication):
+    """
+    Serves a WSGI app (e.g. our Flask app) from several worker processes, each
+    with its own pool of threads, all accepting connections from the one listening
+    socket (using Gunicorn, with its threaded workers).  This lets CPU bound
+    predictions run in parallel, rather than queueing up behind the GIL of a
+    single process.
+
+    The app (and its models) should be fully loaded before calling `serve`, so
+    that the workers share the parent's memory copy-on-write.  Workers can be
+    recycled after serving `max_requests` requests, in which case they stop
+    accepting connections, finish the requests they have in flight and are
+    replaced by a fresh worker.
+    """
+
+    def __init__(
+        self,
+        wsgi_app,
+        port: int,
+        workers: int,
+        threads: int = 4,
+        max_requests: int = 0,
+        graceful_timeout: float = 30,
+        on_worker_start: Callable[[], None] = None,
+    ):
+        """
+        Create a new `PreforkServer`
+
+        Args:
+            wsgi_app (Callable): The WSGI app to serve
+            port (int): The port to listen on (on all interfaces)
+            workers (int): The number of worker processes
+            threads (int): The number of threads each worker uses to serve requests
+            max_requests (int): Recycle a worker after it has served this many requests (0 to never recycle)
+            graceful_timeout (float): The longest (in seconds) a stopping worker waits for its requests to finish
+            on_worker_start (Callable): Called in each worker process before it starts serving
+                (e.g. to start background threads, which are not copied by the fork)
+        """
+        self.wsgi_app = wsgi_app
+        self.on_worker_start = on_worker_start
+        self.options = {
+            "bind": f"0.0.0.0:{port}",
+            "workers": workers,
+            "worker_class": "gthread",
+            "threads": threads,
+            "max_requests": max_requests,
+            "graceful_timeout": graceful_timeout,
+            # The app is already loaded (by us), and is shared by every worker
+            "preload_app": True,
+            "post_fork": self._post_fork,
+        }
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        return self.wsgi_app
+
+    def serve(self):
+        """
+        Bind the listening socket, fork the workers and supervise them until we are
+        asked to stop (with SIGTERM or SIGINT), replacing any worker that exits.
+        """
+        # Keep everything loaded so far out of the garbage collector's way, so that
+        # collections in the workers don't touch (and so copy) the shared pages
+        if hasattr(gc, "freeze"):
+            gc.freeze()
+
+        logging.info(f"PreforkServer: starting {self.cfg.workers} workers ({self.cfg.threads} threads each) on {self.cfg.bind}")
+        self.run()
+
+    def _post_fork(self, server, worker):
+        if self.on_worker_start is not None:
+            self.on_worker_start()
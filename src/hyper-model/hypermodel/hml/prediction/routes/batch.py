@@ -0,0 +1,58 @@
+import logging
+import json
+
+from flask import Flask, request, jsonify
+
+
+def bind_batch_routes(app: Flask, inference_app):
+    """
+    Binds new routes to the Flask App for scoring many records in a
+    single request, against any model registered with the `inference_app`.
+
+    The body of a request may either be a JSON array of records, or
+    newline delimited JSON (one record per line, with a content type
+    of `application/x-ndjson`).  Predictions are returned in the same
+    order as the records.
+
+    Args:
+        app (Flask): The app to bind the new routes
+        inference_app (HmlInferenceApp): The app hosting the models to predict with
+
+    Returns:
+        Nothing
+    """
+
+    @app.route("/models/<model_name>/predict-batch", methods=["POST"])
+    def predict_batch(model_name):
+        logging.info(f"api: /models/{model_name}/predict-batch")
+
+        model_container = inference_app.get_model(model_name)
+        if model_container is None:
+            return jsonify({"success": False, "error": f"Unknown model: {model_name}"}), 404
+
+        try:
+            records = parse_records(request.get_data(as_text=True), request.mimetype)
+            predictions = inference_app.predict_batch(model_name, records)
+
+            with inference_app.metrics.span("hml_model_stage_seconds", (model_name, "serialise")):
+                return jsonify({"success": True, "predictions": predictions})
+        except Exception as ex:
+            return jsonify({"success": False, "error": ex.args[0] if ex.args else str(ex)})
+
+
+def parse_records(body: str, mimetype: str = None):
+    """
+    Parse the body of a batch request into a list of records, accepting either
+    a JSON array or newline delimited JSON.
+
+    Args:
+        body (str): The text of the request body
+        mimetype (str): The mimetype of the request
+
+    Returns:
+        A list of records (dicts keyed by feature name)
+    """
+    if mimetype != "application/x-ndjson" and body.lstrip().startswith("["):
+        return json.loads(body)
+
+    return [json.loads(line) for line in body.splitlines() if line.strip() != ""]
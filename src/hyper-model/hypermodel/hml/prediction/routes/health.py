@@ -4,13 +4,15 @@ import logging
 from flask import Flask
 
 
-def bind_health_routes(app: Flask):
+def bind_health_routes(app: Flask, inference_app):
     """
     Binds new routes to the Flask App providing functionality about
-    the health of the application.
+    the health of the application: `/livez` (the process is up), `/readyz`
+    (every model is loaded and warmed up, so we can take traffic) and `/healthz`.
 
     Args:
         app (Flask): The app to bind the new routes
+        inference_app (HmlInferenceApp): The app whose readiness to report
 
     Returns:
         Nothing
@@ -21,6 +23,16 @@ def bind_health_routes(app: Flask):
         logging.info("api: /healthz")
         return "I am healthy!"
 
+    @app.route('/livez')
+    def live():
+        return "ok"
+
+    @app.route('/readyz')
+    def ready():
+        if inference_app.is_ready():
+            return "ok"
+        return "not ready", 503
+
     @app.route('/testing')
     def testing():
         logging.info("api: /testing")
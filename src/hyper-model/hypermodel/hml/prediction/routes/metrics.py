@@ -0,0 +1,44 @@
+import time
+
+from flask import Flask, Response, g, request
+
+from hypermodel.hml.prediction.metrics import Metrics
+
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def bind_metrics_routes(app: Flask, metrics: Metrics):
+    """
+    Binds a `/metrics` route to the Flask App, exposing the `metrics` in the
+    Prometheus text format, and records the latency and status of every request
+    made to the app.
+
+    Args:
+        app (Flask): The app to bind the new routes
+        metrics (Metrics): The metrics to record requests in, and to expose
+
+    Returns:
+        Nothing
+    """
+
+    @app.before_request
+    def start_timer():
+        g.hml_request_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        start = g.get("hml_request_start")
+        if start is not None:
+            route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+            record_request_metrics(metrics, route, request.method, response.status_code, time.perf_counter() - start)
+        return response
+
+    @app.route("/metrics")
+    def metrics_route():
+        return Response(metrics.render(), mimetype="text/plain", content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def record_request_metrics(metrics: Metrics, route: str, method: str, status: int, seconds: float):
+    metrics.inc("hml_requests_total", (route, method, str(status)))
+    metrics.observe("hml_request_seconds", (route,), seconds)
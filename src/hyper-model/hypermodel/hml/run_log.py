@@ -0,0 +1,130 @@
+import json
+import logging
+import os
+
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+
+class RunLog:
+    """
+    A record of a local run of a pipeline (the status, timing and outputs of each
+    of its tasks), saved to a json file every time it changes so that a failed run
+    can be resumed from where it failed.
+    """
+
+    def __init__(self, file_path: str, pipeline: str, run_id: str, on_save: Callable[[str], None] = None):
+        """
+        Create a new (empty) `RunLog`
+
+        Args:
+            file_path (str): The json file to save the run log to
+            pipeline (str): The name of the pipeline being run
+            run_id (str): The id of the run
+            on_save (Callable[[str], None]): Called with `file_path` after each save
+                (e.g. to copy the run log to the DataLake)
+        """
+        self.file_path = file_path
+        self.pipeline = pipeline
+        self.run_id = run_id
+        self.on_save = on_save
+
+        self.started = datetime.utcnow().isoformat()
+        self.tasks: Dict[str, Dict[str, Any]] = dict()
+
+    @staticmethod
+    def new_run_id() -> str:
+        return datetime.utcnow().strftime("%Y%m%d-%H%M%S-%f")
+
+    @staticmethod
+    def load(file_path: str, on_save: Callable[[str], None] = None) -> "RunLog":
+        """
+        Load a run log saved at `file_path`
+        """
+        with open(file_path) as f:
+            json_obj = json.load(f)
+
+        run_log = RunLog(file_path, json_obj["pipeline"], json_obj["run_id"], on_save=on_save)
+        run_log.started = json_obj["started"]
+        run_log.tasks = json_obj["tasks"]
+        return run_log
+
+    @staticmethod
+    def latest(directory: str) -> str:
+        """
+        Find the most recent run log saved in `directory`
+
+        Returns:
+            The path of the run log, or None if there are none
+        """
+        if not os.path.exists(directory):
+            return None
+
+        # Run ids sort in the order the runs were started
+        run_files: List[str] = sorted(f for f in os.listdir(directory) if f.endswith(".json"))
+        if len(run_files) == 0:
+            return None
+        return os.path.join(directory, run_files[-1])
+
+    def is_succeeded(self, task_name: str) -> bool:
+        return self.tasks.get(task_name, {}).get("status") == "succeeded"
+
+    def task_started(self, task_name: str):
+        self.tasks[task_name] = {
+            "status": "running",
+            "started": datetime.utcnow().isoformat(),
+        }
+        self.save()
+
+    def task_succeeded(self, task_name: str, seconds: float, outputs: Any = None, usage: Dict[str, float] = None):
+        """
+        Record that the task succeeded, along with anything it returned (e.g. the
+        references of the artifacts it published) and the resources it used
+        """
+        task = self.tasks.setdefault(task_name, {})
+        task["status"] = "succeeded"
+        task["seconds"] = seconds
+        task["outputs"] = outputs
+        if usage is not None:
+            task["usage"] = usage
+        self.save()
+
+    def task_failed(self, task_name: str, seconds: float, error: Exception, usage: Dict[str, float] = None):
+        task = self.tasks.setdefault(task_name, {})
+        task["status"] = "failed"
+        task["seconds"] = seconds
+        task["error"] = repr(error)
+        if usage is not None:
+            task["usage"] = usage
+        self.save()
+
+    def task_skipped(self, task_name: str, reason: str):
+        # Keep the record of a run that succeeded earlier (when resuming)
+        if self.is_succeeded(task_name):
+            return
+
+        self.tasks[task_name] = {"status": "skipped", "reason": reason}
+        self.save()
+
+    def save(self):
+        directory = os.path.dirname(self.file_path)
+        if directory != "" and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+
+        json_obj = {
+            "pipeline": self.pipeline,
+            "run_id": self.run_id,
+            "started": self.started,
+            "tasks": self.tasks,
+        }
+
+        temp_path = f"{self.file_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(json_obj, f, indent=2, default=str)
+        os.replace(temp_path, self.file_path)
+
+        if self.on_save is not None:
+            try:
+                self.on_save(self.file_path)
+            except Exception:
+                logging.exception(f"RunLog: failed to copy {self.file_path}")
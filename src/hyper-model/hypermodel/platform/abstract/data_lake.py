@@ -1,9 +1,47 @@
-
+import logging
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Tuple
+
+
+class TransferResult:
+    """
+    The outcome of transferring one file with `DataLakeBase.upload_many` or
+    `DataLakeBase.download_many`
+    """
+
+    def __init__(self, bucket_path: str, local_path: str):
+        self.bucket_path = bucket_path
+        self.local_path = local_path
+        self.succeeded = False
+        self.attempts = 0
+        self.seconds = 0.0
+        self.error: Exception = None
+
+    def __repr__(self):
+        status = "succeeded" if self.succeeded else f"failed: {self.error!r}"
+        return f"TransferResult({self.bucket_path} <-> {self.local_path}, {status}, attempts={self.attempts})"
+
+
+def raise_for_failures(results: List[TransferResult], action: str):
+    """
+    Raise an exception describing every transfer in `results` that failed (if any did)
+
+    Args:
+        results (List[TransferResult]): The results of `upload_many` or `download_many`
+        action (str): What the transfers were for (for the message)
+    """
+    failed = [r for r in results if not r.succeeded]
+    if len(failed) > 0:
+        raise Exception(f"{action}: {len(failed)} of {len(results)} transfers failed: {failed}")
 
 
 class DataLakeBase(ABC): # extends Abstract Base class
 
+    # The most files `upload_many` / `download_many` transfer at once by default
+    max_transfer_workers: int = 8
+
     @abstractmethod
     def upload(self, bucket_path: str, local_path: str, bucket_name: str = None) -> bool:
         pass
@@ -11,3 +49,118 @@ class DataLakeBase(ABC): # extends Abstract Base class
     @abstractmethod
     def download(self, bucket_path: str, destination_local_path: str, bucket_name: str = None) -> bool:
         pass
+
+    def upload_many(
+        self,
+        transfers: List[Tuple[str, str]],
+        bucket_name: str = None,
+        max_workers: int = None,
+        retries: int = 3,
+        backoff_seconds: float = 0.5,
+    ) -> List[TransferResult]:
+        """
+        Upload many files at once, on a pool of threads, retrying each failed upload.
+
+        Args:
+            transfers (List[Tuple[str, str]]): The `(bucket_path, local_path)` of each file
+            bucket_name (str): The bucket to upload to (default: the lake's bucket)
+            max_workers (int): The most files to upload at once (default: `max_transfer_workers`)
+            retries (int): How many times to retry an upload that fails
+            backoff_seconds (float): How long to wait before the first retry (doubling
+                before each retry after that)
+
+        Returns:
+            A `TransferResult` for each file, in the order of `transfers`.  Failures are
+            reported in the results rather than raised (see `raise_for_failures`)
+        """
+        return self._transfer_many(
+            lambda bucket_path, local_path: self.upload(bucket_path, local_path, bucket_name=bucket_name),
+            transfers,
+            max_workers,
+            retries,
+            backoff_seconds,
+        )
+
+    def download_many(
+        self,
+        transfers: List[Tuple[str, str]],
+        bucket_name: str = None,
+        max_workers: int = None,
+        retries: int = 3,
+        backoff_seconds: float = 0.5,
+    ) -> List[TransferResult]:
+        """
+        Download many files at once, on a pool of threads, retrying each failed download.
+
+        Args:
+            transfers (List[Tuple[str, str]]): The `(bucket_path, destination_local_path)` of each file
+            bucket_name (str): The bucket to download from (default: the lake's bucket)
+            max_workers (int): The most files to download at once (default: `max_transfer_workers`)
+            retries (int): How many times to retry a download that fails
+            backoff_seconds (float): How long to wait before the first retry (doubling
+                before each retry after that)
+
+        Returns:
+            A `TransferResult` for each file, in the order of `transfers`.  Failures are
+            reported in the results rather than raised (see `raise_for_failures`)
+        """
+        return self._transfer_many(
+            lambda bucket_path, local_path: self.download(bucket_path, local_path, bucket_name=bucket_name),
+            transfers,
+            max_workers,
+            retries,
+            backoff_seconds,
+        )
+
+    def _transfer_many(
+        self,
+        transfer: Callable[[str, str], bool],
+        transfers: List[Tuple[str, str]],
+        max_workers: int,
+        retries: int,
+        backoff_seconds: float,
+    ) -> List[TransferResult]:
+        if max_workers is None:
+            max_workers = self.max_transfer_workers
+        max_workers = max(1, min(int(max_workers), len(transfers)))
+
+        results = [TransferResult(bucket_path, local_path) for bucket_path, local_path in transfers]
+        if len(results) == 0:
+            return results
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            list(pool.map(lambda r: _transfer_with_retries(transfer, r, retries, backoff_seconds), results))
+
+        return results
+
+
+def _transfer_with_retries(transfer: Callable[[str, str], bool], result: TransferResult, retries: int, backoff_seconds: float):
+    start = time.monotonic()
+    for attempt in range(1, retries + 2):
+        result.attempts = attempt
+        try:
+            if transfer(result.bucket_path, result.local_path) is not False:
+                result.succeeded = True
+                result.error = None
+                break
+            result.error = Exception("The transfer returned False")
+        except Exception as ex:
+            result.error = ex
+            if _is_permanent(ex):
+                break
+
+        if attempt <= retries:
+            delay = backoff_seconds * (2 ** (attempt - 1))
+            logging.warning(f"DataLake: {result.bucket_path} failed ({result.error!r}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+    result.seconds = time.monotonic() - start
+
+
+def _is_permanent(ex: Exception) -> bool:
+    # There is no point retrying a file that isn't there, or that we aren't allowed
+    # to read / write: locally, or in the lake (e.g. Google's `NotFound` and
+    # `Forbidden` exceptions, which carry the HTTP status as their `code`)
+    if isinstance(ex, (FileNotFoundError, PermissionError)):
+        return True
+    return getattr(ex, "code", None) in (403, 404)
@@ -1,6 +1,6 @@
 import pandas as pd
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterator, List, Optional
 
 from hypermodel.model.table_schema import SqlTable, SqlColumn
 
@@ -18,6 +18,10 @@ class DataWarehouseBase(ABC): # extends Abstract Base class
     def dataframe_from_table(self, dataset: str, table: str) -> pd.DataFrame:
         pass
 
+    @abstractmethod
+    def dataframes_from_table(self, dataset: str, table: str, chunk_size: int = 100000) -> Iterator[pd.DataFrame]:
+        pass
+
     @abstractmethod
     def dataframe_from_query(self, query: str) -> pd.DataFrame:
         pass
@@ -29,3 +33,19 @@ class DataWarehouseBase(ABC): # extends Abstract Base class
     @abstractmethod
     def table_schema(self, dataset: str, table: str) -> SqlTable:
         pass
+
+    def table_version(self, dataset: str, table: str) -> Optional[str]:
+        """
+        Describe the current version of a table (e.g. when it was last modified
+        and how many rows it holds), so that anything derived from the table can
+        tell when it has changed.
+
+        Args:
+            dataset (str): The dataset the table lives in
+            table (str): The name of the table
+
+        Returns:
+            A string that changes whenever the table's contents change, or None
+            if the warehouse is unable to tell
+        """
+        return None
@@ -8,6 +8,15 @@ class PlatformConfig:
     def __init__(self):
         self.data: Dict[str, str] = dict()
 
+        # Settings shared by every platform
+        self.temp_path = self.get_env("TEMP_PATH", "/tmp")
+
+        # Where we keep previously downloaded models, keyed by their md5
+        self.artifact_cache_path = self.get_env("ARTIFACT_CACHE_PATH", f"{self.temp_path}/hml-artifact-cache")
+        self.artifact_cache_max_bytes = int(self.get_env("ARTIFACT_CACHE_MAX_BYTES", str(5 * 1024 * 1024 * 1024)))
+        # How much space encoded training matrices may take up (see `MatrixCache`)
+        self.matrix_cache_max_bytes = int(self.get_env("MATRIX_CACHE_MAX_BYTES", str(10 * 1024 * 1024 * 1024)))
+
 
     def get_env(self, key: str, default=None) -> str:
         value = os.environ[key] if key in os.environ else default
@@ -19,6 +19,10 @@ class GooglePlatformConfig(PlatformConfig):
 
     GCS_CHUNK_SIZE: int
 
+    lake_max_connections: int
+    warehouse_max_connections: int
+    lake_verify_buckets: bool
+
     def __init__(self):
         PlatformConfig.__init__(self)
         self.gcp_project = self.get_env("GCP_PROJECT")
@@ -43,8 +47,15 @@ class GooglePlatformConfig(PlatformConfig):
         self.gitlab_project = self.get_env("GITLAB_PROJECT", "no-project")
         self.gitlab_url = self.get_env("GITLAB_URL", "https://gitlab.com")
 
-        self.temp_path = self.get_env("TEMP_PATH", "/tmp")
-
         self.CHUNK_SIZE = 10485760
 
+        # The connections kept open to Cloud Storage (the most transfers that run at once
+        # without waiting for a connection), and to BigQuery
+        self.lake_max_connections = int(self.get_env("LAKE_MAX_CONNECTIONS", "16"))
+        self.warehouse_max_connections = int(self.get_env("WAREHOUSE_MAX_CONNECTIONS", "10"))
+
+        # Whether to check that a bucket exists (once) before using it, rather than
+        # finding out when the first transfer fails
+        self.lake_verify_buckets = self.get_env("LAKE_VERIFY_BUCKETS", "true").lower() == "true"
+
 
@@ -0,0 +1,32 @@
+"""
+    Helpers for sharing Google Cloud clients (and their HTTP connections)
+    between calls and threads
+"""
+import google.auth
+
+from typing import Sequence, Tuple
+from google.auth.credentials import Credentials
+from google.auth.transport.requests import AuthorizedSession
+from requests.adapters import HTTPAdapter
+
+
+def pooled_session(scopes: Sequence[str], max_connections: int) -> Tuple[Credentials, AuthorizedSession]:
+    """
+    Create an authorized HTTP session for a Google Cloud client (passed to the client
+    as its `credentials` and `_http`), with a connection pool sized so that up to
+    `max_connections` threads can make requests through it at once, each reusing a
+    kept-alive connection rather than opening its own.
+
+    Args:
+        scopes (Sequence[str]): The OAuth scopes the client needs (e.g. `storage.Client.SCOPE`)
+        max_connections (int): The most connections to keep open per host
+
+    Returns:
+        A tuple of the default credentials (from the environment) and the session
+    """
+    credentials, _ = google.auth.default(scopes=scopes)
+
+    session = AuthorizedSession(credentials)
+    adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+    session.mount("https://", adapter)
+    return (credentials, session)
@@ -1,45 +1,90 @@
 import pandas as pd
 import logging
 import os
+import threading
+from typing import Dict
 from google.cloud import storage
 from hypermodel.platform.gcp.config import GooglePlatformConfig
+from hypermodel.platform.gcp.connections import pooled_session
 from hypermodel.platform.abstract.data_lake import DataLakeBase
 
 
 class DataLake(DataLakeBase):
+    """
+    The DataLake, implemented with Google Cloud Storage.  A single client (with
+    a pool of `config.lake_max_connections` connections) and a handle for each
+    bucket are kept for the life of the `DataLake`, and shared by every call
+    and thread.
+    """
+
     confg: GooglePlatformConfig
 
     def __init__(self, config: GooglePlatformConfig):
         self.config = config
 
-    def upload(self, bucket_path: str, local_path: str, bucket_name: str = None) -> bool:
-        storage_client = storage.Client()
+        self._lock = threading.Lock()
+        self._client: storage.Client = None
+        self._client_pid: int = None
+        self._buckets: Dict[str, storage.Bucket] = dict()
+
+        # Transfer as many files at once (with `upload_many` / `download_many`) as
+        # we keep connections open for
+        self.max_transfer_workers = self.config.lake_max_connections
 
+    def upload(self, bucket_path: str, local_path: str, bucket_name: str = None) -> bool:
         if bucket_name is None:
             bucket_name = self.config.lake_bucket
 
-        bucket = storage_client.get_bucket(bucket_name)
+        bucket = self._get_bucket(bucket_name)
 
         file_name = os.path.basename(local_path)
         full_path = f"{self.config.lake_path}/{bucket_path}"
 
         blob = bucket.blob(full_path, chunk_size=self.config.CHUNK_SIZE)
 
-        logging.info(f"Uploading {local_path} -> gs://{self.config.lake_bucket}/{full_path}/ ...")
+        logging.info(f"Uploading {local_path} -> gs://{bucket_name}/{full_path}/ ...")
         blob.upload_from_filename(local_path)
 
         return True
 
     def download(self, bucket_path: str, destination_local_path: str, bucket_name: str = None) -> bool:
-        storage_client = storage.Client()
-
         if bucket_name is None:
             bucket_name = self.config.lake_bucket
 
         logging.info(f"DataLake: downloading gs://{bucket_name}/{bucket_path} -> {destination_local_path}")
 
         full_path = f"{self.config.lake_path}/{bucket_path}"
-        bucket = storage_client.get_bucket(bucket_name)
+        bucket = self._get_bucket(bucket_name)
         blob = bucket.blob(full_path, chunk_size=self.config.CHUNK_SIZE)
         blob.download_to_filename(destination_local_path)
         return True
+
+    def _get_client(self) -> storage.Client:
+        # A client (and its connections) can't be shared with a forked process
+        if self._client is None or self._client_pid != os.getpid():
+            with self._lock:
+                if self._client is None or self._client_pid != os.getpid():
+                    credentials, session = pooled_session(storage.Client.SCOPE, self.config.lake_max_connections)
+                    self._client = storage.Client(credentials=credentials, _http=session)
+                    self._client_pid = os.getpid()
+                    self._buckets = dict()
+        return self._client
+
+    def _get_bucket(self, bucket_name: str) -> storage.Bucket:
+        """
+        Get a handle to the bucket `bucket_name`, checking that it exists (a metadata
+        request) only the first time it is used, or never if `config.lake_verify_buckets`
+        is False
+        """
+        client = self._get_client()
+        bucket = self._buckets.get(bucket_name)
+        if bucket is not None:
+            return bucket
+
+        if self.config.lake_verify_buckets:
+            bucket = client.get_bucket(bucket_name)
+        else:
+            bucket = client.bucket(bucket_name)
+
+        with self._lock:
+            return self._buckets.setdefault(bucket_name, bucket)
@@ -1,8 +1,10 @@
 import pandas as pd
 import logging
+import os
+import threading
 import tqdm
 
-from typing import List
+from typing import Iterator, List
 from google.cloud import storage
 from google.cloud import bigquery
 from google.cloud.bigquery.table import Table, TableReference
@@ -10,17 +12,28 @@ from google.cloud.bigquery.job import LoadJobConfig, QueryJobConfig, CreateDispo
 from google.cloud.bigquery.schema import SchemaField
 # from google.cloud import bigquery_storage_v1beta1
 from hypermodel.platform.gcp.config import GooglePlatformConfig
+from hypermodel.platform.gcp.connections import pooled_session
 from hypermodel.model.table_schema import SqlTable, SqlColumn
 
 from hypermodel.platform.abstract.data_warehouse import DataWarehouseBase
 
 
 class DataWarehouse(DataWarehouseBase):
+    """
+    The DataWarehouse, implemented with BigQuery.  A single client (with a pool
+    of `config.warehouse_max_connections` connections) is kept for the life of
+    the `DataWarehouse`, and shared by every call and thread.
+    """
+
     config: GooglePlatformConfig
 
     def __init__(self, config: GooglePlatformConfig):
         self.config = config
 
+        self._lock = threading.Lock()
+        self._client: bigquery.Client = None
+        self._client_pid: int = None
+
     def import_csv(self, bucket_path: str, dataset: str, table: str) -> bool:
         logging.info(f"DataWarehouse.import_csv {bucket_path} to {dataset}.{table} ...")
         client = self._get_client()
@@ -79,6 +92,54 @@ class DataWarehouse(DataWarehouseBase):
             logging.error(f"DataWarehouse.dataframe_from_query -> Exception: \n\t{message}")
             return None
 
+    def dataframes_from_table(self, dataset: str, table: str, chunk_size: int = 100000) -> Iterator[pd.DataFrame]:
+        """
+        Read the given table a chunk at a time, so that tables larger than
+        memory can be processed.  BigQuery may return smaller pages than
+        requested, so each chunk holds at most `chunk_size` rows.
+
+        Args:
+            dataset (str): The dataset the table lives in
+            table (str): The name of the table
+            chunk_size (int): The most rows to read into each DataFrame
+
+        Returns:
+            A generator of DataFrames, each containing the next chunk of rows
+        """
+        logging.info(f"DataWarehouse.dataframes_from_table -> {dataset}.{table} (chunks of {chunk_size})")
+        rows = self._list_rows(dataset, table, chunk_size)
+
+        for frame in rows.to_dataframe_iterable():
+            yield frame
+
+    def record_batches_from_table(self, dataset: str, table: str, chunk_size: int = 100000):
+        """
+        Read the given table a chunk at a time as Arrow `RecordBatch` objects,
+        which avoids the cost of building a DataFrame for each chunk.
+
+        Args:
+            dataset (str): The dataset the table lives in
+            table (str): The name of the table
+            chunk_size (int): The most rows to read into each RecordBatch
+
+        Returns:
+            A generator of `pyarrow.RecordBatch`, each containing the next chunk of rows
+        """
+        logging.info(f"DataWarehouse.record_batches_from_table -> {dataset}.{table} (chunks of {chunk_size})")
+        rows = self._list_rows(dataset, table, chunk_size)
+
+        for batch in rows.to_arrow_iterable():
+            yield batch
+
+    def _list_rows(self, dataset: str, table: str, chunk_size: int):
+        client = self._get_client()
+
+        bq_table: Table = client.get_table(f"{self.config.gcp_project}.{dataset}.{table}")
+        mb = int(bq_table.num_bytes / (1024*1024))
+        logging.info(f"DataWarehouse._list_rows -> Got table: {bq_table.full_table_id}: ({bq_table.num_rows} rows, {mb} mb)")
+
+        return client.list_rows(bq_table.reference, page_size=chunk_size)
+
     def dataframe_from_query(self, query: str) -> pd.DataFrame:
         logging.info(f"DataWarehouse.dataframe_from_query")
         client = self._get_client()
@@ -117,8 +178,20 @@ class DataWarehouse(DataWarehouseBase):
         print(tbl.to_sql())
         return tbl
 
+    def table_version(self, dataset: str, table: str) -> str:
+        client = self._get_client()
+        bq_table: Table = client.get_table(f"{self.config.gcp_project}.{dataset}.{table}")
+        return f"{bq_table.modified.isoformat()}/{bq_table.num_rows}/{bq_table.num_bytes}"
+
     def _get_client(self) -> bigquery.Client:
-        return bigquery.Client(project=self.config.gcp_project)
+        # A client (and its connections) can't be shared with a forked process
+        if self._client is None or self._client_pid != os.getpid():
+            with self._lock:
+                if self._client is None or self._client_pid != os.getpid():
+                    credentials, session = pooled_session(bigquery.Client.SCOPE, self.config.warehouse_max_connections)
+                    self._client = bigquery.Client(project=self.config.gcp_project, credentials=credentials, _http=session)
+                    self._client_pid = os.getpid()
+        return self._client
 
     @staticmethod
     def _translate_columns(bq_columns: List[SchemaField]) -> List[SqlColumn]:
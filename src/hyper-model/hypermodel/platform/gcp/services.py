@@ -1,4 +1,3 @@
-import gitlab
 from typing import Dict, List
 from hypermodel.platform.gcp.config import GooglePlatformConfig
 from hypermodel.platform.gcp.data_lake import DataLake
@@ -1,4 +1,3 @@
-import gitlab
 import logging
 import json
 import datetime
@@ -45,6 +44,9 @@ class GitLabHost(GitHostBase):
         nowstr = datetime.datetime.now().isoformat().replace(":", ".")
         new_branch = f"model/{nowstr}"
 
+        # Imported here, so that only creating a merge request needs python-gitlab
+        import gitlab
+
         gl = gitlab.Gitlab(self._config.gitlab_url, private_token=self._config.gitlab_token)
 
         project = gl.projects.get(self._config.gitlab_project)
@@ -10,7 +10,7 @@ class LocalConfig(PlatformConfig):
     def __init__(self):
         PlatformConfig.__init__(self)
 
-        self.data_lake_path = self.get_env("HM_LAKE_PATH")
+        self.data_lake_path = self.get_env("HM_LAKE_PATH", "./data/lake")
         self.sqlite_db_path = self.get_env("HM_SQLITE_WAREHOUSE_DBPATH")
 
 
@@ -30,6 +30,4 @@ class LocalConfig(PlatformConfig):
         self.is_local_dev = self.ci_commit == "no-commit"
 
 
-        self.temp_path = self.get_env("TEMP_PATH", "/tmp")
-
         self.default_sql_lite_db_file = f"{self.warehouse_location}/default.db"
@@ -1,9 +1,15 @@
-from abc import ABC, abstractmethod
+import logging
+import os
+import shutil
+import threading
 from hypermodel.platform.abstract.data_lake import DataLakeBase
 from hypermodel.platform.local.config import LocalConfig
 
 class LocalDataLake(DataLakeBase):
-
+    """
+    A DataLake kept in a local folder (`config.data_lake_path`), laid out like
+    the Google Cloud Storage lake: `<data_lake_path>/<bucket>/<lake_path>/<bucket_path>`
+    """
 
     confg: LocalConfig
 
@@ -11,33 +17,33 @@ class LocalDataLake(DataLakeBase):
         self.config = config
 
     def upload(self, bucket_path: str, local_path: str, bucket_name: str = None) -> bool:
-        # storage_client = storage.Client()
-
-        # if bucket_name is None:
-        #     bucket_name = self.config.lake_bucket
-
-        # bucket = storage_client.get_bucket(bucket_name)
-
-        # file_name = os.path.basename(local_path)
-        # full_path = f"{self.config.lake_path}/{bucket_path}"
+        full_path = self._get_full_path(bucket_path, bucket_name)
 
-        # blob = bucket.blob(full_path, chunk_size=self.config.CHUNK_SIZE)
+        logging.info(f"LocalDataLake: uploading {local_path} -> {full_path}")
+        self._copy(local_path, full_path)
+        return True
 
-        # logging.info(f"Uploading {local_path} -> gs://{self.config.lake_bucket}/{full_path}/ ...")
-        # blob.upload_from_filename(local_path)
+    def download(self, bucket_path: str, destination_local_path: str, bucket_name: str = None) -> bool:
+        full_path = self._get_full_path(bucket_path, bucket_name)
 
+        logging.info(f"LocalDataLake: downloading {full_path} -> {destination_local_path}")
+        self._copy(full_path, destination_local_path)
         return True
 
-    def download(self, bucket_path: str, destination_local_path: str, bucket_name: str = None) -> bool:
-        # storage_client = storage.Client()
+    def _get_full_path(self, bucket_path: str, bucket_name: str = None) -> str:
+        if bucket_name is None:
+            bucket_name = self.config.lake_bucket
 
-        # if bucket_name is None:
-        #     bucket_name = self.config.lake_bucket
+        parts = [self.config.data_lake_path, bucket_name, self.config.lake_path, bucket_path]
+        return os.path.join(*[p for p in parts if p])
 
-        # logging.info(f"DataLake: downloading gs://{bucket_name}/{bucket_path} -> {destination_local_path}")
+    @staticmethod
+    def _copy(source_path: str, destination_path: str):
+        directory = os.path.dirname(destination_path)
+        if directory != "" and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
 
-        # full_path = f"{self.config.lake_path}/{bucket_path}"
-        # bucket = storage_client.get_bucket(bucket_name)
-        # blob = bucket.blob(full_path, chunk_size=self.config.CHUNK_SIZE)
-        # blob.download_to_filename(destination_local_path)
-        return True
+        # Copy to a temporary file first, so a file is never seen half written
+        temp_path = f"{destination_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.copyfile(source_path, temp_path)
+        os.replace(temp_path, destination_path)
@@ -1,12 +1,13 @@
 import pandas as pd
 import numpy as np
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterator, List
 
 from hypermodel.model.table_schema import SqlTable, SqlColumn
 from hypermodel.platform.local.config import LocalConfig
 import sqlite3
 import logging
+import os
 
 class SqliteDataWarehouse(ABC):
 
@@ -69,6 +70,28 @@ class SqliteDataWarehouse(ABC):
 
         
 
+    def table_version(self, dbLocation: str, tableName: str) -> str:
+        # SQLite doesn't track when a table changed, so use the database file's
+        # modification time along with the table's row count
+        modified = os.path.getmtime(dbLocation)
+        connection =  sqlite3.connect(dbLocation)
+        try:
+            rows = connection.execute("SELECT COUNT(*) from "+tableName).fetchone()[0]
+        finally:
+            connection.close()
+        return f"{modified}/{rows}"
+
+    def dataframes_from_table(self, dbLocation: str, tableName: str, chunk_size: int = 100000) -> Iterator[pd.DataFrame]:
+        logging.info(f"SqliteDataWarehouse.dataframes_from_table (chunks of {chunk_size})")
+
+        #get reference to DB 
+        connection =  sqlite3.connect(dbLocation)
+        try:
+            for frame in pd.read_sql_query("SELECT * from "+tableName, connection, chunksize=chunk_size):
+                yield frame
+        finally:
+            connection.close()
+
     def dataframe_from_query(self, query: str) -> pd.DataFrame:
         logging.info(f"SqliteDataWarehouse.dataframe_from_query")
         dbLocation=config.default_sql_lite_db_file
@@ -214,5 +237,3 @@ def test_dry_run():
     for row in ret:
         print(row)  
 
-
-unit_test()
\ No newline at end of file
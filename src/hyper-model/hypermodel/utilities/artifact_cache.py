@@ -0,0 +1,105 @@
+"""
+    A local, content addressed store of artifacts (e.g. models and their distributions)
+    so that artifacts we have already downloaded don't need to be downloaded again
+"""
+import logging
+import os
+import shutil
+
+from hypermodel.utilities.file_hash import file_md5
+
+
+class ArtifactCache:
+    """
+    Stores files on the local disk keyed by the md5 of their content, evicting
+    the least recently used files once the cache grows beyond `max_bytes`.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        """
+        Create a new `ArtifactCache`
+
+        Args:
+            path (str): The directory to store cached artifacts in
+            max_bytes (int): The most bytes to keep in the cache before evicting artifacts
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+
+    def get(self, md5: str, destination_local_path: str) -> bool:
+        """
+        Copy the artifact with the given `md5` from the cache to `destination_local_path`
+
+        Args:
+            md5 (str): The md5 of the artifact's content
+            destination_local_path (str): Where to copy the artifact to
+
+        Returns:
+            True if the artifact was in the cache, False otherwise
+        """
+        cached_path = self._path(md5)
+        try:
+            shutil.copyfile(cached_path, destination_local_path)
+            # Mark the artifact as recently used
+            os.utime(cached_path)
+        except FileNotFoundError:
+            # Not cached, or evicted by another process while we were copying it
+            return False
+
+        logging.info(f"ArtifactCache: hit {md5} -> {destination_local_path}")
+        return True
+
+    def put(self, md5: str, local_path: str) -> bool:
+        """
+        Add the file at `local_path` to the cache, provided its content matches `md5`
+
+        Args:
+            md5 (str): The expected md5 of the file's content
+            local_path (str): The path of the file to cache
+
+        Returns:
+            True if the file was added to the cache
+        """
+        if file_md5(local_path) != md5:
+            logging.warning(f"ArtifactCache: {local_path} does not match md5 {md5}, not caching")
+            return False
+
+        if not os.path.exists(self.path):
+            os.makedirs(self.path, exist_ok=True)
+
+        # Copy to a temporary file and rename it, so other processes never see a partial artifact
+        temp_path = f"{self._path(md5)}.{os.getpid()}.tmp"
+        shutil.copyfile(local_path, temp_path)
+        os.replace(temp_path, self._path(md5))
+
+        self.evict()
+        return True
+
+    def evict(self):
+        """
+        Delete the least recently used artifacts until the cache holds no more than `max_bytes`
+        """
+        entries = []
+        for name in os.listdir(self.path):
+            if name.endswith(".tmp"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.path, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+
+            logging.info(f"ArtifactCache: evicting {name}")
+            try:
+                os.remove(os.path.join(self.path, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def _path(self, md5: str) -> str:
+        return os.path.join(self.path, md5)
@@ -0,0 +1,99 @@
+"""
+    A benchmark of how long it takes to import `hypermodel`, guarding against
+    regressions: heavy optional dependencies (Kubeflow, Google Cloud, GitLab and
+    the web servers) must only be imported when they are used.
+
+    Run with:  python -m hypermodel.utilities.import_time
+"""
+import json
+import subprocess
+import sys
+
+import click
+
+from typing import Any, Dict, List
+
+
+# Modules that importing `hypermodel.hml` must not import
+HEAVY_MODULES = [
+    "kfp",
+    "kubernetes",
+    "google.cloud.bigquery",
+    "google.cloud.storage",
+    "gitlab",
+    "flask",
+    "waitress",
+    "gunicorn",
+    "uvicorn",
+]
+
+_MEASURE_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import(module: str, repeats: int = 3) -> Dict[str, Any]:
+    """
+    Time importing `module` in a fresh interpreter (so nothing is already imported)
+
+    Args:
+        module (str): The module to import
+        repeats (int): How many times to measure, keeping the fastest
+
+    Returns:
+        A dict of the fastest import's `seconds`, and the `loaded` heavy modules
+        (see `HEAVY_MODULES`) that the import pulled in
+    """
+    script = _MEASURE_SCRIPT.format(module=module, heavy=HEAVY_MODULES)
+
+    best = None
+    for _ in range(max(1, repeats)):
+        output = subprocess.check_output([sys.executable, "-c", script])
+        result = json.loads(output.decode("utf-8").strip().splitlines()[-1])
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return best
+
+
+def import_problems(module: str, result: Dict[str, Any], budget_seconds: float) -> List[str]:
+    """
+    Check a measurement (from `measure_import`) of importing `module`: that it was
+    within `budget_seconds` and imported none of the `HEAVY_MODULES`
+
+    Returns:
+        A list of the problems found (empty if there are none)
+    """
+    problems = []
+    if len(result["loaded"]) > 0:
+        problems.append(f"import {module} loaded {result['loaded']}")
+    if result["seconds"] > budget_seconds:
+        problems.append(f"import {module} took {result['seconds']:.3f}s (budget: {budget_seconds:.3f}s)")
+    return problems
+
+
+@click.command()
+@click.option("-m", "--module", "modules", multiple=True, default=["hypermodel", "hypermodel.hml"], help="The module(s) to import.")
+@click.option("-b", "--budget-seconds", type=float, default=2.0, help="The longest an import may take.")
+@click.option("-r", "--repeats", type=int, default=3, help="How many times to measure each import (keeping the fastest).")
+def main(modules: List[str], budget_seconds: float, repeats: int):
+    """
+    Benchmark importing hypermodel, exiting with an error on a regression
+    """
+    problems = []
+    for module in modules:
+        result = measure_import(module, repeats)
+        print(f"import {module}: {result['seconds']:.3f}s")
+        problems.extend(import_problems(module, result, budget_seconds))
+
+    for problem in problems:
+        print(f"FAILED: {problem}")
+    if len(problems) > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+    Utility functions for spreading work across a pool of threads or processes
+"""
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List
+
+import pandas as pd
+
+
+def map_columns(
+    func: Callable[[pd.Series], Any],
+    dataframe: pd.DataFrame,
+    columns: List[str],
+    workers: int = 1,
+    use_processes: bool = False,
+    on_column: Callable[[str], None] = None,
+) -> Dict[str, Any]:
+    """
+    Apply `func` to each of the `columns` of `dataframe`, optionally
+    spreading the columns across a pool of `workers`.
+
+    Args:
+        func (Callable): The function to apply to each column (it must be a module
+            level function when `use_processes` is True, so it can be pickled)
+        dataframe (pd.DataFrame): The dataframe holding the columns
+        columns (List[str]): The names of the columns to apply `func` to
+        workers (int): The number of threads / processes to use (1 runs serially)
+        use_processes (bool): Use a process pool rather than a thread pool, for
+            functions which hold the GIL
+        on_column (Callable): Called (in this process) with each column's name as
+            its work is started
+
+    Returns:
+        A dictionary keyed by column name, in the same order as `columns`,
+        containing the result of `func` for that column
+    """
+    if workers <= 1 or len(columns) <= 1:
+        results = dict()
+        for c in columns:
+            if on_column is not None:
+                on_column(c)
+            results[c] = func(dataframe[c])
+        return results
+
+    pool_type = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with pool_type(max_workers=min(workers, len(columns))) as pool:
+        futures = dict()
+        for c in columns:
+            if on_column is not None:
+                on_column(c)
+            futures[c] = pool.submit(func, dataframe[c])
+
+        return {c: futures[c].result() for c in columns}
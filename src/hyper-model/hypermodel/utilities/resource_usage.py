@@ -0,0 +1,60 @@
+"""
+    Utility functions for running a command in a subprocess and measuring the
+    resources (time, CPU and memory) it used
+"""
+import os
+import subprocess
+import sys
+import time
+
+from typing import Dict, List, Tuple
+
+
+def run_with_usage(args: List[str], env: Dict[str, str] = None) -> Tuple[int, Dict[str, float]]:
+    """
+    Run `args` as a subprocess, waiting for it to exit.
+
+    Args:
+        args (List[str]): The command and its arguments
+        env (Dict[str, str]): The environment of the subprocess (default: ours)
+
+    Returns:
+        A tuple of the subprocess's return code and a dict of its `wall_seconds`,
+        `cpu_seconds` (user + system) and `max_rss_mb` (peak resident memory). CPU
+        and memory are None where the platform can't report them (e.g. Windows).
+        On Linux the peak memory is never less than our own memory when the
+        subprocess was started, as it is counted from the fork.
+    """
+    start = time.monotonic()
+    process = subprocess.Popen(args, env=env)
+
+    if not hasattr(os, "wait4"):
+        return_code = process.wait()
+        return (return_code, {"wall_seconds": time.monotonic() - start, "cpu_seconds": None, "max_rss_mb": None})
+
+    # Reap the process ourselves, to get the resources it (alone) used
+    while True:
+        try:
+            _, status, rusage = os.wait4(process.pid, 0)
+            break
+        except InterruptedError:
+            continue
+    wall_seconds = time.monotonic() - start
+
+    if os.WIFSIGNALED(status):
+        return_code = -os.WTERMSIG(status)
+    else:
+        return_code = os.WEXITSTATUS(status)
+    process.returncode = return_code
+
+    # ru_maxrss is in kilobytes on Linux, but bytes on macOS
+    max_rss_bytes = rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+
+    return (
+        return_code,
+        {
+            "wall_seconds": wall_seconds,
+            "cpu_seconds": rusage.ru_utime + rusage.ru_stime,
+            "max_rss_mb": max_rss_bytes / (1024 * 1024),
+        },
+    )
@@ -20,6 +20,7 @@ REQUIRES = [
     "click",
     "kfp",
     "pandas",
+    "scipy",
     "joblib",
     "google-cloud",
     "google-cloud-bigquery",
@@ -30,6 +31,8 @@ REQUIRES = [
     # API Serving
     "flask",
     "waitress",
+    # Serving from several processes (`"workers"` in config)
+    "gunicorn",
 ]
 
 setup(
@@ -38,6 +41,12 @@ setup(
     description="Hyper Model provides functionality to support MLOps",
     author="Growing Data",
     install_requires=REQUIRES,
+    extras_require={
+        # Serving predictions from an asyncio server (`"server": "asgi"` in config)
+        "asgi": ["uvicorn", "a2wsgi"],
+        # Running the unit tests (python -m pytest tests)
+        "test": ["pytest"],
+    },
     packages=find_packages(),
     classifiers=[
         "Intended Audience :: Developers",
@@ -0,0 +1,65 @@
+import os
+
+from hypermodel.utilities import artifact_cache
+from hypermodel.utilities.artifact_cache import ArtifactCache
+from hypermodel.utilities.file_hash import file_md5
+from hypermodel.platform.local.config import LocalConfig
+
+
+def _artifact(path, content: bytes):
+    path.write_bytes(content)
+    return str(path), file_md5(str(path))
+
+
+def test_put_then_get(tmp_path):
+    cache = ArtifactCache(str(tmp_path / "cache"), max_bytes=1024)
+    local_path, md5 = _artifact(tmp_path / "model.joblib", b"model")
+
+    assert cache.put(md5, local_path)
+    assert cache.get(md5, str(tmp_path / "copy"))
+    assert (tmp_path / "copy").read_bytes() == b"model"
+    assert not cache.get("unknown", str(tmp_path / "other"))
+
+
+def test_artifacts_evicted_during_a_get_are_a_miss(tmp_path, monkeypatch):
+    cache = ArtifactCache(str(tmp_path / "cache"), max_bytes=1024)
+    local_path, md5 = _artifact(tmp_path / "model.joblib", b"model")
+    cache.put(md5, local_path)
+
+    def evicted(path):
+        os.remove(path)
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(artifact_cache.os, "utime", evicted)
+
+    assert not cache.get(md5, str(tmp_path / "copy"))
+
+
+def test_put_rejects_mismatched_md5(tmp_path):
+    cache = ArtifactCache(str(tmp_path / "cache"), max_bytes=1024)
+    local_path, _ = _artifact(tmp_path / "model.joblib", b"model")
+
+    assert not cache.put("not-the-md5", local_path)
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ArtifactCache(str(tmp_path / "cache"), max_bytes=25)
+    paths = [_artifact(tmp_path / f"a{i}", bytes([i]) * 10) for i in range(3)]
+
+    cache.put(paths[0][1], paths[0][0])
+    cache.put(paths[1][1], paths[1][0])
+    os.utime(os.path.join(cache.path, paths[0][1]), (0, 0))
+    os.utime(os.path.join(cache.path, paths[1][1]), (1, 1))
+    cache.put(paths[2][1], paths[2][0])
+
+    assert sorted(os.listdir(cache.path)) == sorted([paths[1][1], paths[2][1]])
+
+
+def test_config_is_shared_by_platforms(monkeypatch):
+    monkeypatch.setenv("TEMP_PATH", "/scratch")
+    monkeypatch.setenv("ARTIFACT_CACHE_MAX_BYTES", "1000")
+
+    config = LocalConfig()
+
+    assert config.artifact_cache_path == "/scratch/hml-artifact-cache"
+    assert config.artifact_cache_max_bytes == 1000
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from hypermodel.features import CategoricalEncoder, get_unique_feature_values, one_hot_encode
+
+
+UNIQUES = {
+    "colour": ["red", "green", "blue"],
+    "size": ["s", None, "l"],
+}
+
+
+def _reference_encoding(dataframe: pd.DataFrame, uniques) -> np.ndarray:
+    # The one-hot encoding, one comparison at a time
+    columns = []
+    for feature, values in uniques.items():
+        for value in values:
+            columns.append([int(v == value) for v in dataframe[feature]])
+    return np.array(columns, dtype=np.int64).T
+
+
+def _data_frame() -> pd.DataFrame:
+    return pd.DataFrame({
+        "colour": ["blue", "red", "purple", "green"],
+        "size": ["l", None, "s", "xl"],
+    })
+
+
+def test_encode_matches_a_comparison_per_value():
+    encoder = CategoricalEncoder(UNIQUES)
+    dataframe = _data_frame()
+
+    np.testing.assert_array_equal(encoder.encode(dataframe), _reference_encoding(dataframe, UNIQUES))
+    assert encoder.width == 6
+    assert encoder.columns == ["colour:red", "colour:green", "colour:blue", "size:s", "size:None", "size:l"]
+
+
+def test_every_encoding_agrees():
+    encoder = CategoricalEncoder(UNIQUES)
+    dataframe = _data_frame()
+    dense = encoder.encode(dataframe)
+
+    np.testing.assert_array_equal(encoder.encode_sparse(dataframe).toarray(), dense)
+    rows = [encoder.encode_row(record) for record in dataframe.to_dict("records")]
+    np.testing.assert_array_equal(np.array(rows), dense)
+    np.testing.assert_array_equal(one_hot_encode(dataframe, UNIQUES).to_numpy(), dense)
+
+
+def test_encode_writes_into_out():
+    encoder = CategoricalEncoder(UNIQUES)
+    out = np.full((4, encoder.width), 7, dtype=np.float32)
+
+    result = encoder.encode(_data_frame(), out=out)
+
+    assert result is out
+    np.testing.assert_array_equal(out, encoder.encode(_data_frame()))
+
+
+def test_unseen_values_throw_when_asked():
+    encoder = CategoricalEncoder(UNIQUES)
+    seen = pd.DataFrame({"colour": ["red"], "size": [None]})
+    unseen = pd.DataFrame({"colour": ["purple"], "size": ["s"]})
+
+    encoder.encode(seen, throw_on_missing=True)
+    encoder.encode_row({"colour": "red", "size": None}, throw_on_missing=True)
+    with pytest.raises(Exception, match="'purple' has not been seen before in feature 'colour'"):
+        encoder.encode(unseen, throw_on_missing=True)
+    with pytest.raises(Exception, match="'purple' has not been seen before"):
+        encoder.encode_row({"colour": "purple", "size": "s"}, throw_on_missing=True)
+
+
+def test_nulls_only_match_when_seen():
+    encoder = CategoricalEncoder({"colour": ["red"]})
+
+    with pytest.raises(Exception):
+        encoder.encode(pd.DataFrame({"colour": [None]}), throw_on_missing=True)
+
+
+def test_unique_values_in_order_of_appearance():
+    dataframe = pd.DataFrame({"a": ["x", "y", "x", "z"], "b": [1, 1, 2, 1]})
+
+    assert get_unique_feature_values(dataframe, ["a", "b"], workers=2) == {"a": ["x", "y", "z"], "b": [1, 2]}
+
+
+def test_pandas_missing_values_are_null():
+    encoder = CategoricalEncoder(UNIQUES)
+
+    # Like `encode`, a null never sets a column, but isn't unseen when the feature had nulls
+    for missing in (None, np.nan, pd.NA, pd.NaT):
+        row = encoder.encode_row({"colour": "red", "size": missing}, throw_on_missing=True)
+        np.testing.assert_array_equal(row, [1, 0, 0, 0, 0, 0])
+
+
+def test_equal_values_are_looked_up_as_the_first():
+    encoder = CategoricalEncoder({"count": [1, 2, 1.0, 2]})
+    dataframe = pd.DataFrame({"count": [1.0, 2, 1]})
+    expected = [[1, 0, 0, 0], [0, 1, 0, 0], [1, 0, 0, 0]]
+
+    assert encoder.width == 4
+    np.testing.assert_array_equal(encoder.encode(dataframe), expected)
+    np.testing.assert_array_equal(encoder.encode_sparse(dataframe).toarray(), expected)
+    np.testing.assert_array_equal([encoder.encode_row({"count": v}) for v in (1.0, 2, 1)], expected)
@@ -0,0 +1,114 @@
+from types import SimpleNamespace
+
+import pytest
+
+from hypermodel.platform.abstract.data_lake import DataLakeBase, raise_for_failures
+from hypermodel.platform.local.data_lake import LocalDataLake
+
+
+class HttpError(Exception):
+    # Like google.api_core's exceptions, which carry the HTTP status as `code`
+    def __init__(self, code: int):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+class FlakyLake(DataLakeBase):
+    """
+    Fails each path with the errors given for it, in turn, before succeeding
+    """
+
+    def __init__(self, errors):
+        self.errors = {path: list(path_errors) for path, path_errors in errors.items()}
+        self.calls = []
+
+    def upload(self, bucket_path, local_path, bucket_name=None):
+        return self._transfer(bucket_path)
+
+    def download(self, bucket_path, destination_local_path, bucket_name=None):
+        return self._transfer(bucket_path)
+
+    def _transfer(self, bucket_path):
+        self.calls.append(bucket_path)
+        errors = self.errors.get(bucket_path, [])
+        if errors:
+            raise errors.pop(0)
+        return True
+
+
+@pytest.fixture
+def local_lake(tmp_path):
+    config = SimpleNamespace(data_lake_path=str(tmp_path / "lake"), lake_bucket="bucket", lake_path="project")
+    return LocalDataLake(config)
+
+
+def test_round_trip_through_the_local_lake(tmp_path, local_lake):
+    for i in range(5):
+        (tmp_path / f"up{i}").write_text(f"file {i}")
+
+    uploads = local_lake.upload_many([(f"files/{i}.txt", str(tmp_path / f"up{i}")) for i in range(5)])
+    downloads = local_lake.download_many([(f"files/{i}.txt", str(tmp_path / f"down{i}")) for i in range(5)])
+
+    assert all(r.succeeded and r.attempts == 1 for r in uploads + downloads)
+    assert [r.local_path for r in downloads] == [str(tmp_path / f"down{i}") for i in range(5)]
+    assert [(tmp_path / f"down{i}").read_text() for i in range(5)] == [f"file {i}" for i in range(5)]
+    assert (tmp_path / "lake" / "bucket" / "project" / "files" / "3.txt").exists()
+
+
+def test_missing_local_files_are_not_retried(tmp_path, local_lake):
+    results = local_lake.download_many([("missing.txt", str(tmp_path / "missing"))], backoff_seconds=0)
+
+    assert not results[0].succeeded
+    assert results[0].attempts == 1
+    assert isinstance(results[0].error, FileNotFoundError)
+
+
+def test_transient_errors_are_retried():
+    lake = FlakyLake({"a": [ConnectionError(), HttpError(503)]})
+
+    results = lake.upload_many([("a", "/a"), ("b", "/b")], retries=3, backoff_seconds=0)
+
+    assert [r.succeeded for r in results] == [True, True]
+    assert [r.attempts for r in results] == [3, 1]
+    assert results[0].error is None
+
+
+def test_gives_up_after_the_retries():
+    lake = FlakyLake({"a": [HttpError(500)] * 5})
+
+    results = lake.download_many([("a", "/a")], retries=2, backoff_seconds=0)
+
+    assert not results[0].succeeded
+    assert results[0].attempts == 3
+    assert results[0].error.code == 500
+
+
+@pytest.mark.parametrize("error", [HttpError(404), HttpError(403), PermissionError()])
+def test_permanent_errors_are_not_retried(error):
+    lake = FlakyLake({"a": [error]})
+
+    results = lake.download_many([("a", "/a")], retries=3, backoff_seconds=0)
+
+    assert not results[0].succeeded
+    assert results[0].attempts == 1
+    assert lake.calls == ["a"]
+
+
+def test_transfers_returning_false_fail():
+    class RefusingLake(FlakyLake):
+        def _transfer(self, bucket_path):
+            return False
+
+    results = RefusingLake({}).upload_many([("a", "/a")], retries=1, backoff_seconds=0)
+
+    assert not results[0].succeeded
+    assert results[0].attempts == 2
+
+
+def test_raise_for_failures_lists_each_failure():
+    lake = FlakyLake({"b": [HttpError(404)]})
+    results = lake.download_many([("a", "/a"), ("b", "/b")], backoff_seconds=0)
+
+    raise_for_failures(results[:1], "Fetching")
+    with pytest.raises(Exception, match=r"Fetching: 1 of 2 transfers failed: \[TransferResult\(b"):
+        raise_for_failures(results, "Fetching")
@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from hypermodel.hml.model_container import ModelContainer
+
+
+def _container(tmp_path, sizes) -> ModelContainer:
+    services = SimpleNamespace(config=SimpleNamespace(kfp_artifact_path=str(tmp_path)))
+    container = ModelContainer("model", "project", ["size"], ["colour"], "target", services)
+    data_frame = pd.DataFrame({"size": sizes, "colour": ["red", "blue", "red"], "target": [1, 0, 1]})
+    container.analyze_distributions(data_frame)
+    container.training_matrix = container.build_training_matrix(data_frame)
+    return container
+
+
+def test_vectors_match_the_training_matrix(tmp_path):
+    container = _container(tmp_path, [1.5, 2.0, 3.0])
+    records = [{"size": 1.5, "colour": "red"}, {"size": "2", "colour": "blue"}]
+
+    vectors = container.build_feature_vectors(records)
+
+    assert vectors.dtype == container.training_matrix.dtype
+    np.testing.assert_array_equal(vectors, container.training_matrix[:2])
+
+
+def test_unusable_numbers_are_missing(tmp_path):
+    container = _container(tmp_path, [1.5, 2.0, 3.0])
+    records = [{"colour": "red", "size": size} for size in (None, "", " ", "big", pd.NA, np.nan, [1])]
+
+    vectors = container.build_feature_vectors(records)
+
+    assert np.isnan(vectors[:, -1]).all()
+
+
+def test_integer_matrices_keep_their_dtype(tmp_path):
+    container = _container(tmp_path, [1, 2, 3])
+    assert container.training_matrix.dtype == np.int64
+
+    assert container.build_feature_vector({"size": 2, "colour": "blue"}).dtype == np.int64
+    # Unless a value is missing, which an integer can't hold
+    assert np.isnan(container.build_feature_vector({"size": "", "colour": "blue"})[0, -1])
+
+
+def test_matrix_dtype_is_published_with_the_distributions(tmp_path):
+    container = _container(tmp_path, [1, 2, 3])
+
+    loaded = ModelContainer("model", "project", ["size"], ["colour"], "target", container.services)
+    loaded.load_distributions(container.dump_distributions())
+
+    assert loaded.matrix_dtype == np.int64
@@ -0,0 +1,92 @@
+import json
+import sys
+from types import SimpleNamespace
+
+import click
+import pytest
+from click.testing import CliRunner
+
+from hypermodel.hml import hml_pipeline
+from hypermodel.hml.hml_container_op import HmlContainerOp, OUTPUTS_PATH_ENV
+from hypermodel.hml.hml_pipeline import HmlPipeline
+
+
+def _workflow(*task_names):
+    tasks = [{"name": name} for name in task_names]
+    return {"spec": {"templates": [{"name": "container"}, {"name": "pipeline", "dag": {"tasks": tasks}}]}}
+
+
+def test_tasks_are_looked_up_once_per_compile(monkeypatch):
+    def my_pipeline():
+        pass
+
+    pipeline = HmlPipeline({}, click.Group("pipelines"), my_pipeline, [])
+    compiles = []
+    monkeypatch.setattr(pipeline, "_get_workflow", lambda: compiles.append(1) or _workflow("a", "b"))
+
+    assert [t["name"] for t in pipeline.tasks] == ["a", "b"]
+    assert pipeline.task_map["b"] is pipeline.tasks[1]
+    assert pipeline.task_map is pipeline.task_map
+    assert len(compiles) == 1
+
+
+def test_bind_ops_passes_a_param_for_each_argument():
+    dsl = pytest.importorskip("kfp.dsl")
+    calls = []
+
+    def my_pipeline(table, sample_rate=0.5):
+        calls.append((table, sample_rate))
+
+    pipeline = HmlPipeline({}, click.Group("pipelines"), my_pipeline, [])
+    pipeline.bind_ops()
+
+    table, sample_rate = calls[0]
+    assert isinstance(table, dsl.PipelineParam) and table.name == "table" and table.value is None
+    assert isinstance(sample_rate, dsl.PipelineParam) and sample_rate.value == 0.5
+
+
+def test_isolated_ops_are_run_with_the_root_options(monkeypatch):
+    def my_pipeline():
+        pass
+
+    pipeline = HmlPipeline({}, click.Group("pipelines"), my_pipeline, [])
+    pipeline.ops_dict = {"load": SimpleNamespace(name="load")}
+    root = click.Context(click.Group("app", params=[click.Option(["--verbose"], is_flag=True)]))
+    root.invoked_subcommand = "pipelines"
+    monkeypatch.setattr(sys, "argv", ["app.py", "--verbose", "pipelines", "my_pipeline", "run-all", "--isolate"])
+
+    assert pipeline.local_command("load", root) == [sys.executable, "app.py", "--verbose", "pipelines", "my_pipeline", "load"]
+    assert pipeline.local_command("load") == [sys.executable, "app.py", "pipelines", "my_pipeline", "load"]
+
+
+def test_isolated_ops_return_their_outputs(monkeypatch):
+    script = f"import json, os; json.dump({{'ref': 'v1'}}, open(os.environ['{OUTPUTS_PATH_ENV}'], 'w'))"
+    pipeline = SimpleNamespace(local_command=lambda task_name, context: [sys.executable, "-c", script])
+    monkeypatch.setattr(hml_pipeline, "_scheduled_pipeline", pipeline)
+
+    outputs, usage = hml_pipeline._run_isolated_task("load")
+
+    assert outputs == {"ref": "v1"}
+    assert usage["wall_seconds"] > 0
+
+
+def test_op_commands_write_their_outputs(tmp_path):
+    pytest.importorskip("kfp.dsl")
+
+    @click.option("--sample-rate", default=0.5, type=float)
+    def load(sample_rate):
+        return {"sample_rate": sample_rate}
+
+    def my_pipeline():
+        HmlContainerOp(load, {})
+
+    pipeline = HmlPipeline({"container_url": "image", "script_name": "app"}, click.Group("pipelines"), my_pipeline, [])
+    outputs_path = str(tmp_path / "outputs.json")
+    for _ in range(2):
+        pipeline.ops_bound = False
+        pipeline.bind_ops()
+        result = CliRunner().invoke(pipeline.cli_pipeline, ["load", "--sample-rate", "0.1"], env={OUTPUTS_PATH_ENV: outputs_path})
+
+        assert result.exit_code == 0, result.output
+        with open(outputs_path) as f:
+            assert json.load(f) == {"sample_rate": 0.1}
@@ -0,0 +1,59 @@
+import asyncio
+
+import click
+import pytest
+
+from hypermodel.hml.hml_inference_app import HmlInferenceApp
+
+
+def _call(asgi_app, path: str):
+    """
+    Make a GET request to an ASGI app, returning its status and body
+    """
+    messages = []
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("utf-8"),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"testserver")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(asgi_app(scope, receive, send))
+
+    status = [m["status"] for m in messages if m["type"] == "http.response.start"][0]
+    body = b"".join(m.get("body", b"") for m in messages if m["type"] == "http.response.body")
+    return status, body.decode("utf-8")
+
+
+def test_asgi_serves_routes_registered_on_flask():
+    pytest.importorskip("a2wsgi")
+    inference_app = HmlInferenceApp("test", None, click.Group("root"), {"server": "asgi"})
+
+    @inference_app.flask.route("/predict")
+    def predict():
+        return "predicted"
+
+    assert _call(inference_app.asgi, "/predict") == (200, "predicted")
+    assert _call(inference_app.asgi, "/livez") == (200, "ok")
+    status, body = _call(inference_app.asgi, "/metrics")
+    assert status == 200
+    assert 'hml_requests_total{route="/predict",method="GET",status="200"} 1' in body
+
+
+def test_unknown_server_is_rejected():
+    with pytest.raises(Exception, match="Unknown server"):
+        HmlInferenceApp("test", None, click.Group("root"), {"server": "tornado"})
@@ -0,0 +1,61 @@
+import threading
+
+import click
+
+from hypermodel.hml.hml_inference_app import HmlInferenceApp
+
+
+class FakeContainer:
+    def __init__(self, name="model"):
+        self.name = name
+        self.is_loaded = True
+        self.is_warm = False
+        self.model_md5 = None
+        self.may_finish_warm_up = threading.Event()
+        self.warm_up_started = threading.Event()
+
+    def get_encoder(self):
+        pass
+
+    def warm_up(self, count):
+        self.warm_up_started.set()
+        self.may_finish_warm_up.wait(10)
+        self.is_warm = True
+
+
+def _app(container) -> HmlInferenceApp:
+    app = HmlInferenceApp("test", None, click.Group("root"), {})
+    app.on_init(lambda inference_app: inference_app.register_model(container))
+    app._initialise()
+    return app
+
+
+def test_readyz_is_unavailable_until_models_are_warm():
+    container = FakeContainer()
+    app = _app(container)
+    client = app.flask.test_client()
+
+    app._start_serving()
+    assert container.warm_up_started.wait(10)
+    assert client.get("/readyz").status_code == 503
+    assert client.get("/livez").status_code == 200
+
+    container.may_finish_warm_up.set()
+    for thread in threading.enumerate():
+        if thread.name == "WarmUp":
+            thread.join(10)
+    assert client.get("/readyz").status_code == 200
+
+
+def test_swapped_models_are_warmed_first():
+    container = FakeContainer()
+    app = _app(container)
+    container.is_warm = True
+
+    new_container = FakeContainer()
+    new_container.may_finish_warm_up.set()
+    app.swap_model(new_container)
+
+    assert new_container.is_warm
+    assert app.get_model("model") is new_container
+    assert app.is_ready()
@@ -0,0 +1,50 @@
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from hypermodel.platform.local.data_warehouse import SqliteDataWarehouse
+
+
+@pytest.fixture
+def database(tmp_path):
+    db_path = str(tmp_path / "warehouse.db")
+    connection = sqlite3.connect(db_path)
+    pd.DataFrame({"size": range(10), "colour": ["red", "blue"] * 5}).to_sql("cars", connection, index=False)
+    connection.close()
+    return db_path
+
+
+def _execute(db_path: str, statement: str):
+    connection = sqlite3.connect(db_path)
+    connection.execute(statement)
+    connection.commit()
+    connection.close()
+
+
+def test_tables_are_read_in_chunks(database):
+    warehouse = SqliteDataWarehouse(None)
+
+    chunks = list(warehouse.dataframes_from_table(database, "cars", chunk_size=4))
+
+    assert [len(c) for c in chunks] == [4, 4, 2]
+    pd.testing.assert_frame_equal(
+        pd.concat(chunks, ignore_index=True), warehouse.dataframe_from_table(database, "cars")
+    )
+
+
+def test_version_is_stable_until_the_table_is_written(database):
+    warehouse = SqliteDataWarehouse(None)
+    version = warehouse.table_version(database, "cars")
+    assert warehouse.table_version(database, "cars") == version
+
+    _execute(database, "INSERT INTO cars VALUES (10, 'red')")
+    appended = warehouse.table_version(database, "cars")
+    assert appended != version
+
+    # An update leaves the row count alone, but still modifies the file
+    os.utime(database, (0, 0))
+    stale = warehouse.table_version(database, "cars")
+    _execute(database, "UPDATE cars SET colour = 'green' WHERE size = 1")
+    assert warehouse.table_version(database, "cars") not in (appended, stale)
@@ -0,0 +1,158 @@
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from hypermodel.hml.matrix_cache import MatrixCache
+from hypermodel.hml.model_container import ModelContainer
+
+
+def test_put_then_get(tmp_path):
+    cache = MatrixCache(str(tmp_path))
+    matrix = np.arange(6, dtype=np.float64).reshape(3, 2)
+
+    assert cache.put("k", matrix, np.array([0, 1, 0]))
+    cached, targets = cache.get("k")
+
+    np.testing.assert_array_equal(cached, matrix)
+    np.testing.assert_array_equal(targets, [0, 1, 0])
+    assert cache.get("missing") == (None, None)
+
+
+def test_sparse_matrices_are_cached(tmp_path):
+    cache = MatrixCache(str(tmp_path))
+    matrix = sparse.csr_matrix(np.eye(3))
+
+    cache.put("k", matrix, np.zeros(3))
+    cached, _ = cache.get("k")
+
+    assert sparse.issparse(cached)
+    np.testing.assert_array_equal(cached.toarray(), np.eye(3))
+
+
+def test_evicts_least_recently_used_matrices(tmp_path):
+    matrix = np.zeros((16, 16))
+    cache = MatrixCache(str(tmp_path), max_bytes=2 * matrix.nbytes + 1024)
+
+    cache.put("first", matrix, np.zeros(16))
+    cache.put("second", matrix, np.zeros(16))
+    os.utime(tmp_path / "second-targets.npy", (0, 0))
+    cache.put("third", matrix, np.zeros(16))
+
+    assert cache.get("second") == (None, None)
+    assert cache.get("first")[0] is not None
+    assert cache.get("third")[0] is not None
+    assert not [name for name in os.listdir(tmp_path) if name.startswith("second")]
+
+
+class FakeWarehouse:
+    def __init__(self, data_frame: pd.DataFrame, version):
+        self.data_frame = data_frame
+        self.version = version
+        self.reads = 0
+
+    def table_version(self, dataset: str, table: str):
+        return self.version
+
+    def dataframe_from_table(self, dataset: str, table: str) -> pd.DataFrame:
+        self.reads += 1
+        return self.data_frame
+
+    def dataframes_from_table(self, dataset: str, table: str, chunk_size: int = 100000):
+        self.reads += 1
+        return [self.data_frame.iloc[i : i + chunk_size] for i in range(0, len(self.data_frame), chunk_size)]
+
+
+def _container(tmp_path, warehouse: FakeWarehouse) -> ModelContainer:
+    config = SimpleNamespace(kfp_artifact_path=str(tmp_path), matrix_cache_max_bytes=1024 * 1024)
+    services = SimpleNamespace(config=config, warehouse=warehouse)
+    container = ModelContainer("model", "project", ["size"], ["colour"], "target", services)
+    container.analyze_distributions(warehouse.data_frame)
+    return container
+
+
+def _data_frame(sizes) -> pd.DataFrame:
+    return pd.DataFrame({
+        "size": sizes,
+        "colour": ["red", "blue", "red"],
+        "target": [1, 0, 1],
+    })
+
+
+def test_matrix_is_reused_until_the_table_changes(tmp_path):
+    warehouse = FakeWarehouse(_data_frame([1.0, 2.0, 3.0]), version="v1")
+    container = _container(tmp_path, warehouse)
+
+    first, _ = container.build_training_matrix_for_table("dataset", "table")
+    container.build_training_matrix_for_table("dataset", "table")
+    assert warehouse.reads == 1
+
+    warehouse.data_frame = _data_frame([4.0, 5.0, 6.0])
+    warehouse.version = "v2"
+    second, _ = container.build_training_matrix_for_table("dataset", "table")
+
+    assert warehouse.reads == 2
+    assert not np.array_equal(first, second)
+
+
+def test_cache_hits_read_nothing(tmp_path):
+    warehouse = FakeWarehouse(_data_frame([1.0, 2.0, 3.0]), version="v1")
+    container = _container(tmp_path, warehouse)
+
+    first, _ = container.build_training_matrix_for_table("dataset", "table", data_frame=warehouse.data_frame)
+    assert warehouse.reads == 0
+
+    # The passed data frame is only used on a cache miss
+    second, _ = container.build_training_matrix_for_table("dataset", "table", data_frame=_data_frame([7.0, 8.0, 9.0]))
+
+    assert warehouse.reads == 0
+    np.testing.assert_array_equal(first, second)
+
+
+def test_unversioned_tables_are_not_cached(tmp_path):
+    warehouse = FakeWarehouse(_data_frame([1.0, 2.0, 3.0]), version=None)
+    container = _container(tmp_path, warehouse)
+
+    container.build_training_matrix_for_table("dataset", "table")
+    container.build_training_matrix_for_table("dataset", "table")
+
+    assert warehouse.reads == 2
+    assert not os.path.exists(tmp_path / "model-matrices")
+
+
+def test_distributions_are_reused_until_the_table_changes(tmp_path):
+    warehouse = FakeWarehouse(_data_frame([1.0, 2.0, 3.0]), version="v1")
+    container = _container(tmp_path, warehouse)
+
+    container.analyze_table_distributions("dataset", "table", chunk_size=2)
+    first = container.feature_summaries
+    container.analyze_table_distributions("dataset", "table", chunk_size=2)
+    assert warehouse.reads == 1
+    assert container.feature_summaries == first
+
+    warehouse.data_frame = _data_frame([4.0, 5.0, 6.0])
+    warehouse.version = "v2"
+    container.analyze_table_distributions("dataset", "table", chunk_size=2)
+
+    assert warehouse.reads == 2
+    assert container.feature_summaries["size"]["mean"] == 5.0
+
+
+def test_chunked_matrix_matches_the_whole_table(tmp_path):
+    data_frame = pd.concat([_data_frame([1.0, 0.0, 3.0]), _data_frame([4.0, 5.0, 0.0])], ignore_index=True)
+    container = _container(tmp_path, FakeWarehouse(data_frame, version=None))
+    chunks = [data_frame.iloc[i : i + 4] for i in range(0, len(data_frame), 4)]
+
+    for sparse_output in (False, True):
+        matrix, targets = container.build_training_matrix_from_chunks(chunks, sparse_output=sparse_output)
+        expected = container.build_training_matrix(data_frame, sparse_output=sparse_output)
+
+        assert sparse.issparse(matrix) == sparse_output
+        np.testing.assert_array_equal(sparse.csr_matrix(matrix).toarray(), sparse.csr_matrix(expected).toarray())
+        np.testing.assert_array_equal(targets, data_frame["target"])
+
+    matrix, targets = container.build_training_matrix_from_chunks([])
+    assert matrix.shape == (0, expected.shape[1])
+    assert len(targets) == 0
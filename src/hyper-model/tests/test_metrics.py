@@ -0,0 +1,75 @@
+import threading
+
+from hypermodel.hml.prediction.metrics import Metrics
+
+
+def _metrics() -> Metrics:
+    metrics = Metrics()
+    metrics.counter("requests_total", "Requests", ["route"])
+    metrics.histogram("request_seconds", "Latency", ["route"], buckets=(0.1, 1.0))
+    return metrics
+
+
+def test_render_sums_every_thread():
+    metrics = _metrics()
+
+    def record():
+        for _ in range(10):
+            metrics.inc("requests_total", ("/a",))
+            metrics.observe("request_seconds", ("/a",), 0.5)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    record()
+
+    text = metrics.render()
+    assert 'requests_total{route="/a"} 50' in text
+    assert 'request_seconds_bucket{route="/a",le="0.1"} 0' in text
+    assert 'request_seconds_bucket{route="/a",le="1"} 50' in text
+    assert 'request_seconds_bucket{route="/a",le="+Inf"} 50' in text
+    assert 'request_seconds_sum{route="/a"} 25' in text
+    assert 'request_seconds_count{route="/a"} 50' in text
+
+
+def test_finished_threads_are_folded_into_one_total():
+    metrics = _metrics()
+
+    for _ in range(100):
+        t = threading.Thread(target=lambda: metrics.inc("requests_total", ("/a",)))
+        t.start()
+        t.join()
+
+    assert len(metrics._threads) <= 1
+    assert 'requests_total{route="/a"} 100' in metrics.render()
+    assert len(metrics._threads) == 0
+
+
+def test_span_records_duration():
+    metrics = _metrics()
+
+    with metrics.span("request_seconds", ("/b",)):
+        pass
+
+    assert 'request_seconds_count{route="/b"} 1' in metrics.render()
+
+
+def test_collectors_are_rendered():
+    metrics = _metrics()
+    metrics.add_collector(lambda: [("cache_size", "gauge", "Cached", {("m",): 3}, ["model"])])
+
+    assert 'cache_size{model="m"} 3' in metrics.render()
+
+
+def test_non_finite_values_are_rendered():
+    metrics = _metrics()
+    values = {("nan",): float("nan"), ("pos",): float("inf"), ("neg",): float("-inf")}
+    metrics.add_collector(lambda: [("drift", "gauge", "Drift", values, ["feature"])])
+
+    rendered = metrics.render()
+
+    assert 'drift{feature="nan"} NaN' in rendered
+    assert 'drift{feature="pos"} +Inf' in rendered
+    assert 'drift{feature="neg"} -Inf' in rendered
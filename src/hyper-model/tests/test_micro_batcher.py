@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+
+from hypermodel.hml.prediction.micro_batcher import MicroBatcher
+
+
+def _submit_concurrently(batcher: MicroBatcher, records, models=None):
+    results = [None] * len(records)
+    models = models or ["model"] * len(records)
+
+    def submit(i):
+        try:
+            results[i] = batcher.submit(models[i], records[i])
+        except Exception as ex:
+            results[i] = ex
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(len(records))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+    return results
+
+
+def test_concurrent_records_are_batched():
+    batches = []
+
+    def predict_batch(model, records):
+        batches.append(len(records))
+        return [r["x"] * 2 for r in records]
+
+    batcher = MicroBatcher("test", predict_batch, max_batch_size=8, max_wait_ms=200)
+    results = _submit_concurrently(batcher, [{"x": i} for i in range(8)])
+
+    assert results == [i * 2 for i in range(8)]
+    assert sum(batches) == 8
+    assert len(batches) < 8
+
+
+def test_failed_batches_are_retried_per_record():
+    def predict_batch(model, records):
+        if any(r["x"] == 3 for r in records):
+            if len(records) == 1:
+                raise ValueError("bad record")
+            raise ValueError("bad batch")
+        return [r["x"] for r in records]
+
+    batcher = MicroBatcher("test", predict_batch, max_batch_size=8, max_wait_ms=200)
+    results = _submit_concurrently(batcher, [{"x": i} for i in range(6)])
+
+    assert [r for i, r in enumerate(results) if i != 3] == [0, 1, 2, 4, 5]
+    assert isinstance(results[3], ValueError)
+
+
+def test_every_record_fails_when_predictions_are_missing():
+    batcher = MicroBatcher("test", lambda model, records: [0] * (len(records) - 1), max_batch_size=4, max_wait_ms=200)
+
+    results = _submit_concurrently(batcher, [{"x": i} for i in range(4)])
+
+    assert all(isinstance(r, Exception) for r in results)
+    with pytest.raises(Exception, match="predicted 0 results for a batch of 1"):
+        batcher.submit("model", {"x": 0})
+
+
+def test_records_are_predicted_by_the_model_they_were_submitted_with():
+    batches = []
+
+    def predict_batch(model, records):
+        batches.append((model, len(records)))
+        return [f"{model}:{r['x']}" for r in records]
+
+    batcher = MicroBatcher("test", predict_batch, max_batch_size=8, max_wait_ms=200)
+    models = ["old", "new", "old", "new", "new"]
+    results = _submit_concurrently(batcher, [{"x": i} for i in range(5)], models=models)
+
+    assert results == [f"{model}:{i}" for i, model in enumerate(models)]
+    assert sum(size for _, size in batches) == 5
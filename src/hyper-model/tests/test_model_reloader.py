@@ -0,0 +1,112 @@
+import json
+import threading
+import time
+
+import click
+
+from hypermodel.hml.hml_inference_app import HmlInferenceApp
+from hypermodel.hml.prediction.model_reloader import ModelReloader
+
+
+class FakeContainer:
+    def __init__(self, directory, reference):
+        self.name = "model"
+        self.directory = directory
+        self.filename_reference = "model-reference.json"
+        self.reference = reference
+        self.model_md5 = reference["model"]["md5"]
+        self.warmed_up = False
+        self.is_loaded = True
+        self.may_load = threading.Event()
+        self.may_load.set()
+
+    def get_local_path(self, filename):
+        return str(self.directory / filename)
+
+    def load(self, reference_file):
+        self.may_load.wait(10)
+        with open(reference_file) as f:
+            self.reference = json.load(f)
+        self.model_md5 = self.reference["model"]["md5"]
+
+    def warm_up(self, count):
+        self.warmed_up = True
+
+    @property
+    def is_warm(self):
+        return self.warmed_up
+
+    def get_encoder(self):
+        pass
+
+
+class FakeApp:
+    warm_up_records = 4
+
+    def __init__(self, container):
+        self.models = {container.name: container}
+
+    def swap_model(self, container, warm_up=True):
+        self.models[container.name] = container
+
+
+def _write_reference(directory, md5):
+    reference = {"model": {"md5": md5}, "distributions": {"md5": "d"}}
+    with open(directory / "model-reference.json", "w") as f:
+        json.dump(reference, f)
+    return reference
+
+
+def test_start_checks_on_the_background_thread(tmp_path):
+    # The process was forked with an old version, and a newer one has been published since
+    container = FakeContainer(tmp_path, _write_reference(tmp_path, "v1"))
+    container.may_load.clear()
+    _write_reference(tmp_path, "v2")
+    app = FakeApp(container)
+
+    reloader = ModelReloader(app, interval_seconds=3600)
+    reloader.start()
+    # Starting never waits for a model to load
+    assert app.models["model"] is container
+
+    container.may_load.set()
+    deadline = time.monotonic() + 10
+    while app.models["model"] is container and time.monotonic() < deadline:
+        time.sleep(0.01)
+    reloader.stop()
+
+    assert app.models["model"].model_md5 == "v2"
+    assert app.models["model"].warmed_up
+    # The old container is left untouched for requests still using it
+    assert container.model_md5 == "v1"
+
+
+def test_parent_process_loads_the_latest_version_before_forking(tmp_path):
+    container = FakeContainer(tmp_path, _write_reference(tmp_path, "v1"))
+    _write_reference(tmp_path, "v2")
+    app = HmlInferenceApp("test", None, click.Group("root"), {"model_reload_interval_seconds": 3600})
+    app.on_init(lambda inference_app: inference_app.register_model(container))
+
+    app._initialise()
+
+    # Swapped in cold: each worker warms its models up once it is serving
+    assert app.models["model"].model_md5 == "v2"
+    assert not app.models["model"].warmed_up
+    assert not app.is_ready()
+
+
+def test_check_ignores_unchanged_reference(tmp_path):
+    container = FakeContainer(tmp_path, _write_reference(tmp_path, "v1"))
+    app = FakeApp(container)
+
+    assert ModelReloader(app).check() == []
+    assert app.models["model"] is container
+
+
+def test_check_keeps_current_version_when_reload_fails(tmp_path):
+    container = FakeContainer(tmp_path, _write_reference(tmp_path, "v1"))
+    (tmp_path / "model-reference.json").write_text("not json")
+    app = FakeApp(container)
+
+    assert ModelReloader(app).check() == []
+    assert app.models["model"] is container
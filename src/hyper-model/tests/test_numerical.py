@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from hypermodel.features import scale_by_mean_stdev, scale_features, unscale_features, describe_features
+
+
+SUMMARIES = {
+    "a": {"mean": 2.0, "std": 1.0},
+    "b": {"mean": 5.0, "std": 2.0},
+}
+
+
+def _frame(dtype) -> pd.DataFrame:
+    return pd.DataFrame({
+        "a": np.array([1, 2, 3], dtype=dtype),
+        "b": np.array([4, 5, 6], dtype=dtype),
+    })
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_scale_features_when_dtype_already_matches(dtype):
+    dataframe = _frame(dtype)
+
+    matrix = scale_features(dataframe, ["a", "b"], SUMMARIES, dtype=dtype)
+
+    assert matrix.dtype == dtype
+    np.testing.assert_allclose(matrix, [[-1.0, -0.5], [0.0, 0.0], [1.0, 0.5]])
+    # The dataframe itself is left alone
+    assert dataframe["a"].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_scale_features_from_ints_into_out():
+    dataframe = _frame(np.int64)
+    out = np.empty((3, 2), dtype=np.float64)
+
+    matrix = scale_features(dataframe, ["a", "b"], SUMMARIES, out=out)
+
+    assert matrix is out
+    np.testing.assert_allclose(out, [[-1.0, -0.5], [0.0, 0.0], [1.0, 0.5]])
+
+
+def test_unscale_features_reverses_scale_features():
+    dataframe = _frame(np.float64)
+
+    matrix = scale_features(dataframe, ["a", "b"], SUMMARIES, dtype=np.float64)
+    unscale_features(matrix, ["a", "b"], SUMMARIES, out=matrix)
+
+    np.testing.assert_allclose(matrix, dataframe.to_numpy())
+
+
+def test_scale_features_matches_scale_by_mean_stdev():
+    dataframe = _frame(np.float64)
+
+    matrix = scale_features(dataframe, ["a", "b"], SUMMARIES, dtype=np.float64)
+    for f in ["a", "b"]:
+        scale_by_mean_stdev(dataframe, f, SUMMARIES[f]["mean"], SUMMARIES[f]["std"])
+
+    np.testing.assert_allclose(matrix, dataframe.to_numpy())
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_describe_features(workers):
+    dataframe = _frame(np.float64)
+
+    summaries = describe_features(dataframe, ["a", "b"], workers=workers)
+
+    assert list(summaries.keys()) == ["a", "b"]
+    assert summaries["a"]["mean"] == 2.0
+    assert summaries["b"]["max"] == 6.0
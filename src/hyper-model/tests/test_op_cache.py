@@ -0,0 +1,86 @@
+import click
+
+from hypermodel.hml.hml_pipeline import HmlPipeline
+from hypermodel.hml.op_cache import OpCache, op_fingerprint
+
+
+def test_fingerprints_are_remembered_between_runs(tmp_path):
+    file_path = str(tmp_path / "cache" / "ops.json")
+    cache = OpCache(file_path)
+    cache.record("load", "f1")
+
+    reloaded = OpCache(file_path)
+    assert reloaded.matches("load", "f1")
+    assert not reloaded.matches("load", "f2")
+    assert not reloaded.matches("train", "f1")
+    assert not reloaded.matches("load", None)
+
+
+def test_forgotten_ops_no_longer_match(tmp_path):
+    file_path = str(tmp_path / "ops.json")
+    cache = OpCache(file_path)
+    cache.record("load", "f1")
+    cache.record("train", "f2")
+
+    cache.forget("load")
+    cache.record("train", None)
+
+    assert OpCache(file_path).fingerprints == {}
+
+
+def test_unreadable_caches_are_ignored(tmp_path):
+    (tmp_path / "ops.json").write_text("{not json")
+
+    assert OpCache(str(tmp_path / "ops.json")).fingerprints == {}
+
+
+def test_fingerprint_changes_with_any_input():
+    base = op_fingerprint("op", {"a": 1}, {"query": "select 1"}, ["u"])
+
+    assert base == op_fingerprint("op", {"a": 1}, {"query": "select 1"}, ["u"])
+    assert base != op_fingerprint("op", {"a": 2}, {"query": "select 1"}, ["u"])
+    assert base != op_fingerprint("op", {"a": 1}, {"query": "select 2"}, ["u"])
+    assert base != op_fingerprint("op", {"a": 1}, {"query": "select 1"}, ["v"])
+
+
+class FakeOp:
+    def __init__(self, name, inputs):
+        self.name = name
+        self.kwargs = {}
+        self.inputs = inputs
+
+    def cache_inputs(self):
+        return self.inputs
+
+
+def _pipeline(monkeypatch, ops) -> HmlPipeline:
+    def my_pipeline():
+        pass
+
+    pipeline = HmlPipeline({}, click.Group("pipelines"), my_pipeline, [])
+    tasks = [{"name": "load"}, {"name": "train", "dependencies": ["load"]}]
+    workflow = {"spec": {"templates": [{"dag": {"tasks": tasks}}]}}
+    monkeypatch.setattr(pipeline, "_get_workflow", lambda: workflow)
+    pipeline.ops_dict = {op.name: op for op in ops}
+    return pipeline
+
+
+def test_pipeline_fingerprints_include_upstream_ops(monkeypatch):
+    load = FakeOp("load", {"table": "v1"})
+    pipeline = _pipeline(monkeypatch, [load, FakeOp("train", {})])
+
+    fingerprints = {"load": pipeline.fingerprint("load", {})}
+    first = pipeline.fingerprint("train", fingerprints)
+
+    load.inputs = {"table": "v2"}
+    fingerprints = {"load": pipeline.fingerprint("load", {})}
+    assert pipeline.fingerprint("train", fingerprints) != first
+
+
+def test_ops_downstream_of_undeclared_inputs_have_no_fingerprint(monkeypatch):
+    pipeline = _pipeline(monkeypatch, [FakeOp("load", None), FakeOp("train", {})])
+
+    fingerprints = {"load": pipeline.fingerprint("load", {})}
+
+    assert fingerprints["load"] is None
+    assert pipeline.fingerprint("train", fingerprints) is None
@@ -0,0 +1,21 @@
+import pandas as pd
+import pytest
+
+from hypermodel.utilities.parallel import map_columns
+
+
+def column_sum(series: pd.Series):
+    return series.sum()
+
+
+@pytest.mark.parametrize("workers,use_processes", [(1, False), (3, False), (2, True)])
+def test_map_columns_keeps_the_order_of_columns(workers, use_processes):
+    dataframe = pd.DataFrame({"a": [1, 2], "b": [3, 4], "c": [5, 6]})
+    started = []
+
+    results = map_columns(
+        column_sum, dataframe, ["c", "a", "b"], workers=workers, use_processes=use_processes, on_column=started.append
+    )
+
+    assert list(results.items()) == [("c", 11), ("a", 3), ("b", 7)]
+    assert started == ["c", "a", "b"]
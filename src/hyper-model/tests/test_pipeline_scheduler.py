@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+
+import pytest
+
+from hypermodel.hml.pipeline_scheduler import PipelineScheduler, topological_levels
+
+
+TASKS = [
+    {"name": "load"},
+    {"name": "features", "dependencies": ["load"]},
+    {"name": "distributions", "dependencies": ["load"]},
+    {"name": "train", "dependencies": ["features", "distributions"]},
+]
+
+
+def test_topological_levels():
+    assert topological_levels(TASKS) == [["load"], ["features", "distributions"], ["train"]]
+
+
+def test_dependency_cycles_are_rejected():
+    tasks = [{"name": "a", "dependencies": ["b"]}, {"name": "b", "dependencies": ["a"]}]
+
+    with pytest.raises(Exception, match="dependency cycle"):
+        topological_levels(tasks)
+
+
+def test_tasks_in_a_level_run_concurrently():
+    barrier = threading.Barrier(2, timeout=10)
+    order = []
+
+    def run_task(name):
+        if name in ("features", "distributions"):
+            # Only returns once both tasks are running at the same time
+            barrier.wait()
+        order.append(name)
+        return name.upper()
+
+    successes = {}
+    timings = PipelineScheduler(max_workers=2).run(
+        topological_levels(TASKS), run_task, on_success=lambda name, seconds, result: successes.update({name: result})
+    )
+
+    assert order[0] == "load" and order[-1] == "train"
+    assert set(timings) == {"load", "features", "distributions", "train"}
+    assert successes == {"load": "LOAD", "features": "FEATURES", "distributions": "DISTRIBUTIONS", "train": "TRAIN"}
+
+
+def test_skipped_tasks_dont_run():
+    ran = []
+
+    PipelineScheduler(max_workers=2).run(topological_levels(TASKS), ran.append, should_run=lambda name: name != "features")
+
+    assert sorted(ran) == ["distributions", "load", "train"]
+
+
+def test_a_failure_stops_later_levels():
+    ran = []
+    failures = {}
+
+    def run_task(name):
+        ran.append(name)
+        if name == "features":
+            raise ValueError("no features")
+        if name == "distributions":
+            time.sleep(0.2)
+
+    with pytest.raises(ValueError, match="no features"):
+        PipelineScheduler(max_workers=2).run(
+            topological_levels(TASKS), run_task, on_failure=lambda name, seconds, ex: failures.update({name: ex})
+        )
+
+    # The task already running finishes, but nothing after it starts
+    assert sorted(ran) == ["distributions", "features", "load"]
+    assert list(failures) == ["features"]
+
+
+def _process_id(name):
+    return os.getpid()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="processes need fork")
+def test_tasks_can_run_in_processes():
+    pids = {}
+
+    PipelineScheduler(max_workers=2, use_processes=True).run(
+        [["a", "b"]], _process_id, on_success=lambda name, seconds, pid: pids.update({name: pid})
+    )
+
+    assert set(pids) == {"a", "b"}
+    assert os.getpid() not in pids.values()
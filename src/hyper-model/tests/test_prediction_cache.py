@@ -0,0 +1,98 @@
+import click
+
+from hypermodel.hml.hml_inference_app import HmlInferenceApp
+from hypermodel.hml.prediction import prediction_cache
+from hypermodel.hml.prediction.prediction_cache import PredictionCache
+
+
+def test_key_ignores_the_order_of_features():
+    assert PredictionCache.key({"a": 1, "b": "x"}) == PredictionCache.key({"b": "x", "a": 1})
+    assert PredictionCache.key({"a": 1}) != PredictionCache.key({"a": 2})
+
+
+def test_least_recently_used_predictions_are_evicted():
+    cache = PredictionCache(max_size=2)
+    cache.put("v1", "a", 1)
+    cache.put("v1", "b", 2)
+    cache.get("v1", "a")
+    cache.put("v1", "c", 3)
+
+    assert cache.get("v1", "a") == (True, 1)
+    assert cache.get("v1", "b") == (False, None)
+    assert cache.get("v1", "c") == (True, 3)
+
+
+def test_expired_predictions_are_not_returned(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(prediction_cache.time, "monotonic", lambda: now[0])
+    cache = PredictionCache(ttl_seconds=10)
+
+    cache.put("v1", "a", 1)
+    now[0] += 5
+    assert cache.get("v1", "a") == (True, 1)
+    now[0] += 6
+    assert cache.get("v1", "a") == (False, None)
+    assert cache.stats()["size"] == 0
+
+
+def test_a_new_version_clears_the_cache():
+    cache = PredictionCache()
+    cache.put("v1", "a", 1)
+
+    assert cache.get("v2", "a") == (False, None)
+    assert cache.stats() == {"version": "v2", "size": 0, "hits": 0, "misses": 1}
+
+
+def test_predictions_by_an_old_version_are_not_cached():
+    cache = PredictionCache()
+    cache.put("v1", "a", 1)
+    cache.get("v2", "b")
+
+    # e.g. a request that was already running on the old model finishing
+    cache.put("v1", "b", 2)
+    cache.put("v2", "c", 3)
+
+    assert cache.get("v2", "b") == (False, None)
+    assert cache.get("v2", "c") == (True, 3)
+    assert cache.stats()["version"] == "v2"
+
+
+class FakeContainer:
+    name = "model"
+    model_md5 = "v1"
+    is_loaded = True
+
+    def __init__(self):
+        self.predicted = []
+
+    def predict_batch(self, records, timer=None):
+        self.predicted.extend(records)
+        return [r["x"] * 10 for r in records]
+
+
+def test_inference_app_predicts_each_record_once():
+    app = HmlInferenceApp("test", None, click.Group("root"), {"prediction_cache": True})
+    container = app.register_model(FakeContainer())
+
+    assert app.predict("model", {"x": 1}) == 10
+    assert app.predict("model", {"x": 1}) == 10
+    assert app.predict("model", {"x": 2}) == 20
+
+    assert container.predicted == [{"x": 1}, {"x": 2}]
+    assert app.get_cache_stats()["model"]["hits"] == 1
+
+
+def test_inference_app_caches_under_the_version_that_predicted():
+    app = HmlInferenceApp("test", None, click.Group("root"), {"prediction_cache": True})
+    old = app.register_model(FakeContainer())
+    new = FakeContainer()
+    new.model_md5 = "v2"
+
+    app.predict("model", {"x": 1})
+    app.swap_model(new, warm_up=False)
+    app.predict("model", {"x": 1})
+    app.predict("model", {"x": 1})
+
+    assert old.predicted == [{"x": 1}]
+    assert new.predicted == [{"x": 1}]
+    assert app.get_cache_stats()["model"] == {"version": "v2", "size": 1, "hits": 1, "misses": 2}
@@ -0,0 +1,112 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+import pytest
+
+pytest.importorskip("gunicorn")
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="PreforkServer needs fork")
+
+
+SERVER_SCRIPT = """
+import os, sys, time
+from flask import Flask
+from hypermodel.hml.prediction.prefork_server import PreforkServer
+
+app = Flask("test")
+
+@app.route("/pid")
+def pid():
+    return str(os.getpid())
+
+@app.route("/slow")
+def slow():
+    time.sleep(1.5)
+    return "finished"
+
+def on_worker_start():
+    print(f"worker started {os.getpid()}", flush=True)
+
+PreforkServer(app, int(sys.argv[1]), 2, threads=2, max_requests=int(sys.argv[2]),
+              graceful_timeout=10, on_worker_start=on_worker_start).serve()
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _get(port: int, path: str) -> str:
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=10) as response:
+        return response.read().decode("utf-8")
+
+
+@pytest.fixture
+def start_server(tmp_path):
+    processes = []
+
+    def start(max_requests: int = 0):
+        port = _free_port()
+        script = tmp_path / "server.py"
+        script.write_text(SERVER_SCRIPT)
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        process = subprocess.Popen(
+            [sys.executable, str(script), str(port), str(max_requests)],
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        processes.append(process)
+
+        deadline = time.monotonic() + 20
+        while time.monotonic() < deadline:
+            try:
+                _get(port, "/pid")
+                return process, port
+            except OSError:
+                time.sleep(0.1)
+        raise Exception("The server didn't start")
+
+    yield start
+
+    for process in processes:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+
+def test_stopping_drains_requests_in_flight(start_server):
+    process, port = start_server()
+
+    result = {}
+    request = threading.Thread(target=lambda: result.update(body=_get(port, "/slow")))
+    request.start()
+    time.sleep(0.5)
+
+    process.send_signal(signal.SIGTERM)
+    request.join(10)
+
+    assert result.get("body") == "finished"
+    assert process.wait(15) == 0
+
+
+def test_workers_are_recycled_after_max_requests(start_server):
+    process, port = start_server(max_requests=2)
+
+    pids = set()
+    for _ in range(12):
+        pids.add(_get(port, "/pid"))
+
+    # Each worker serves at most 2 requests (one served the startup check)
+    assert len(pids) >= 5
+
+    process.send_signal(signal.SIGTERM)
+    output = process.communicate(timeout=15)[0].decode("utf-8")
+    assert output.count("worker started") >= len(pids)
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from hypermodel.features import (
+    DistributionSketch,
+    NumericSketch,
+    TDigest,
+    UniqueValuesSketch,
+    describe_features,
+    get_unique_feature_values,
+)
+
+
+def _data_frame(rows: int = 1000) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    weight = rng.normal(100, 15, rows)
+    weight[::50] = np.nan
+    colour = rng.choice(["red", "green", "blue", None], rows)
+    return pd.DataFrame({"weight": weight, "colour": colour})
+
+
+def _chunks(dataframe: pd.DataFrame, size: int):
+    return [dataframe.iloc[i : i + size] for i in range(0, len(dataframe), size)]
+
+
+def test_chunked_sketch_matches_the_whole_table():
+    dataframe = _data_frame()
+
+    sketch = DistributionSketch(["colour"], ["weight"])
+    for chunk in _chunks(dataframe, 128):
+        sketch.update(chunk)
+
+    assert sketch.feature_uniques() == get_unique_feature_values(dataframe, ["colour"])
+    expected = describe_features(dataframe, ["weight"])["weight"]
+    actual = sketch.feature_summaries()["weight"]
+    assert actual.keys() == expected.keys()
+    for statistic, value in expected.items():
+        assert actual[statistic] == pytest.approx(value), statistic
+
+
+def test_merged_sketches_match_one_sketch():
+    dataframe = _data_frame()
+    chunks = _chunks(dataframe, 300)
+
+    merged = DistributionSketch(["colour"], ["weight"])
+    for chunk in chunks:
+        merged.merge(DistributionSketch(["colour"], ["weight"]).update(chunk))
+    single = DistributionSketch(["colour"], ["weight"]).update(dataframe)
+
+    assert merged.feature_uniques() == single.feature_uniques()
+    assert merged.feature_summaries()["weight"] == pytest.approx(single.feature_summaries()["weight"])
+
+
+def test_unique_values_counts():
+    sketch = UniqueValuesSketch().update(pd.Series(["a", None, "b", "a"]))
+    sketch.merge(UniqueValuesSketch().update(pd.Series([np.nan, "c", "a"])))
+
+    values = sketch.values()
+    assert values[0] == "a" and pd.isnull(values[1]) and values[2:] == ["b", "c"]
+    assert list(sketch.counts.values()) == [3, 2, 1, 1]
+
+
+def test_empty_numeric_sketch():
+    summary = NumericSketch().update(pd.Series([np.nan, None], dtype=float)).describe()
+
+    assert summary["count"] == 0
+    assert np.isnan(summary["mean"]) and np.isnan(summary["50%"])
+
+
+def test_digest_estimates_quantiles_once_compressed():
+    values = np.random.default_rng(7).exponential(10, 50000)
+
+    digest = TDigest(buffer_size=1000)
+    for chunk in np.array_split(values, 10):
+        digest.update(chunk)
+
+    assert not digest.is_exact
+    assert len(digest.means) < 1000
+    assert digest.count == len(values)
+    for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+        assert digest.quantile(q) == pytest.approx(np.quantile(values, q), rel=0.02)